@@ -0,0 +1,672 @@
+import gzip
+import json
+import struct
+import numpy as np
+import oneqloud_polynomials
+import logging.config
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class ArrayPolynomial(object):
+    """A binary polynomial stored in numpy arrays, grouped by degree
+
+    The terms of degree d are an (n, d) int64 array of variable indices and an (n,)
+    float64 array of coefficients. Terms are kept in canonical form, the same as
+    oneqloud_polynomials.BinaryPolynomial: variables are sorted and unique inside a
+    term (x * x = x), a term appears once and terms with a zero coefficient are dropped.
+    """
+
+    # Values an assignment can hold, by encoding
+    ENCODINGS = {"binary": (0, 1), "spin": (-1, 1)}
+    # Conventions of from_sparse and to_sparse for the coefficient of x_i x_j, i != j:
+    #   upper: energy x^T M x, the coefficient is M[i, j] + M[j, i], written at M[min, max]
+    #   symmetric: M[i, j] = M[j, i] is the coefficient, e.g. a weighted adjacency matrix
+    SPARSE_CONVENTIONS = ("upper", "symmetric")
+    # Number of values gathered at once by evaluate
+    _evaluate_chunk = 1 << 22
+    # Number of terms formatted at once by write_qio
+    _qio_chunk = 1 << 16
+
+    # Binary file format of save and load, little-endian:
+    #   header: magic, version, number of degrees, constant term
+    #   one entry per degree: degree, number of terms, offset of the indices, offset of the coefficients
+    #   then the (terms, degree) int64 indices and (terms,) float64 coefficients of every
+    #   degree, each starting at a multiple of FILE_ALIGNMENT bytes
+    FILE_MAGIC = b"MSQPOLY\0"
+    FILE_VERSION = 1
+    FILE_ALIGNMENT = 64
+    _FILE_HEADER = struct.Struct("<8sIId")
+    _FILE_ENTRY = struct.Struct("<QQQQ")
+
+    def __init__(self, terms=None, constant_term=0.0):
+        """
+        The constructor for ArrayPolynomial class. Use from_arrays to build from raw arrays.
+
+        Args:
+           terms (dict): degree -> (indices, coefficients), already in canonical form.
+           constant_term (float): The constant term of the polynomial.
+        """
+        self.terms = {} if terms is None else terms
+        self.constant_term = float(constant_term)
+        # Set by load when the arrays are mapped from a file
+        self.filename = None
+
+    @property
+    def degree(self):
+        return max(self.terms, default=0)
+
+    @property
+    def term_count(self):
+        # Same as BinaryPolynomial, the constant counts as a term when it is not 0
+        count = sum(len(coefficients) for _, coefficients in self.terms.values())
+        return count + (self.constant_term != 0)
+
+    @property
+    def var_list(self):
+        if len(self.terms) == 0:
+            return []
+        return np.unique(
+            np.concatenate([indices.ravel() for indices, _ in self.terms.values()])
+        ).tolist()
+
+    @property
+    def var_count(self):
+        return len(self.var_list)
+
+    def __len__(self):
+        return self.term_count
+
+    def __iter__(self):
+        """Iterate over the terms as (coefficient, var_list) pairs, constant first"""
+        if self.constant_term != 0:
+            yield self.constant_term, []
+        for degree in sorted(self.terms):
+            indices, coefficients = self.terms[degree]
+            yield from zip(coefficients.tolist(), indices.tolist())
+
+    def __repr__(self):
+        return f"ArrayPolynomial(degree={self.degree}, term_count={self.term_count})"
+
+    def __reduce__(self):
+        # A mapped polynomial is sent to other processes by name, they map the same file
+        if self.filename is not None:
+            return ArrayPolynomial.load, (self.filename,)
+        return ArrayPolynomial, (self.terms, self.constant_term)
+
+    @staticmethod
+    def from_arrays(
+        coefficients, indices, offsets=None, constant_term=0.0, encoding="binary"
+    ):
+        """
+        Function to construct an ArrayPolynomial from arrays of terms, without a Python loop per term.
+
+        The terms are either all of the same degree d, given as an (n, d) array of
+        variable indices, or of any degree in CSR form: the variables of term i are
+        indices[offsets[i]:offsets[i + 1]]. Duplicated terms are summed. A variable
+        repeated inside a term is reduced by encoding: x * x = x for binary variables,
+        s * s = 1 for spins.
+
+        Args:
+           coefficients (numpy): The (n,) coefficients of the terms.
+           indices (numpy): The variable indices, (n, d) or flat when offsets is given.
+           offsets (numpy): The (n + 1,) term offsets into indices, None for an (n, d) array.
+           constant_term (float): Added to the constant term of the polynomial.
+           encoding (str): "binary" for values in {0, 1}, "spin" for values in {-1, 1}.
+
+        Returns array_polynomial
+        """
+        logger.debug("()")
+        if encoding not in ArrayPolynomial.ENCODINGS:
+            err_msg = f"Unsupported encoding: {encoding}, expected one of {list(ArrayPolynomial.ENCODINGS)}"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        coefficients = np.asarray(coefficients, dtype=np.float64).ravel()
+        indices = np.asarray(indices)
+        if offsets is None:
+            if indices.ndim != 2 or indices.shape[0] != len(coefficients):
+                err_msg = "indices should be an (n, d) array matching the n coefficients"
+                logger.error(err_msg)
+                raise Exception(err_msg)
+            offsets = np.arange(len(coefficients) + 1) * indices.shape[1]
+        else:
+            offsets = np.asarray(offsets, dtype=np.int64)
+            if len(offsets) != len(coefficients) + 1 or offsets[-1] != indices.size:
+                err_msg = "offsets should have n + 1 entries ending at the number of indices"
+                logger.error(err_msg)
+                raise Exception(err_msg)
+        indices = indices.ravel()
+        if indices.size != 0 and (
+            not np.issubdtype(indices.dtype, np.integer) or indices.min() < 0
+        ):
+            err_msg = "Variable indices should be non-negative integers"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        indices = indices.astype(np.int64)
+
+        # Sort the variables inside every term and reduce the repeated ones
+        lengths = np.diff(offsets)
+        rows = np.repeat(np.arange(len(coefficients)), lengths)
+        same_term = rows[1:] == rows[:-1]
+        if not np.all(indices[1:][same_term] > indices[:-1][same_term]):
+            order = np.lexsort((indices, rows))
+            indices, rows = indices[order], rows[order]
+            first = np.ones(len(indices), dtype=bool)
+            first[1:] = (indices[1:] != indices[:-1]) | (rows[1:] != rows[:-1])
+            if encoding == "spin":
+                # s * s = 1, a spin repeated an even number of times drops out of its term
+                starts = np.flatnonzero(first)
+                counts = np.diff(np.append(starts, len(indices)))
+                keep = np.zeros(len(indices), dtype=bool)
+                keep[starts[counts % 2 == 1]] = True
+            else:
+                # x * x = x
+                keep = first
+            indices, rows = indices[keep], rows[keep]
+            lengths = np.bincount(rows, minlength=len(coefficients))
+            offsets = np.concatenate(([0], np.cumsum(lengths)))
+
+        constant_term = float(constant_term) + float(coefficients[lengths == 0].sum())
+        terms = {}
+        for degree in np.unique(lengths[lengths > 0]).tolist():
+            selected = np.flatnonzero(lengths == degree)
+            degree_indices = indices[offsets[selected][:, None] + np.arange(degree)]
+            degree_coefficients = coefficients[selected]
+            # Sort the terms and sum the coefficients of duplicated ones
+            order = np.lexsort(degree_indices.T[::-1])
+            degree_indices = degree_indices[order]
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = np.any(degree_indices[1:] != degree_indices[:-1], axis=1)
+            degree_indices = degree_indices[first]
+            degree_coefficients = np.add.reduceat(
+                degree_coefficients[order], np.flatnonzero(first)
+            )
+            nonzero = degree_coefficients != 0
+            if nonzero.any():
+                terms[degree] = (degree_indices[nonzero], degree_coefficients[nonzero])
+        logger.debug("- Return")
+        return ArrayPolynomial(terms, constant_term)
+
+    @staticmethod
+    def from_terms(terms, encoding="binary"):
+        """
+        Function to construct an ArrayPolynomial from a list of [coefficient, var_list] terms.
+        Repeated variables are reduced by encoding, see from_arrays.
+        """
+        logger.debug("()")
+        coefficients = [term[0] for term in terms]
+        var_lists = [term[1] for term in terms]
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(var_list) for var_list in var_lists], out=offsets[1:])
+        indices = np.fromiter(
+            (var for var_list in var_lists for var in var_list),
+            dtype=np.int64,
+            count=offsets[-1],
+        )
+        array_poly = ArrayPolynomial.from_arrays(
+            coefficients, indices, offsets, encoding=encoding
+        )
+        logger.debug("- Return")
+        return array_poly
+
+    @staticmethod
+    def from_bp(bp):
+        """
+        Function to construct an ArrayPolynomial from a oneqloud_polynomials.BinaryPolynomial.
+        """
+        logger.debug("()")
+        array_poly = ArrayPolynomial.from_terms(
+            [[term.coefficient, term.var_list] for term in bp]
+        )
+        logger.debug("- Return")
+        return array_poly
+
+    def to_bp(self):
+        """
+        Returns the polynomial as a oneqloud_polynomials.BinaryPolynomial.
+
+        BinaryPolynomial is built one add_term call per term, so this is the slow step
+        of a conversion. Polynomial only calls it when an operation needs bp.
+        """
+        logger.debug("()")
+        bp = oneqloud_polynomials.BinaryPolynomial()
+        add_term = bp.add_term
+        for degree in sorted(self.terms):
+            indices, coefficients = self.terms[degree]
+            for coefficient, var_list in zip(coefficients.tolist(), indices.tolist()):
+                add_term(coefficient, var_list)
+        if self.constant_term != 0:
+            bp.add_constant_term(self.constant_term)
+        logger.debug("- Return")
+        return bp
+
+    def to_csr(self):
+        """
+        Returns the non-constant terms in CSR form, by increasing degree.
+
+        Returns:
+            coefficients: (n,) float64 coefficients
+            indices: flat int64 variable indices
+            offsets: (n + 1,) int64 offsets, the variables of term i are indices[offsets[i]:offsets[i + 1]]
+        """
+        degrees = sorted(self.terms)
+        coefficients = np.concatenate(
+            [np.empty(0)] + [self.terms[degree][1] for degree in degrees]
+        )
+        indices = np.concatenate(
+            [np.empty(0, dtype=np.int64)]
+            + [self.terms[degree][0].ravel() for degree in degrees]
+        )
+        lengths = np.concatenate(
+            [np.empty(0, dtype=np.int64)]
+            + [
+                np.full(len(self.terms[degree][1]), degree, dtype=np.int64)
+                for degree in degrees
+            ]
+        )
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        return coefficients, indices, offsets
+
+    @staticmethod
+    def from_sparse(matrix, var_list=None, convention="upper"):
+        """
+        Function to construct an ArrayPolynomial of degree <= 2 from a square scipy.sparse matrix, in O(nnz).
+
+        Diagonal entries are the linear terms, see SPARSE_CONVENTIONS for the others.
+        With "symmetric" every off-diagonal entry counts for half of its coupling.
+
+        Args:
+           matrix: A square scipy.sparse matrix or array, in any format.
+           var_list (list): The variable of every row and column. By default row i is variable i.
+           convention (str): "upper" or "symmetric".
+
+        Returns array_polynomial
+        """
+        logger.debug("()")
+        sparse = ArrayPolynomial._import_scipy_sparse()
+        ArrayPolynomial._check_convention(convention)
+        coo = sparse.coo_matrix(matrix)
+        if coo.shape[0] != coo.shape[1]:
+            err_msg = f"Expected a square matrix, got shape {coo.shape}"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        rows = coo.row.astype(np.int64)
+        cols = coo.col.astype(np.int64)
+        coefficients = coo.data.astype(np.float64)
+        if convention == "symmetric":
+            coefficients = np.where(rows == cols, coefficients, coefficients / 2)
+        if var_list is not None:
+            if len(var_list) != coo.shape[0]:
+                err_msg = "var_list should have one variable per row of the matrix"
+                logger.error(err_msg)
+                raise Exception(err_msg)
+            variables = np.asarray(var_list, dtype=np.int64)
+            rows, cols = variables[rows], variables[cols]
+        array_poly = ArrayPolynomial.from_arrays(
+            coefficients, np.stack([rows, cols], axis=1)
+        )
+        logger.debug("- Return")
+        return array_poly
+
+    def to_sparse(self, var_list=None, convention="upper", format="csr"):
+        """
+        Returns the polynomial as a square scipy.sparse matrix, in O(terms).
+
+        Args:
+           var_list (list): The variable of every row and column. By default row i is variable i.
+           convention (str): "upper" or "symmetric", see SPARSE_CONVENTIONS.
+           format (str): The scipy.sparse format, e.g. "csr", "csc" or "coo".
+
+        Returns matrix
+        """
+        logger.debug("()")
+        sparse = ArrayPolynomial._import_scipy_sparse()
+        ArrayPolynomial._check_convention(convention)
+        if self.degree > 2:
+            err_msg = "Polynomial should not be greater than degree 2."
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        if self.constant_term != 0:
+            err_msg = "Only var_terms() supported. Polynomial entered has a constant."
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        if var_list is None:
+            size = max(self.var_list, default=-1) + 1
+        else:
+            size = len(var_list)
+        columns = self._columns(size, var_list)
+        linear_indices, linear_coefficients = self.terms.get(
+            1, (np.empty((0, 1), dtype=np.int64), np.empty(0))
+        )
+        pair_indices, pair_coefficients = self.terms.get(
+            2, (np.empty((0, 2), dtype=np.int64), np.empty(0))
+        )
+        linear = columns[linear_indices[:, 0]]
+        first, second = columns[pair_indices[:, 0]], columns[pair_indices[:, 1]]
+        if convention == "upper":
+            rows = np.concatenate((linear, np.minimum(first, second)))
+            cols = np.concatenate((linear, np.maximum(first, second)))
+            data = np.concatenate((linear_coefficients, pair_coefficients))
+        else:
+            rows = np.concatenate((linear, first, second))
+            cols = np.concatenate((linear, second, first))
+            data = np.concatenate(
+                (linear_coefficients, pair_coefficients, pair_coefficients)
+            )
+        matrix = sparse.coo_matrix((data, (rows, cols)), shape=(size, size))
+        logger.debug("- Return")
+        return matrix.asformat(format)
+
+    @staticmethod
+    def _import_scipy_sparse():
+        try:
+            import scipy.sparse
+        except ImportError:
+            err_msg = "scipy is required to convert polynomials to and from sparse matrices"
+            logger.error(err_msg)
+            raise Exception(err_msg) from None
+        return scipy.sparse
+
+    @staticmethod
+    def _check_convention(convention):
+        if convention not in ArrayPolynomial.SPARSE_CONVENTIONS:
+            err_msg = f"Unsupported convention: {convention}, expected one of {list(ArrayPolynomial.SPARSE_CONVENTIONS)}"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+
+    def save(self, filename):
+        """
+        Function to write the polynomial to a binary file, any degree, see load.
+
+        Args:
+           filename (str): The file to write.
+        """
+        logger.debug("()")
+        header, entry = ArrayPolynomial._FILE_HEADER, ArrayPolynomial._FILE_ENTRY
+        degrees = sorted(self.terms)
+        offset = header.size + entry.size * len(degrees)
+        entries = []
+        for degree in degrees:
+            indices, coefficients = self.terms[degree]
+            indices_offset = ArrayPolynomial._align(offset)
+            coefficients_offset = ArrayPolynomial._align(
+                indices_offset + indices.size * 8
+            )
+            offset = coefficients_offset + coefficients.size * 8
+            entries.append(
+                (degree, len(coefficients), indices_offset, coefficients_offset)
+            )
+        with open(filename, "wb") as f:
+            f.write(
+                header.pack(
+                    ArrayPolynomial.FILE_MAGIC,
+                    ArrayPolynomial.FILE_VERSION,
+                    len(degrees),
+                    self.constant_term,
+                )
+            )
+            for values in entries:
+                f.write(entry.pack(*values))
+            for degree, _, indices_offset, coefficients_offset in entries:
+                indices, coefficients = self.terms[degree]
+                f.seek(indices_offset)
+                f.write(np.ascontiguousarray(indices, dtype="<i8").tobytes())
+                f.seek(coefficients_offset)
+                f.write(np.ascontiguousarray(coefficients, dtype="<f8").tobytes())
+        logger.debug("- Return")
+
+    @staticmethod
+    def load(filename, mmap=True):
+        """
+        Function to read a polynomial written by save.
+
+        With mmap the arrays are mapped read-only from the file: opening is immediate,
+        terms are read from disk when first used and processes mapping the same file
+        share its pages. Pickling a mapped polynomial only sends the filename.
+
+        Args:
+           filename (str): The file to read.
+           mmap (bool): Map the arrays instead of reading them.
+
+        Returns array_polynomial
+        """
+        logger.debug("()")
+        header, entry = ArrayPolynomial._FILE_HEADER, ArrayPolynomial._FILE_ENTRY
+        with open(filename, "rb") as f:
+            data = f.read(header.size)
+            if (
+                len(data) != header.size
+                or data[: len(ArrayPolynomial.FILE_MAGIC)] != ArrayPolynomial.FILE_MAGIC
+            ):
+                err_msg = f"{filename} is not an ArrayPolynomial file"
+                logger.error(err_msg)
+                raise Exception(err_msg)
+            _, version, degree_count, constant_term = header.unpack(data)
+            if version > ArrayPolynomial.FILE_VERSION:
+                err_msg = f"{filename} has version {version}, only versions up to {ArrayPolynomial.FILE_VERSION} can be read"
+                logger.error(err_msg)
+                raise Exception(err_msg)
+            entries = [
+                entry.unpack(f.read(entry.size)) for _ in range(degree_count)
+            ]
+        terms = {}
+        for degree, count, indices_offset, coefficients_offset in entries:
+            terms[degree] = (
+                ArrayPolynomial._read_array(
+                    filename, "<i8", (count, degree), indices_offset, mmap
+                ),
+                ArrayPolynomial._read_array(
+                    filename, "<f8", (count,), coefficients_offset, mmap
+                ),
+            )
+        array_poly = ArrayPolynomial(terms, constant_term)
+        if mmap:
+            array_poly.filename = filename
+        logger.debug("- Return")
+        return array_poly
+
+    @staticmethod
+    def is_array_file(filename):
+        """Return True when filename was written by save"""
+        with open(filename, "rb") as f:
+            magic = f.read(len(ArrayPolynomial.FILE_MAGIC))
+        return magic == ArrayPolynomial.FILE_MAGIC
+
+    @staticmethod
+    def _align(offset):
+        alignment = ArrayPolynomial.FILE_ALIGNMENT
+        return -(-offset // alignment) * alignment
+
+    @staticmethod
+    def _read_array(filename, dtype, shape, offset, mmap):
+        if np.prod(shape) == 0:
+            # Empty arrays cannot be mapped
+            return np.empty(shape, dtype=dtype)
+        if mmap:
+            return np.memmap(
+                filename, dtype=dtype, mode="r", offset=offset, shape=shape
+            ).view(np.ndarray)
+        return np.fromfile(
+            filename, dtype=dtype, count=int(np.prod(shape)), offset=offset
+        ).reshape(shape)
+
+    def write_qio(
+        self,
+        file,
+        name="Optimization problem",
+        problem_type="pubo",
+        rounding=False,
+        compress=False,
+        version="1.0",
+    ):
+        """
+        Function to write the polynomial as a QIO problem, the JSON of azure.quantum.optimization.Problem.
+
+        The terms are formatted straight from the arrays, _qio_chunk terms at a time, so
+        neither Term objects nor the whole JSON string are built. They are written by
+        increasing degree then variable indices, with the constant term last as in
+        Polynomial.to_azure_terms, so a polynomial is always written the same way.
+
+        Args:
+           file: The binary file object to write to.
+           name (str): The problem name, written in the metadata.
+           problem_type: The ProblemType, or its name.
+           rounding (bool): Round the coefficients to integers, as Polynomial.to_azure_terms.
+           compress (bool): Write a gzip stream, the file itself is not closed.
+           version (str): The version of the cost function format, written with the terms.
+        """
+        logger.debug("()")
+        chunk_size = ArrayPolynomial._qio_chunk
+        chunks = (
+            (indices[start : start + chunk_size], coefficients[start : start + chunk_size])
+            for degree, (indices, coefficients) in sorted(self.terms.items())
+            for start in range(0, len(coefficients), chunk_size)
+        )
+        ArrayPolynomial._write_qio_stream(
+            file,
+            name,
+            problem_type,
+            rounding,
+            compress,
+            chunks,
+            self.constant_term,
+            version,
+        )
+        logger.debug("- Return")
+
+    @staticmethod
+    def _write_qio_stream(
+        file, name, problem_type, rounding, compress, chunks, constant_term, version
+    ):
+        """Write a QIO problem whose terms are given as chunks of (indices, coefficients) arrays, see write_qio"""
+        if compress:
+            # Level 6 compresses about as well as the default 9 in a third of the time
+            with gzip.GzipFile(fileobj=file, mode="wb", compresslevel=6) as gzip_file:
+                ArrayPolynomial._write_qio_stream(
+                    gzip_file,
+                    name,
+                    problem_type,
+                    rounding,
+                    False,
+                    chunks,
+                    constant_term,
+                    version,
+                )
+            return
+        header = {
+            "metadata": {"name": name},
+            "cost_function": {
+                "version": version,
+                "type": getattr(problem_type, "name", problem_type),
+                "terms": [],
+            },
+        }
+        # Everything up to the terms, without the closing "]}}"
+        file.write(json.dumps(header)[:-3].encode())
+        separator = ""
+        for indices, coefficients in chunks:
+            if not np.isfinite(coefficients).all():
+                err_msg = "Cannot write a QIO problem with infinite or NaN coefficients"
+                logger.error(err_msg)
+                raise Exception(err_msg)
+            if len(coefficients) == 0:
+                continue
+            template = '{"c": %s, "ids": [' + ", ".join(["%d"] * indices.shape[1]) + "]}"
+            if rounding:
+                coefficients = np.round(coefficients).astype(np.int64)
+            text = ", ".join(
+                [
+                    template % (coefficient, *row)
+                    for coefficient, row in zip(coefficients.tolist(), indices.tolist())
+                ]
+            )
+            file.write((separator + text).encode())
+            separator = ", "
+        if rounding:
+            constant_term = int(round(constant_term))
+        if constant_term != 0:
+            file.write(
+                (separator + '{"c": %s, "ids": []}' % json.dumps(constant_term)).encode()
+            )
+        file.write(b"]}}")
+
+    def evaluate(self, X, var_list=None, encoding="binary"):
+        """
+        Function to compute the energy of many assignments at once.
+
+        Args:
+           X (numpy): A (samples, variables) array of assignments, or a single 1-D assignment.
+           var_list (list): The variable held by every column of X. By default column i holds variable i.
+           encoding (str): "binary" for values in {0, 1}, "spin" for values in {-1, 1}.
+               A term is the product of the values of its variables in both cases,
+               so "spin" evaluates the polynomial as an Ising problem.
+
+        Returns energies: (samples,) float64 array, a float for a 1-D X
+        """
+        logger.debug("()")
+        if encoding not in ArrayPolynomial.ENCODINGS:
+            err_msg = f"Unsupported encoding: {encoding}, expected one of {list(ArrayPolynomial.ENCODINGS)}"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        X = np.asarray(X)
+        single = X.ndim == 1
+        X = np.atleast_2d(X)
+        if X.size != 0 and not np.isin(X, ArrayPolynomial.ENCODINGS[encoding]).all():
+            err_msg = f"Assignments should only hold the values {ArrayPolynomial.ENCODINGS[encoding]} for the {encoding} encoding"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        X = X.astype(np.float64)
+
+        columns = self._columns(X.shape[1], var_list)
+        energies = np.full(X.shape[0], self.constant_term)
+        # Bound the (samples, terms, degree) temporary to about _evaluate_chunk values
+        for degree, (indices, coefficients) in self.terms.items():
+            chunk = max(1, ArrayPolynomial._evaluate_chunk // (X.shape[0] * degree))
+            for start in range(0, len(coefficients), chunk):
+                values = X[:, columns[indices[start : start + chunk]]]
+                energies += values.prod(axis=2) @ coefficients[start : start + chunk]
+        logger.debug("- Return")
+        return float(energies[0]) if single else energies
+
+    def _columns(self, column_count, var_list=None):
+        """Return an array mapping a variable index to its column in an assignment"""
+        variables = self.var_list
+        if var_list is None:
+            if len(variables) != 0 and variables[-1] >= column_count:
+                err_msg = f"Assignments have {column_count} columns, variable {variables[-1]} has no value"
+                logger.error(err_msg)
+                raise Exception(err_msg)
+            return np.arange(max(column_count, 1))
+        if len(var_list) != column_count:
+            err_msg = "var_list should have one variable per column of the assignments"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        size = max([*var_list, *variables, -1]) + 1
+        columns = np.full(size, -1, dtype=np.int64)
+        columns[np.asarray(var_list, dtype=np.int64)] = np.arange(column_count)
+        if len(variables) != 0 and (columns[variables] < 0).any():
+            err_msg = "var_list is missing variables of the polynomial"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        return columns
+
+    def equals(self, other):
+        if self.constant_term != other.constant_term or set(self.terms) != set(
+            other.terms
+        ):
+            return False
+        for degree, (indices, coefficients) in self.terms.items():
+            other_indices, other_coefficients = other.terms[degree]
+            if not (
+                np.array_equal(indices, other_indices)
+                and np.array_equal(coefficients, other_coefficients)
+            ):
+                return False
+        return True
+
+    def __eq__(self, other):
+        return self.equals(other)
@@ -0,0 +1,372 @@
+import itertools
+import numpy as np
+import logging.config
+from .ArrayPolynomial import ArrayPolynomial
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class DenseQubo(object):
+    """A polynomial of degree <= 2 stored as a packed upper triangular matrix
+
+    Row i of the upper triangle, from the diagonal, is packed[offsets[i]:offsets[i + 1]]:
+    packed[offsets[i]] is the coefficient of x_i and packed[offsets[i] + k] the
+    coefficient of x_i x_{i + k}, where position i holds variable var_list[i] and
+    var_list is sorted. A coefficient costs itemsize bytes (4 for float32, 8 for
+    float64) against 24 for a term of an ArrayPolynomial, whatever the density.
+
+    A DenseQubo can be used wherever an ArrayPolynomial is converted with to_arrays,
+    e.g. submitted to a LocalSolver, and a Polynomial can be built from one. compact
+    picks the smaller of the two forms by density; PolynomialBuilder.build uses it, so
+    the polynomials it builds are held as a DenseQubo once they are dense enough.
+    """
+
+    # Bytes used by a term of an ArrayPolynomial of degree 2: two int64 indices and a float64
+    ARRAY_TERM_BYTES = 24
+    # Number of rows handled at once by to_arrays and write_qio
+    _row_chunk = 256
+
+    def __init__(self, packed, var_list, constant_term=0.0):
+        """
+        The constructor for DenseQubo class. Use from_numpy, from_arrays or compact to build one.
+
+        Args:
+           packed (numpy): The n (n + 1) / 2 float32 or float64 coefficients of the upper triangle, by row.
+           var_list (list): The n variables, sorted.
+           constant_term (float): The constant term of the polynomial.
+        """
+        size = len(var_list)
+        if len(packed) != size * (size + 1) // 2:
+            err_msg = f"A packed upper triangle of {size} variables has {size * (size + 1) // 2} coefficients, got {len(packed)}"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        self.packed = packed
+        self.var_list = list(var_list)
+        self.constant_term = float(constant_term)
+        # The first coefficient of every row, and the end of the last one
+        self.offsets = np.concatenate(([0], np.cumsum(np.arange(size, 0, -1))))
+
+    @property
+    def size(self):
+        return len(self.var_list)
+
+    @property
+    def dtype(self):
+        return self.packed.dtype
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+    @property
+    def var_count(self):
+        return self.size
+
+    @property
+    def degree(self):
+        linear_count = np.count_nonzero(self.packed[self.offsets[:-1]])
+        if np.count_nonzero(self.packed) > linear_count:
+            return 2
+        return 1 if linear_count != 0 else 0
+
+    @property
+    def term_count(self):
+        # Same as BinaryPolynomial, the constant counts as a term when it is not 0
+        return int(np.count_nonzero(self.packed)) + (self.constant_term != 0)
+
+    @property
+    def density(self):
+        """The fraction of the upper triangle holding a term"""
+        return np.count_nonzero(self.packed) / max(1, len(self.packed))
+
+    def __repr__(self):
+        return f"DenseQubo(size={self.size}, dtype={self.dtype}, term_count={self.term_count})"
+
+    @staticmethod
+    def from_numpy(array, var_list=None, dtype=np.float64):
+        """
+        Function to construct a DenseQubo from a square numpy array, for the energy x^T M x as Polynomial.from_numpy.
+
+        Args:
+           array (numpy): The square array.
+           var_list (list): The variable of every row and column. By default row i is variable i.
+           dtype: np.float32 or np.float64.
+
+        Returns dense_qubo
+        """
+        logger.debug("()")
+        array = np.asarray(array)
+        if array.ndim != 2 or array.shape[0] != array.shape[1]:
+            err_msg = f"Expected a square array, got shape {array.shape}"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        size = array.shape[0]
+        if var_list is None:
+            var_list = range(size)
+        if len(var_list) != size or len(set(var_list)) != size:
+            err_msg = "var_list should have one distinct variable per row of the array"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        order = np.argsort(var_list, kind="stable")
+        if (order != np.arange(size)).any():
+            array = array[order][:, order]
+        var_list = np.asarray(var_list)[order].tolist()
+        packed = np.empty(size * (size + 1) // 2, dtype=dtype)
+        start = 0
+        # Row by row, so the only temporary is one row
+        for i in range(size):
+            row = array[i, i:].astype(np.float64)
+            row[1:] += array[i + 1 :, i]
+            packed[start : start + size - i] = row
+            start += size - i
+        dense_qubo = DenseQubo(packed, var_list)
+        logger.debug("- Return")
+        return dense_qubo
+
+    @staticmethod
+    def from_arrays(array_poly, var_list=None, dtype=np.float64):
+        """
+        Function to construct a DenseQubo from an ArrayPolynomial of degree <= 2.
+
+        Args:
+           array_poly (ArrayPolynomial): The polynomial.
+           var_list (list): The variables of the rows, a superset of the variables of the polynomial.
+               Defaults to the variables of the polynomial.
+           dtype: np.float32 or np.float64.
+
+        Returns dense_qubo
+        """
+        logger.debug("()")
+        if array_poly.degree > 2:
+            err_msg = "Polynomial should not be greater than degree 2."
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        var_list = sorted(array_poly.var_list if var_list is None else var_list)
+        columns = array_poly._columns(len(var_list), var_list)
+        offsets = np.concatenate(
+            ([0], np.cumsum(np.arange(len(var_list), 0, -1)))
+        ).astype(np.int64)
+        packed = np.zeros(len(var_list) * (len(var_list) + 1) // 2, dtype=dtype)
+        for indices, coefficients in array_poly.terms.values():
+            # Terms are sorted by variable, so the first one is the row
+            rows = columns[indices[:, 0]]
+            cols = columns[indices[:, -1]]
+            packed[offsets[rows] + cols - rows] = coefficients
+        dense_qubo = DenseQubo(packed, var_list, array_poly.constant_term)
+        logger.debug("- Return")
+        return dense_qubo
+
+    @staticmethod
+    def compact(poly, dtype=np.float64, threshold=None):
+        """
+        Function to store a polynomial in its smallest form: a DenseQubo when it is dense enough, else an ArrayPolynomial.
+
+        Args:
+           poly: A Polynomial, an ArrayPolynomial or a DenseQubo.
+           dtype: The dtype of a DenseQubo, np.float32 or np.float64.
+           threshold (float): The density from which a DenseQubo is used. Defaults to
+               the density where both forms use the same memory, itemsize / ARRAY_TERM_BYTES.
+
+        Returns dense_qubo or array_polynomial
+        """
+        logger.debug("()")
+        if isinstance(poly, DenseQubo) and poly.dtype == dtype:
+            array_poly = None
+            density = poly.density
+        else:
+            array_poly = poly if isinstance(poly, ArrayPolynomial) else poly.to_arrays()
+            size = array_poly.var_count
+            variable_terms = array_poly.term_count - (array_poly.constant_term != 0)
+            density = variable_terms / max(1, size * (size + 1) // 2)
+        if threshold is None:
+            threshold = np.dtype(dtype).itemsize / DenseQubo.ARRAY_TERM_BYTES
+        if array_poly is None:
+            compact = poly if density >= threshold else poly.to_arrays()
+        elif array_poly.degree <= 2 and density >= threshold:
+            compact = DenseQubo.from_arrays(array_poly, dtype=dtype)
+        else:
+            compact = array_poly
+        logger.debug("- Return")
+        return compact
+
+    def _row_terms(self, start, end):
+        """Return the (indices, coefficients) of the non-zero pairs of rows start to end"""
+        block = self.packed[self.offsets[start] : self.offsets[end]]
+        flat = np.flatnonzero(block) + self.offsets[start]
+        rows = np.searchsorted(self.offsets, flat, side="right") - 1
+        cols = rows + flat - self.offsets[rows]
+        pairs = cols != rows
+        variables = np.asarray(self.var_list, dtype=np.int64)
+        indices = np.stack([variables[rows[pairs]], variables[cols[pairs]]], axis=1)
+        return indices, self.packed[flat[pairs]].astype(np.float64)
+
+    def _linear_terms(self):
+        diagonal = self.packed[self.offsets[:-1]]
+        nonzero = np.flatnonzero(diagonal)
+        indices = np.asarray(self.var_list, dtype=np.int64)[nonzero][:, None]
+        return indices, diagonal[nonzero].astype(np.float64)
+
+    def _pair_chunks(self):
+        for start in range(0, self.size, DenseQubo._row_chunk):
+            yield self._row_terms(start, min(self.size, start + DenseQubo._row_chunk))
+
+    def to_arrays(self):
+        """
+        Returns the polynomial as an ArrayPolynomial.
+        """
+        logger.debug("()")
+        terms = {}
+        linear = self._linear_terms()
+        if len(linear[1]) != 0:
+            terms[1] = linear
+        chunks = list(self._pair_chunks())
+        if sum(len(coefficients) for _, coefficients in chunks) != 0:
+            terms[2] = (
+                np.concatenate([indices for indices, _ in chunks]),
+                np.concatenate([coefficients for _, coefficients in chunks]),
+            )
+        array_poly = ArrayPolynomial(terms, self.constant_term)
+        logger.debug("- Return")
+        return array_poly
+
+    def to_numpy(self):
+        """
+        Returns the upper triangular matrix, rows and columns following var_list.
+        """
+        array = np.zeros((self.size, self.size), dtype=self.dtype)
+        for i in range(self.size):
+            array[i, i:] = self.packed[self.offsets[i] : self.offsets[i + 1]]
+        return array
+
+    def evaluate(self, X, var_list=None, encoding="binary"):
+        """
+        Function to compute the energy of many assignments at once, see ArrayPolynomial.evaluate.
+
+        Args:
+           X (numpy): A (samples, variables) array of assignments, or a single 1-D assignment.
+           var_list (list): The variable held by every column of X. By default column i holds variable i.
+           encoding (str): "binary" for values in {0, 1}, "spin" for values in {-1, 1}.
+
+        Returns energies: (samples,) float64 array, a float for a 1-D X
+        """
+        logger.debug("()")
+        if encoding not in ArrayPolynomial.ENCODINGS:
+            err_msg = f"Unsupported encoding: {encoding}, expected one of {list(ArrayPolynomial.ENCODINGS)}"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        X = np.asarray(X)
+        single = X.ndim == 1
+        X = np.atleast_2d(X)
+        if X.size != 0 and not np.isin(X, ArrayPolynomial.ENCODINGS[encoding]).all():
+            err_msg = f"Assignments should only hold the values {ArrayPolynomial.ENCODINGS[encoding]} for the {encoding} encoding"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        # Reorder the columns of X to follow self.var_list
+        if var_list is None:
+            var_list = range(X.shape[1])
+        if len(var_list) != X.shape[1]:
+            err_msg = "var_list should have one variable per column of the assignments"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        column_of = {var: column for column, var in enumerate(var_list)}
+        if any(var not in column_of for var in self.var_list):
+            err_msg = "The assignments are missing variables of the polynomial"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        X = X[:, [column_of[var] for var in self.var_list]].astype(np.float64)
+        energies = np.full(X.shape[0], self.constant_term)
+        # x_i (c_ii + sum_j>i c_ij x_j), the diagonal is linear in both encodings
+        for i in range(self.size):
+            row = self.packed[self.offsets[i] : self.offsets[i + 1]]
+            energies += X[:, i] * (row[0] + X[:, i + 1 :] @ row[1:])
+        logger.debug("- Return")
+        return float(energies[0]) if single else energies
+
+    def write_qio(
+        self,
+        file,
+        name="Optimization problem",
+        problem_type="pubo",
+        rounding=False,
+        compress=False,
+        version="1.0",
+    ):
+        """
+        Function to write the polynomial as a QIO problem, a block of rows at a time, see ArrayPolynomial.write_qio.
+
+        The output is the same as the one of the ArrayPolynomial holding the same terms.
+
+        Args:
+           file: The binary file object to write to.
+           name (str): The problem name, written in the metadata.
+           problem_type: The ProblemType, or its name.
+           rounding (bool): Round the coefficients to integers.
+           compress (bool): Write a gzip stream, the file itself is not closed.
+           version (str): The version of the cost function format, written with the terms.
+        """
+        logger.debug("()")
+        chunks = itertools.chain([self._linear_terms()], self._pair_chunks())
+        ArrayPolynomial._write_qio_stream(
+            file,
+            name,
+            problem_type,
+            rounding,
+            compress,
+            chunks,
+            self.constant_term,
+            version,
+        )
+        logger.debug("- Return")
+
+    def _check_same_variables(self, other):
+        if self.var_list != other.var_list:
+            err_msg = "Both DenseQubo should have the same var_list"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+
+    def __add__(self, other):
+        if isinstance(other, DenseQubo):
+            self._check_same_variables(other)
+            packed = self.packed + other.packed.astype(self.dtype)
+            return DenseQubo(packed, self.var_list, self.constant_term + other.constant_term)
+        return DenseQubo(self.packed.copy(), self.var_list, self.constant_term + other)
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __neg__(self):
+        return self * -1
+
+    def __sub__(self, other):
+        return self.__add__(-other)
+
+    def __rsub__(self, other):
+        return (-self).__add__(other)
+
+    def __mul__(self, other):
+        if isinstance(other, DenseQubo):
+            err_msg = "The product of two DenseQubo is of degree 4, only constants can multiply a DenseQubo"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        return DenseQubo(
+            (self.packed * other).astype(self.dtype),
+            self.var_list,
+            self.constant_term * other,
+        )
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def equals(self, other):
+        return (
+            self.var_list == other.var_list
+            and self.constant_term == other.constant_term
+            and np.array_equal(self.packed, other.packed)
+        )
+
+    def __eq__(self, other):
+        return self.equals(other)
@@ -1,10 +1,22 @@
 from datetime import datetime, timezone
+import io
 import uuid
 import json
 # import azure_config
 import logging.config
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from azure.quantum.optimization import Problem, OnlineProblem
 
 from ..logger.logger_config import LOGGING_CONFIG
+from .SubmissionEngine import SubmissionEngine
+from .JobPoller import JobPoller
+from .JobStore import JobStore
+from .ExperimentCheckpoint import ExperimentCheckpoint
+from .ResultTable import ResultTable
+from .ReportWriter import ReportWriter
+from .LocalSolver import LocalSolver, LocalJob
+from .LocalWorkspace import LocalWorkspace
 
 # Set up logger
 # logging.config.dictConfig(LOGGING_CONFIG)
@@ -14,7 +26,19 @@ logger = logging.getLogger(__name__)
 class Experiment:
     """An experiment is a set of solver-problem combinations to be solved as a batch"""
 
-    def __init__(self, solver_list, problem_list, num_iterations=1, experiment_id=None):
+    def __init__(
+        self,
+        solver_list,
+        problem_list,
+        num_iterations=1,
+        experiment_id=None,
+        max_workers=8,
+        max_workers_per_target=None,
+        poller_options=None,
+        job_store_dir=None,
+        download_workers=8,
+        checkpoint_dir=None,
+    ):
         if experiment_id is None:
             experiment_id = str(uuid.uuid4())
         self.date = datetime.now().replace(tzinfo=timezone.utc)
@@ -22,111 +46,510 @@ class Experiment:
         self.num_iterations = num_iterations
         self.solver_list = solver_list
         self.problem_list = problem_list
+        self.max_workers = max_workers
+        self.max_workers_per_target = max_workers_per_target
+        self.poller_options = poller_options or {}
+        self.download_workers = download_workers
+        # Folder for the submission checkpoints read by Experiment.load, disabled when None
+        self.checkpoint_dir = checkpoint_dir
         self.job_id_list = []
         self.experiment = []
         self.workspace = azure_config.WORKSPACE
+        # Local cache of finished jobs and their results, disabled when job_store_dir is None
+        self.job_store = JobStore(job_store_dir) if job_store_dir is not None else None
+        self._submission_engine = None
+        self._checkpoint = None
+        # (submit_solver_object, submit_problem_object, iteration, future) in submission order
+        self._pending_submissions = []
+        self._poller = None
+        # job_id -> job with its results downloaded, filled while collecting the details
+        self._prefetched_jobs = {}
+
+    @classmethod
+    def load(cls, experiment_id, checkpoint_dir, **kwargs):
+        """
+        Recreate a submitted experiment from its checkpoint, without resubmitting any job
 
-    def __submit_one_problem_num_iterations_times(
-        self, solver, problem, submit_problem_object_list
-    ):
-        """Submit one problem to a solver num_iterations times
+        The returned experiment can be polled and reported on as usual
+        (wait_until_completed, get_experiment_details, ...).
+
+        Args:
+            experiment_id (str): Id of the experiment to load.
+            checkpoint_dir (str): Folder holding the checkpoints, as given to the constructor.
+            kwargs: Other Experiment constructor arguments (e.g. job_store_dir).
 
         Returns:
-            submit_problem_object_list: contains an updated list of submit_problem_object
+            experiment: the loaded Experiment
         """
         logger.debug("()")
-        submit_iteration_list = []
-        # Iterate over num_iterations
-        for i in range(self.num_iterations):
-            # Submit job
+        checkpoint = ExperimentCheckpoint(checkpoint_dir, experiment_id)
+        experiment_record, submit_solver_object_list, job_id_list = checkpoint.load()
+        experiment = cls(
+            [],
+            [],
+            experiment_id=experiment_id,
+            checkpoint_dir=checkpoint_dir,
+            **kwargs,
+        )
+        if experiment_record is not None:
+            experiment.date = datetime.fromisoformat(experiment_record["date"])
+            experiment.num_iterations = experiment_record["num_iterations"]
+        experiment.experiment = submit_solver_object_list
+        experiment.job_id_list = job_id_list
+        logger.debug("- Return")
+        return experiment
+
+    @classmethod
+    def from_workspace(cls, experiment_id, workspace=None, **kwargs):
+        """
+        Recreate an experiment from the jobs of the workspace tagged with its experiment_id
+
+        Jobs submitted by Experiment.submit carry the experiment_id, solver index, problem
+        index and iteration in their metadata, so the whole experiment can be rebuilt from
+        a single workspace job listing, e.g. on another machine.
+
+        Jobs submitted without metadata are missing from the recreated experiment: jobs
+        of a problem whose upload failed (submitted as an in-memory Problem) and jobs of
+        solvers overriding Solver.submit (e.g. Toshiba). A warning is logged when such a
+        job is submitted, see SubmissionEngine.submit_with_metadata.
+
+        Args:
+            experiment_id (str): Id of the experiment to recreate.
+            workspace (Workspace): The workspace to list the jobs from, defaults to azure_config.WORKSPACE.
+            kwargs: Other Experiment constructor arguments (e.g. job_store_dir).
+
+        Returns:
+            experiment: the recreated Experiment
+        """
+        logger.debug("()")
+        experiment = cls([], [], experiment_id=experiment_id, **kwargs)
+        if workspace is not None:
+            experiment.workspace = workspace
+
+        date = None
+        problems = {}
+        jobs = {}
+        experiment_jobs = []
+        for job in experiment.workspace.list_jobs():
+            metadata = job.details.metadata or {}
+            if metadata.get("experiment_id") != experiment_id:
+                continue
             try:
-                job = solver.submit(problem)
-                self.job_id_list.append(job.id)
-                submit_iteration_list.append(job.id)
+                key = (
+                    int(metadata["solver_list_index"]),
+                    int(metadata["problem_list_index"]),
+                )
+                if key not in problems:
+                    problems[key] = {
+                        "solver": metadata["solver"],
+                        "input_data_uri": job.details.input_data_uri,
+                        "num_iterations": int(metadata["num_iterations"]),
+                    }
+                jobs.setdefault(key, []).append(
+                    {
+                        "iteration": int(metadata["iteration"]),
+                        "job_id": job.id,
+                        "input_params": job.details.input_params,
+                    }
+                )
+                date = metadata.get("date", date)
+                experiment_jobs.append(job)
             except Exception as e:
-                err_msg = f"Failed to submit {problem} to {type(solver)} at iteration {i}, error: {e}"
+                err_msg = f"Failed reading the experiment metadata of job: {job.id}, error: {e}"
                 logger.error(err_msg)
+
+        (
+            experiment.experiment,
+            experiment.job_id_list,
+        ) = ExperimentCheckpoint.build_experiment(problems, jobs)
+        if date is not None:
+            experiment.date = datetime.fromisoformat(date)
+        if len(problems) != 0:
+            experiment.num_iterations = max(
+                record["num_iterations"] for record in problems.values()
+            )
+        # The listing already tells which jobs have finished, so they are not polled again
+        poller = experiment.__get_poller()
+        for job in experiment_jobs:
+            if job.has_completed():
+                poller.mark_completed(job)
+        logger.debug("- Return")
+        return experiment
+
+    def __upload_problem(self, problem, solver):
+        """Upload an in-memory problem once and return an OnlineProblem pointing to its blob
+
+        Every solver and iteration is then submitted against the same blob instead of
+        serializing and uploading the problem again. Problems that are already online
+        are returned unchanged.
+        """
+        logger.debug("()")
+        # Local solvers take the problem as it is
+        if isinstance(solver, LocalSolver) or not isinstance(problem, Problem):
+            logger.debug("- Return")
+            return problem
+        # Validate the problem against the solver, as solver.submit does for a Problem
+        solver.check_valid_problem(problem)
+        # Problem.upload resets on add_term(s), so uploaded_blob_uri is only set while the blob is current
+        if problem.uploaded_blob_uri is None:
+            try:
+                blob_name = f"{self.experiment_id}_{problem.name}_{uuid.uuid4()}"
+                problem.upload(self.workspace, blob_name=blob_name)
+            except Exception as e:
+                err_msg = f"Failed to upload {problem}, each submission will upload it instead, error: {e}"
+                logger.error(err_msg)
+                logger.debug("- Return")
+                return problem
+        online_problem = OnlineProblem(
+            name=problem.name, blob_uri=problem.uploaded_blob_uri
+        )
+        logger.debug("- Return")
+        return online_problem
+
+    def __submit_one_problem_num_iterations_times(
+        self,
+        solver,
+        problem,
+        submit_problem_object_list,
+        solver_index,
+        solver_name,
+        problem_index,
+    ):
+        """Schedule the submission of one problem to a solver num_iterations times
+
+        The submit_problem_object is appended before the problem is validated and
+        uploaded, so it is recorded with no iterations when either fails and the
+        problems stay aligned with problem_list.
+
+        Returns:
+            submit_problem_object_list: contains an updated list of submit_problem_object
+            futures: contains (iteration, future) for every scheduled submission
+        """
+        logger.debug("()")
         submit_problem_object = {
-            "input_data_uri": problem.uploaded_blob_uri,
+            "input_data_uri": getattr(problem, "uploaded_blob_uri", None),
             "num_iterations": self.num_iterations,
-            "iterations": submit_iteration_list,
+            "iterations": [],
         }
         submit_problem_object_list.append(submit_problem_object)
+        try:
+            problem = self.__upload_problem(problem, solver)
+            submit_problem_object["input_data_uri"] = getattr(
+                problem, "uploaded_blob_uri", None
+            )
+        finally:
+            if self._checkpoint is not None:
+                self._checkpoint.write_problem(
+                    solver_index,
+                    solver_name,
+                    problem_index,
+                    submit_problem_object["input_data_uri"],
+                    self.num_iterations,
+                )
+        futures = []
+        # Iterate over num_iterations
+        for i in range(self.num_iterations):
+            metadata = {
+                "experiment_id": self.experiment_id,
+                "date": str(self.date),
+                "solver": solver_name,
+                "solver_list_index": str(solver_index),
+                "problem_list_index": str(problem_index),
+                "num_iterations": str(self.num_iterations),
+                "iteration": str(i),
+            }
+            future = self._submission_engine.submit(solver, problem, metadata)
+            if self._checkpoint is not None:
+                # Record every job as soon as it is submitted, whatever the order
+                future.add_done_callback(
+                    partial(self.__checkpoint_job, solver_index, problem_index, i)
+                )
+            futures.append((i, future))
         logger.debug("- Return")
-        return submit_problem_object_list, job
+        return submit_problem_object_list, submit_problem_object, futures
+
+    def __checkpoint_job(self, solver_index, problem_index, iteration, future):
+        """Append a submitted job to the checkpoint, called when its submission finishes"""
+        try:
+            job = future.result()
+            self._checkpoint.write_job(
+                solver_index, problem_index, iteration, job.id, job.details.input_params
+            )
+        except Exception as e:
+            # Failed submissions are reported when the submissions are collected
+            logger.debug(f"No job to checkpoint, error: {e}")
 
     def __submit_problems_in_problem_list(self, solver, submit_solver_object_list):
-        """Submit problems in the problem list to a solver
+        """Schedule the submission of the problems in the problem list to a solver
 
         Returns:
             submit_solver_object_list: contains an updated list of submit_solver_object
         """
         logger.debug("()")
         submit_problem_object_list = []
+        solver_type = type(solver)
+        solver_name = solver_type.__module__ + "." + solver_type.__name__
+        # input_params is filled in from the first job once the submissions are collected
+        submit_solver_object = {
+            "solver": solver_name,
+            "input_params": None,
+            "problems": submit_problem_object_list,
+        }
         # Iterate over list of problems
-        for problem in self.problem_list:
+        for problem_index, problem in enumerate(self.problem_list):
             try:
                 (
                     submit_problem_object_list,
-                    job,
+                    submit_problem_object,
+                    futures,
                 ) = self.__submit_one_problem_num_iterations_times(
-                    solver, problem, submit_problem_object_list
+                    solver,
+                    problem,
+                    submit_problem_object_list,
+                    len(submit_solver_object_list),
+                    solver_name,
+                    problem_index,
                 )
+                for i, future in futures:
+                    self._pending_submissions.append(
+                        (submit_solver_object, submit_problem_object, i, future)
+                    )
             except Exception as e:
                 err_msg = f"Failed to submit problem {problem}, error: {e}"
                 logger.error(err_msg)
 
-        solver_type = type(solver)
-        solver_name = solver_type.__module__ + "." + solver_type.__name__
-        submit_solver_object = {
-            "solver": solver_name,
-            "input_params": job.details.input_params,
-            "problems": submit_problem_object_list,
-        }
         submit_solver_object_list.append(submit_solver_object)
         logger.debug("- Return")
 
         return submit_solver_object_list
 
-    def submit(self):
-        """Submit all problems to be solved on all solvers"""
-        # Construct a list for storing submit_solver_object
+    def __collect_submitted_jobs(self):
+        """Wait for the scheduled submissions and record the job ids in submission order"""
         logger.debug("()")
-        submit_solver_object_list = []
-
-        # Iterate over list of solvers
-        for solver in self.solver_list:
+        for (
+            submit_solver_object,
+            submit_problem_object,
+            i,
+            future,
+        ) in self._pending_submissions:
             try:
-                submit_solver_object_list = self.__submit_problems_in_problem_list(
-                    solver, submit_solver_object_list
-                )
+                job = future.result()
+                if isinstance(job, LocalJob):
+                    self.__add_local_job(job)
+                self.job_id_list.append(job.id)
+                submit_problem_object["iterations"].append(job.id)
+                if submit_solver_object["input_params"] is None:
+                    submit_solver_object["input_params"] = job.details.input_params
             except Exception as e:
-                err_msg = f"Failed to submit problems to {type(solver)} , error: {e}"
+                err_msg = f"Failed to submit problem to {submit_solver_object['solver']} at iteration {i}, error: {e}"
                 logger.error(err_msg)
+        self._pending_submissions = []
+        logger.debug("- Return")
+
+    def __add_local_job(self, job):
+        """Make a job of a local solver available through the workspace of the experiment"""
+        if not isinstance(self.workspace, LocalWorkspace):
+            self.workspace = LocalWorkspace(self.workspace)
+        self.workspace.add_job(job)
+
+    def submit(self):
+        """Submit all problems to be solved on all solvers
+
+        Submissions run concurrently on a pool of max_workers threads (at most
+        max_workers_per_target at a time for a single target), while job_id_list
+        and the experiment structure are filled in solver, problem, iteration order.
+        """
+        # Construct a list for storing submit_solver_object
+        logger.debug("()")
+        submit_solver_object_list = []
+        if self.checkpoint_dir is not None:
+            self._checkpoint = ExperimentCheckpoint(self.checkpoint_dir, self.experiment_id)
+            self._checkpoint.write_experiment(self.date, self.num_iterations)
+
+        with SubmissionEngine(
+            max_workers=self.max_workers,
+            max_workers_per_target=self.max_workers_per_target,
+        ) as self._submission_engine:
+            # Iterate over list of solvers
+            for solver in self.solver_list:
+                try:
+                    submit_solver_object_list = self.__submit_problems_in_problem_list(
+                        solver, submit_solver_object_list
+                    )
+                except Exception as e:
+                    err_msg = f"Failed to submit problems to {type(solver)} , error: {e}"
+                    logger.error(err_msg)
+            self.__collect_submitted_jobs()
+        self._submission_engine = None
         self.experiment = submit_solver_object_list
         logger.debug("- Return")
 
+    def __get_poller(self):
+        """Return the JobPoller tracking job_id_list, creating it if needed
+
+        The poller remembers jobs that reached a terminal state, so only pending
+        jobs are polled again.
+        """
+        if self._poller is None or self._poller.workspace is not self.workspace:
+            self._poller = JobPoller(
+                self.workspace, created_after=self.date.date(), **self.poller_options
+            )
+        self._poller.track(self.job_id_list)
+        if self.job_store is not None:
+            # Jobs in the job store have finished and need no polling
+            for job_id in list(self._poller.pending):
+                job = self.job_store.get_job(job_id, self.workspace)
+                if job is not None:
+                    self._poller.mark_completed(job)
+        return self._poller
+
     def has_completed(self) -> bool:
         """Return a boolean value indicating whether the experiment has finished"""
         logger.debug("()")
-        for job_id in self.job_id_list:
+        has_completed = self.__get_poller().has_completed()
+        logger.debug("- Return")
+        return has_completed
+
+    def wait_until_completed(self, timeout_secs=None, callback=None):
+        """Wait until the experiment has finished
+
+        Pending jobs are polled in batches with exponential backoff between rounds,
+        see JobPoller for the options that can be set through poller_options.
+
+        Args:
+            timeout_secs (float): Raise TimeoutError after waiting this long.
+            callback (function): Called with the details of every job (see
+                get_job_details) as soon as the job has finished.
+        """
+        logger.debug("()")
+        if callback is None:
+            self.__get_poller().wait_until_completed(timeout_secs=timeout_secs)
+        else:
+            for job_details in self.iter_completed(timeout_secs=timeout_secs):
+                callback(job_details)
+        logger.debug("- Return")
+
+    def __get_job_contexts(self):
+        """Get the solver, problem and experiment objects of every job in the experiment
+
+        Returns:
+            job_contexts: dictionary from job_id to (solver, problem, experiment), as
+                passed to get_job_details by get_experiment_details
+        """
+        logger.debug("()")
+        job_contexts = {}
+        solver_list_length = len(self.experiment)
+        for solver_list_index, solver_object in enumerate(self.experiment):
+            solver = {
+                "class_name": solver_object["solver"],
+                "input_params": solver_object["input_params"],
+            }
+            problems = solver_object["problems"]
+            for problem_list_index, problem_object in enumerate(problems):
+                problem = {
+                    "qubo_size": "qubo_size",
+                    "qubo_density": "qubo_density",
+                }
+                for iteration_index, job_id in enumerate(problem_object["iterations"]):
+                    experiment = {
+                        "experiment_id": self.experiment_id,
+                        "date": str(self.date),
+                        "num_iterations": problem_object["num_iterations"],
+                        "iteration": iteration_index,
+                        "solver_list_length": solver_list_length,
+                        "solver_list_index": solver_list_index,
+                        "problem_list_length": len(problems),
+                        "problem_list_index": problem_list_index,
+                    }
+                    job_contexts[job_id] = (solver, problem, experiment)
+        logger.debug("- Return")
+        return job_contexts
+
+    def iter_completed(self, timeout_secs=None):
+        """
+        Yield the details of every job as soon as it has finished (Succeeded, Failed or Cancelled)
+
+        Jobs are yielded in the order they are seen to finish, jobs that had already
+        finished come first.
+
+        Yields:
+            job_details: details object created by get_job_details()
+        """
+        logger.debug("()")
+        job_contexts = self.__get_job_contexts()
+        poller = self.__get_poller()
+        finished_jobs = list(poller.completed.values())
+        for jobs in (finished_jobs, poller.iter_poll(timeout_secs=timeout_secs)):
+            for finished_job in jobs:
+                if finished_job.id not in job_contexts:
+                    continue
+                try:
+                    job = self.__get_job(finished_job.id)
+                    job_details = self.get_job_details(
+                        job, *job_contexts[finished_job.id]
+                    )
+                except Exception as e:
+                    err_msg = f"Failed getting the job details, job_id: {finished_job.id}, error: {e}"
+                    logger.error(err_msg)
+                    continue
+                yield job_details
+        logger.debug("- Return")
+
+    def __get_job(self, job_id):
+        """Return a job, without calling the workspace when it is known to have finished
+
+        Finished jobs are taken from the job store (with their results) or from the
+        poller. Jobs fetched from the workspace that have finished are added to the
+        job store together with their results; a job whose results cannot be
+        downloaded is not stored, so it is fetched again next time.
+        """
+        logger.debug("()")
+        if self.job_store is not None:
+            job = self.job_store.get_job(job_id, self.workspace)
+            if job is not None:
+                logger.debug("- Return")
+                return job
+        job = None
+        if self._poller is not None:
+            job = self._poller.completed.get(job_id)
+        if job is None:
+            job = self.workspace.get_job(job_id)
+        if self.job_store is not None and job.has_completed():
             try:
-                job = self.workspace.get_job(job_id)
-                if not job.has_completed():
-                    return False
+                results = None
+                if job.details.status == "Succeeded":
+                    results = job.get_results()
+                    # Job.get_results does not keep the downloaded results
+                    job.results = results
+                self.job_store.put_job(job, results)
             except Exception as e:
-                err_msg = f"Failed to get the job details, job_id: {job_id}, error: {e}"
+                err_msg = f"Failed storing the job: {job_id}, error: {e}"
                 logger.error(err_msg)
         logger.debug("- Return")
-        return True
+        return job
 
-    def wait_until_completed(self):
-        """Wait until the experiment has finished"""
+    def write_experiment_details(self, file, format="csv"):
+        """
+        Write the details for the experiment to a file-like object, one job at a time
+
+        Every job is written as soon as it is fetched, so memory use does not grow
+        with the number of jobs.
+
+        Args:
+            file: A text file-like object (anything with a write method).
+            format (str): "csv" (see get_experiment_details_as_string) or "jsonl"
+                (one JSON object per job, see get_job_report_row).
+        """
         logger.debug("()")
+        writer = ReportWriter(file, format=format)
+        writer.write_header()
         for job_id in self.job_id_list:
             try:
-                job = self.workspace.get_job(job_id)
-                job.wait_until_completed()
+                job = self.__get_job(job_id)
+                if writer.format == "csv":
+                    writer.write(self.get_job_details_as_string(job))
+                else:
+                    writer.write_row(self.get_job_report_row(job))
             except Exception as e:
                 err_msg = f"Failed to get the job details, job_id: {job_id}, error: {e}"
                 logger.error(err_msg)
@@ -135,77 +558,114 @@ class Experiment:
     def get_experiment_details_as_string(self) -> str:
         """Get the details for the experiment as a string (CSV)"""
         logger.debug("()")
-        results = "\ncreation_time, id, target, status, total_time, queue_time, execution_time, cost, error_message"
-        for job_id in self.job_id_list:
-            try:
-                job = self.workspace.get_job(job_id)
-                results += self.get_job_details_as_string(job)
-            except Exception as e:
-                err_msg = f"Failed to get the job details, job_id: {job_id}, error: {e}"
-                logger.error(err_msg)
+        results = io.StringIO()
+        self.write_experiment_details(results, format="csv")
         logger.debug("- Return")
-        return results
+        return results.getvalue()
 
-    def get_job_details_as_string(self, job) -> str:
-        """Get the details for a job as a string (CSV)"""
-        logger.debug("()")
-        id = job.id
-        target = job.details.target
-        status = job.details.status
+    @staticmethod
+    def get_job_times(job):
+        """
+        Get the execution, queue and total time of a job, in seconds
+
+        Returns:
+            job_times: dictionary holding the execution_time, queue_time and total_time
+                that are known for the status of the job
+        """
         creation_time = job.details.creation_time
         begin_execution_time = job.details.begin_execution_time
         end_execution_time = job.details.end_execution_time
         cancellation_time = job.details.cancellation_time
+        status = job.details.status
 
-        execution_time = "null"
-        queue_time = "null"
-        total_time = "null"
-        cost = "null"
-        error_message = "null"
-
-        if status == "Succeeded":
+        job_times = {}
+        if status == "Succeeded" or (
+            status == "Failed"
+            and begin_execution_time is not None
+            and end_execution_time is not None
+        ):
             execution_time = end_execution_time - begin_execution_time
-            execution_time = execution_time.total_seconds()
+            job_times["execution_time"] = execution_time.total_seconds()
             queue_time = begin_execution_time - creation_time
-            queue_time = queue_time.total_seconds()
+            job_times["queue_time"] = queue_time.total_seconds()
             total_time = end_execution_time - creation_time
-            total_time = total_time.total_seconds()
-            results = job.get_results()
-            cost = results["solutions"][0]["cost"]
-        elif status == "Failed":
-            if begin_execution_time is not None and end_execution_time is not None:
-                execution_time = end_execution_time - begin_execution_time
-                execution_time = execution_time.total_seconds()
-                queue_time = begin_execution_time - creation_time
-                queue_time = queue_time.total_seconds()
-                total_time = end_execution_time - creation_time
-                total_time = total_time.total_seconds()
-
-            error_data = str(job.details.error_data).replace("'", '"')
-            error_data = json.loads(error_data)
-            error_message = error_data["message"]
-
-            error_message = error_message.replace("\n", "")
-            error_message = error_message.strip()
-            error_message = f'"{error_message}"'
-
+            job_times["total_time"] = total_time.total_seconds()
         elif status == "Cancelled":
             if begin_execution_time is not None:
                 execution_time = cancellation_time - begin_execution_time
-                execution_time = execution_time.total_seconds()
+                job_times["execution_time"] = execution_time.total_seconds()
                 queue_time = begin_execution_time - creation_time
-                queue_time = queue_time.total_seconds()
-
+                job_times["queue_time"] = queue_time.total_seconds()
             total_time = cancellation_time - creation_time
-            total_time = total_time.total_seconds()
+            job_times["total_time"] = total_time.total_seconds()
         elif status == "Executing":
             queue_time = begin_execution_time - creation_time
-            queue_time = queue_time.total_seconds()
-        elif status == "Waiting":
-            pass
+            job_times["queue_time"] = queue_time.total_seconds()
+        return job_times
+
+    def get_job_report_row(self, job):
+        """
+        Get the report row for a job, values missing for its status are None
+
+        Returns:
+            row: dictionary with the ReportWriter.FIELDS keys
+        """
+        logger.debug("()")
+        row = dict.fromkeys(ReportWriter.FIELDS)
+        row.update(
+            {
+                "creation_time": str(job.details.creation_time),
+                "id": job.id,
+                "target": job.details.target,
+                "status": job.details.status,
+            }
+        )
+        row.update(self.get_job_times(job))
+
+        if job.details.status == "Succeeded":
+            results = job.get_results()
+            row["cost"] = results["solutions"][0]["cost"]
+        elif job.details.status == "Failed":
+            error_data = str(job.details.error_data).replace("'", '"')
+            error_data = json.loads(error_data)
+            error_message = error_data["message"]
+            row["error_message"] = error_message.replace("\n", "").strip()
         logger.debug("- Return")
+        return row
 
-        return f"\n{creation_time}, {id}, {target}, {status}, {total_time}, {queue_time}, {execution_time}, {cost}, {error_message}"
+    def get_job_details_as_string(self, job) -> str:
+        """Get the details for a job as a string (CSV)"""
+        logger.debug("()")
+        line = ReportWriter.to_csv(self.get_job_report_row(job))
+        logger.debug("- Return")
+        return line
+
+    def __prefetch_job(self, job_id):
+        """Get a job and download its results, returns None if either fails"""
+        try:
+            job = self.__get_job(job_id)
+            if job.details.status == "Succeeded" and job.results is None:
+                job.results = job.get_results()
+            return job
+        except Exception:
+            # The job is fetched again while assembling the details, which reports the error
+            return None
+
+    def __prefetch_jobs(self, job_ids):
+        """Get the jobs and download their output blobs concurrently on download_workers threads
+
+        Returns:
+            jobs: dictionary from job_id to job, for the jobs that could be fetched
+        """
+        logger.debug("()")
+        jobs = {}
+        if len(job_ids) != 0:
+            with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+                for job_id, job in zip(job_ids, executor.map(self.__prefetch_job, job_ids)):
+                    if job is not None:
+                        jobs[job_id] = job
+        logger.debug("- Return")
+        return jobs
 
     def __get_job_details_in_submit_iteration_list(
         self,
@@ -220,7 +680,9 @@ class Experiment:
         logger.debug("()")
         for job_id in submit_iteration_list:
             try:
-                job = self.workspace.get_job(job_id)
+                job = self._prefetched_jobs.get(job_id)
+                if job is None:
+                    job = self.__get_job(job_id)
                 experiment_details_list.append(
                     self.get_job_details(job, solver, problem, experiment)
                 )
@@ -326,11 +788,15 @@ class Experiment:
         solver_list_index = 0
         solver_list_length = len(self.experiment)
         if solver_list_length != 0:
-            self.__get_solver_objects_details(
-                solver_list_length,
-                solver_list_index,
-                experiment_details_list,
-            )
+            self._prefetched_jobs = self.__prefetch_jobs(self.job_id_list)
+            try:
+                self.__get_solver_objects_details(
+                    solver_list_length,
+                    solver_list_index,
+                    experiment_details_list,
+                )
+            finally:
+                self._prefetched_jobs = {}
             return experiment_details_list
         else:
             err_msg = "Empty problem list"
@@ -338,6 +804,19 @@ class Experiment:
             raise Exception(err_msg)
         logger.debug("- Return")
 
+    def to_table(self):
+        """
+        Get the details for the experiment as a flat, typed, columnar table
+
+        Returns:
+            table: a ResultTable (numpy columns), which can be exported with
+                to_arrow(), to_parquet(path) or to_feather(path)
+        """
+        logger.debug("()")
+        table = ResultTable.from_job_details(self.get_experiment_details())
+        logger.debug("- Return")
+        return table
+
     def get_job_details(self, job, solver, problem, experiment):
         """
         Get the details for a job
@@ -402,11 +881,6 @@ class Experiment:
             }
         """
         logger.debug("()")
-        creation_time = job.details.creation_time
-        begin_execution_time = job.details.begin_execution_time
-        end_execution_time = job.details.end_execution_time
-        cancellation_time = job.details.cancellation_time
-
         try:
             input_data_uri = job.details.input_data_uri.split("?")[0]
             output_data_uri = job.details.output_data_uri
@@ -422,7 +896,7 @@ class Experiment:
             "id": job.id,
             "target": job.details.target,
             "status": job.details.status,
-            "creation_time": str(creation_time),
+            "creation_time": str(job.details.creation_time),
             "input_data_uri": input_data_uri,
             "output_data_uri": output_data_uri,
             "problem": problem,
@@ -430,14 +904,12 @@ class Experiment:
             "experiment": experiment,
         }
 
-        if job.details.status == "Succeeded":
-            execution_time = end_execution_time - begin_execution_time
-            execution_time = execution_time.total_seconds()
-            queue_time = begin_execution_time - creation_time
-            queue_time = queue_time.total_seconds()
-            total_time = end_execution_time - creation_time
-            total_time = total_time.total_seconds()
+        # Times are reported in seconds, as strings
+        result_object.update(
+            {name: str(value) for name, value in self.get_job_times(job).items()}
+        )
 
+        if job.details.status == "Succeeded":
             try:
                 output_data = job.get_results()
 
@@ -463,31 +935,12 @@ class Experiment:
 
             result_object.update(
                 {
-                    "execution_time": str(execution_time),
-                    "queue_time": str(queue_time),
-                    "total_time": str(total_time),
                     "cost": cost,
                     "parameters": parameters,
                 }
             )
 
         elif job.details.status == "Failed":
-            if begin_execution_time is not None and end_execution_time is not None:
-                execution_time = end_execution_time - begin_execution_time
-                execution_time = execution_time.total_seconds()
-                queue_time = begin_execution_time - creation_time
-                queue_time = queue_time.total_seconds()
-                total_time = end_execution_time - creation_time
-                total_time = total_time.total_seconds()
-
-                result_object.update(
-                    {
-                        "execution_time": str(execution_time),
-                        "queue_time": str(queue_time),
-                        "total_time": str(total_time),
-                    }
-                )
-
             error_data = str(job.details.error_data).replace("'", '"')
             error_data = json.loads(error_data)
 
@@ -497,39 +950,5 @@ class Experiment:
                 }
             )
 
-        elif job.details.status == "Cancelled":
-            if begin_execution_time is not None:
-                execution_time = cancellation_time - begin_execution_time
-                execution_time = execution_time.total_seconds()
-                queue_time = begin_execution_time - creation_time
-                queue_time = queue_time.total_seconds()
-
-                result_object.update(
-                    {
-                        "execution_time": str(execution_time),
-                        "queue_time": str(queue_time),
-                    }
-                )
-            total_time = cancellation_time - creation_time
-            total_time = total_time.total_seconds()
-
-            result_object.update(
-                {
-                    "total_time": str(total_time),
-                }
-            )
-
-        elif job.details.status == "Executing":
-            queue_time = begin_execution_time - creation_time
-
-            result_object.update(
-                {
-                    "queue_time": str(queue_time),
-                }
-            )
-
-        elif job.details.status == "Waiting":
-            pass
-
         logger.debug("- Return")
         return result_object
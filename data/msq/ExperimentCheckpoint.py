@@ -0,0 +1,164 @@
+import os
+import json
+import threading
+import logging.config
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class ExperimentCheckpoint:
+    """An append-only JSON Lines file recording the submission state of an experiment
+
+    Every record is appended as soon as it is known, so the jobs submitted
+    before the driver process dies can be recovered without resubmitting them.
+    Records are one of:
+        {"record": "experiment", "experiment_id", "date", "num_iterations"}
+        {"record": "problem", "solver_index", "solver", "problem_index", "input_data_uri", "num_iterations"}
+        {"record": "job", "solver_index", "problem_index", "iteration", "job_id", "input_params"}
+    """
+
+    def __init__(self, directory, experiment_id):
+        """
+        Initialize the ExperimentCheckpoint.
+
+        Args:
+            directory (str): Folder holding the checkpoints. It is created if it does not exist.
+            experiment_id (str): Id of the experiment, used as the file name.
+        """
+        self.directory = directory
+        self.experiment_id = experiment_id
+        self.path = os.path.join(directory, f"{experiment_id}.jsonl")
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def _write(self, record):
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line)
+
+    def write_experiment(self, date, num_iterations):
+        self._write(
+            {
+                "record": "experiment",
+                "experiment_id": self.experiment_id,
+                "date": str(date),
+                "num_iterations": num_iterations,
+            }
+        )
+
+    def write_problem(
+        self, solver_index, solver, problem_index, input_data_uri, num_iterations
+    ):
+        self._write(
+            {
+                "record": "problem",
+                "solver_index": solver_index,
+                "solver": solver,
+                "problem_index": problem_index,
+                "input_data_uri": input_data_uri,
+                "num_iterations": num_iterations,
+            }
+        )
+
+    def write_job(self, solver_index, problem_index, iteration, job_id, input_params):
+        self._write(
+            {
+                "record": "job",
+                "solver_index": solver_index,
+                "problem_index": problem_index,
+                "iteration": iteration,
+                "job_id": job_id,
+                "input_params": input_params,
+            }
+        )
+
+    def load(self):
+        """
+        Rebuild the submission state from the checkpoint file.
+
+        Returns:
+            experiment_record: the "experiment" record, None if it is missing
+            experiment: the nested solver/problem/iterations structure, as in Experiment.experiment
+            job_id_list: the job ids in solver, problem, iteration order
+        """
+        logger.debug("()")
+        if not self.exists():
+            err_msg = f"No checkpoint found for experiment {self.experiment_id} in {self.directory}"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+
+        experiment_record = None
+        problems = {}
+        jobs = {}
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partially written last line, left by a crash while writing
+                    logger.error(f"Ignoring a corrupt checkpoint record: {line!r}")
+                    continue
+                if record["record"] == "experiment":
+                    experiment_record = record
+                elif record["record"] == "problem":
+                    problems[(record["solver_index"], record["problem_index"])] = record
+                elif record["record"] == "job":
+                    key = (record["solver_index"], record["problem_index"])
+                    jobs.setdefault(key, []).append(record)
+
+        experiment, job_id_list = ExperimentCheckpoint.build_experiment(problems, jobs)
+        logger.debug("- Return")
+        return experiment_record, experiment, job_id_list
+
+    @staticmethod
+    def build_experiment(problems, jobs):
+        """
+        Build the nested experiment structure from problem and job records.
+
+        Args:
+            problems (dict): (solver_index, problem_index) -> "problem" record.
+            jobs (dict): (solver_index, problem_index) -> list of "job" records.
+
+        Returns:
+            experiment: the nested solver/problem/iterations structure, as in Experiment.experiment
+            job_id_list: the job ids in solver, problem, iteration order
+        """
+        submit_solver_objects = {}
+        for (solver_index, problem_index), record in sorted(problems.items()):
+            if solver_index not in submit_solver_objects:
+                submit_solver_objects[solver_index] = {
+                    "solver": record["solver"],
+                    "input_params": None,
+                    "problems": [],
+                }
+            submit_solver_object = submit_solver_objects[solver_index]
+            job_records = sorted(
+                jobs.get((solver_index, problem_index), []),
+                key=lambda job_record: job_record["iteration"],
+            )
+            if submit_solver_object["input_params"] is None and len(job_records) != 0:
+                submit_solver_object["input_params"] = job_records[0]["input_params"]
+            submit_solver_object["problems"].append(
+                {
+                    "input_data_uri": record["input_data_uri"],
+                    "num_iterations": record["num_iterations"],
+                    "iterations": [job_record["job_id"] for job_record in job_records],
+                }
+            )
+
+        experiment = [submit_solver_objects[i] for i in sorted(submit_solver_objects)]
+        job_id_list = [
+            job_id
+            for submit_solver_object in experiment
+            for problem_object in submit_solver_object["problems"]
+            for job_id in problem_object["iterations"]
+        ]
+        return experiment, job_id_list
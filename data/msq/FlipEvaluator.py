@@ -0,0 +1,227 @@
+import numpy as np
+import logging.config
+from .ArrayPolynomial import ArrayPolynomial
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class FlipEvaluator(object):
+    """Keep the energy of an assignment up to date while single variables are flipped
+
+    Variables are addressed by position: position k holds variable var_list[k].
+    A (replicas, positions) assignment follows many assignments at once, flips then
+    apply to a subset of the replicas and energies and deltas have a replica axis.
+    Every term keeps a running state (the number of variables at 0 for the binary
+    encoding, the product of its spins for the spin encoding) and every variable
+    keeps a local field, so the energy change of a flip is read in O(1) and a flip
+    updates the terms of the flipped variable and their other variables only.
+
+    Binary encoding: local_fields[k] is the sum of the coefficients of the terms of
+        variable k whose other variables are all 1, flipping k changes the energy by
+        local_fields[k] going to 1 and -local_fields[k] going to 0.
+    Spin encoding: local_fields[k] is the sum of c * (product of the other spins) over
+        the terms of variable k, flipping k changes the energy by -2 * s_k * local_fields[k].
+    """
+
+    def __init__(self, poly, x=None, var_list=None, encoding="binary"):
+        """
+        The constructor for FlipEvaluator class.
+
+        Args:
+           poly: The Polynomial or ArrayPolynomial to evaluate.
+           x (numpy): The starting assignment, one value per position. Defaults to all 0 (binary) or all 1 (spin).
+           var_list (list): The variable at every position. Defaults to the variables of the polynomial.
+           encoding (str): "binary" for values in {0, 1}, "spin" for values in {-1, 1}.
+        """
+        logger.debug("()")
+        if encoding not in ArrayPolynomial.ENCODINGS:
+            err_msg = f"Unsupported encoding: {encoding}, expected one of {list(ArrayPolynomial.ENCODINGS)}"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        array_poly = poly if isinstance(poly, ArrayPolynomial) else poly.to_arrays()
+        if var_list is None:
+            var_list = array_poly.var_list
+        self.var_list = list(var_list)
+        self.encoding = encoding
+        self.constant_term = array_poly.constant_term
+
+        # Terms in CSR form, with variable positions instead of variable indices
+        coefficients, indices, offsets = array_poly.to_csr()
+        self.coefficients = coefficients
+        self.term_positions = array_poly._columns(len(self.var_list), self.var_list)[
+            indices
+        ]
+        self.term_offsets = offsets
+        term_count = len(coefficients)
+        lengths = np.diff(offsets)
+        pair_terms = np.repeat(np.arange(term_count), lengths)
+
+        # For every position, the (term, other position) pairs of its terms:
+        # every entry of a term is paired with the entries of the same term
+        pair_lengths = lengths[pair_terms]
+        owners = np.repeat(np.arange(len(pair_terms)), pair_lengths)
+        members = np.repeat(offsets[pair_terms], pair_lengths) + (
+            np.arange(len(owners))
+            - np.repeat(np.cumsum(pair_lengths) - pair_lengths, pair_lengths)
+        )
+        others = owners != members
+        owners, members = owners[others], members[others]
+        owner_positions = self.term_positions[owners]
+        order = np.argsort(owner_positions, kind="stable")
+        self._pair_terms = pair_terms[owners][order]
+        self._pair_positions = self.term_positions[members][order]
+        self._pair_offsets = np.searchsorted(
+            owner_positions[order], np.arange(len(self.var_list) + 1)
+        )
+
+        # Terms of every position
+        order = np.argsort(self.term_positions, kind="stable")
+        self._var_terms = pair_terms[order]
+        self._var_offsets = np.searchsorted(
+            self.term_positions[order], np.arange(len(self.var_list) + 1)
+        )
+
+        if x is None:
+            x = np.full(len(self.var_list), 0 if encoding == "binary" else 1)
+        self.reset(x)
+        logger.debug("- Return")
+
+    @property
+    def x(self):
+        """The assignment, (positions,) or (replicas, positions) for a batch"""
+        return self._x[0] if self._single else self._x
+
+    @property
+    def energy(self):
+        """The energy of the assignment, a (replicas,) array for a batch"""
+        return float(self._energy[0]) if self._single else self._energy
+
+    @property
+    def local_fields(self):
+        """The local field of every position, (replicas, positions) for a batch"""
+        return self._local_fields[0] if self._single else self._local_fields
+
+    def reset(self, x):
+        """
+        Set a new assignment and recompute the energy, term states and local fields.
+
+        Args:
+           x (numpy): The assignment, one value per position, or a (replicas, positions)
+               array to follow many assignments at once.
+        """
+        x = np.array(x, dtype=np.int8)
+        self._single = x.ndim == 1
+        x = np.atleast_2d(x)
+        if x.ndim != 2 or x.shape[1] != len(self.var_list):
+            err_msg = f"The assignment should have {len(self.var_list)} values, got {x.shape[-1]}"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        if not np.isin(x, ArrayPolynomial.ENCODINGS[self.encoding]).all():
+            err_msg = f"Assignments should only hold the values {ArrayPolynomial.ENCODINGS[self.encoding]} for the {self.encoding} encoding"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        self._x = x
+        replicas = np.arange(len(x))[:, None]
+        values = x[:, self.term_positions]
+        starts = self.term_offsets[:-1]
+        pair_terms = np.repeat(
+            np.arange(len(self.coefficients)), np.diff(self.term_offsets)
+        )
+        local_fields = np.zeros(x.shape)
+        if self.encoding == "binary":
+            # Number of variables at 0 in every term
+            self._term_states = np.zeros((len(x), len(self.coefficients)), dtype=np.int64)
+            np.add.at(self._term_states, (replicas, pair_terms), 1 - values)
+            self._energy = self.constant_term + (self._term_states == 0) @ self.coefficients
+            others_zero = self._term_states[:, pair_terms] - (values == 0)
+            np.add.at(
+                local_fields,
+                (replicas, self.term_positions),
+                self.coefficients[pair_terms] * (others_zero == 0),
+            )
+        else:
+            # Product of the spins of every term
+            self._term_states = np.ones((len(x), len(self.coefficients)), dtype=np.int8)
+            if len(starts) != 0:
+                self._term_states = np.multiply.reduceat(values, starts, axis=1).astype(
+                    np.int8
+                )
+            self._energy = self.constant_term + self._term_states @ self.coefficients
+            np.add.at(
+                local_fields,
+                (replicas, self.term_positions),
+                self.coefficients[pair_terms] * self._term_states[:, pair_terms] * values,
+            )
+        self._local_fields = local_fields
+
+    def _deltas(self, position):
+        """Return the energy change of flipping a position, for every replica"""
+        x = self._x[:, position]
+        local_fields = self._local_fields[:, position]
+        if self.encoding == "binary":
+            return np.where(x == 0, local_fields, -local_fields)
+        return -2 * x * local_fields
+
+    def delta(self, position):
+        """Return the energy change of flipping the variable at a position, a (replicas,) array for a batch"""
+        deltas = self._deltas(position)
+        return float(deltas[0]) if self._single else deltas
+
+    def deltas(self):
+        """Return the energy change of flipping every position, as an array"""
+        if self.encoding == "binary":
+            deltas = np.where(self._x == 0, self._local_fields, -self._local_fields)
+        else:
+            deltas = -2 * self._x * self._local_fields
+        return deltas[0] if self._single else deltas
+
+    def flip(self, position, replicas=None):
+        """
+        Flip the variable at a position and update the energy, term states and local fields.
+
+        Args:
+           position (int): The position to flip.
+           replicas (numpy): For a batch, the replicas to flip, as indices or a boolean mask. Defaults to all.
+
+        Returns energy: the energy after the flip
+        """
+        if replicas is None:
+            replicas = np.arange(len(self._x))
+        else:
+            replicas = np.asarray(replicas)
+            if replicas.dtype == bool:
+                replicas = np.flatnonzero(replicas)
+        if len(replicas) != 0:
+            self._energy[replicas] += self._deltas(position)[replicas]
+            start, end = self._pair_offsets[position], self._pair_offsets[position + 1]
+            pair_terms = self._pair_terms[start:end]
+            pair_positions = self._pair_positions[start:end]
+            terms = self._var_terms[
+                self._var_offsets[position] : self._var_offsets[position + 1]
+            ]
+            rows = replicas[:, None]
+            x = self._x[replicas, position][:, None]
+            if self.encoding == "binary":
+                step = np.where(x == 0, -1, 1)
+                others_zero = self._term_states[rows, pair_terms] - (
+                    self._x[rows, pair_positions] == 0
+                )
+                change = (others_zero + step == 0).astype(np.int8) - (others_zero == 0)
+                self._term_states[rows, terms] += step
+                self._x[replicas, position] = 1 - self._x[replicas, position]
+            else:
+                change = (
+                    -2 * self._term_states[rows, pair_terms] * self._x[rows, pair_positions]
+                )
+                self._term_states[rows, terms] *= -1
+                self._x[replicas, position] = -self._x[replicas, position]
+            np.add.at(
+                self._local_fields,
+                (rows, pair_positions),
+                self.coefficients[pair_terms] * change,
+            )
+        return self.energy
@@ -0,0 +1,235 @@
+import time
+import random
+import logging.config
+from concurrent.futures import ThreadPoolExecutor
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class JobPoller:
+    """Poll the status of many jobs, only asking the workspace about jobs that have not finished yet"""
+
+    def __init__(
+        self,
+        workspace,
+        job_ids=None,
+        batch_size=50,
+        max_workers=8,
+        initial_interval=0.5,
+        max_interval=30,
+        backoff_factor=1.5,
+        jitter=0.1,
+        list_threshold=50,
+        created_after=None,
+        max_errors=3,
+    ):
+        """
+        Initialize the JobPoller.
+
+        Args:
+            workspace (Workspace): The workspace the jobs were submitted to.
+            job_ids (list): Ids of the jobs to poll.
+            batch_size (int): Maximum number of get_job calls made in one polling round.
+            max_workers (int): Number of threads used for the get_job calls of a round.
+            initial_interval (float): Seconds to wait after the first polling round.
+            max_interval (float): Upper bound for the wait between polling rounds.
+            backoff_factor (float): Factor applied to the wait after every round.
+            jitter (float): Relative random variation added to every wait.
+            list_threshold (int): Minimum number of pending jobs for which one
+                workspace.list_jobs call is used instead of one get_job call per job.
+                None disables listing.
+            created_after (datetime): Lower bound on the creation time of the jobs,
+                used to filter workspace.list_jobs.
+            max_errors (int): Number of consecutive failed lookups after which a job
+                is no longer polled.
+        """
+        self.workspace = workspace
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.list_threshold = list_threshold
+        self.created_after = created_after
+        self.max_errors = max_errors
+        # job_id -> Job, for jobs that reached a terminal state
+        self.completed = {}
+        # job_id -> number of consecutive failed lookups
+        self.errors = {}
+        self.pending = []
+        # Number of jobs fetched by id since the last wait between rounds
+        self._polled_since_wait = 0
+        # Whether the last polling round saw a job that is still running
+        self._running_seen = False
+        self.track(job_ids or [])
+
+    def track(self, job_ids):
+        """Add job ids to poll. Ids that are already known are ignored."""
+        known = set(self.pending) | set(self.completed) | set(self.abandoned)
+        for job_id in job_ids:
+            if job_id not in known:
+                self.pending.append(job_id)
+                known.add(job_id)
+
+    def mark_completed(self, job):
+        """Record a job known to have finished elsewhere, so it is not polled"""
+        self.completed[job.id] = job
+        if job.id in self.pending:
+            self.pending.remove(job.id)
+
+    @property
+    def abandoned(self):
+        """Ids of the jobs that could not be looked up max_errors times in a row"""
+        return [
+            job_id
+            for job_id, count in self.errors.items()
+            if count >= self.max_errors and job_id not in self.completed
+        ]
+
+    @classmethod
+    def is_terminal(cls, job):
+        return job.has_completed()
+
+    def _record(self, job_id, job):
+        """Remember a fetched job, return True if it reached a terminal state"""
+        self.errors.pop(job_id, None)
+        if self.is_terminal(job):
+            self.completed[job_id] = job
+            return True
+        self._running_seen = True
+        return False
+
+    def _record_error(self, job_id, e):
+        err_msg = f"Failed to get the job details, job_id: {job_id}, error: {e}"
+        logger.error(err_msg)
+        self.errors[job_id] = self.errors.get(job_id, 0) + 1
+
+    def _get_job(self, job_id):
+        try:
+            return job_id, self.workspace.get_job(job_id), None
+        except Exception as e:
+            return job_id, None, e
+
+    def _poll_by_id(self, batch=None):
+        """Fetch the next batch of pending jobs one by one"""
+        if batch is None:
+            batch = self.pending[: self.batch_size]
+            # Rotate so that the next round starts with the jobs that were not polled
+            self.pending = self.pending[len(batch) :] + batch
+            self._polled_since_wait += len(batch)
+        if len(batch) == 1:
+            results = [self._get_job(batch[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(self._get_job, batch))
+        for job_id, job, error in results:
+            if error is None:
+                self._record(job_id, job)
+            else:
+                self._record_error(job_id, error)
+
+    def _poll_by_listing(self):
+        """Fetch every pending job with a single workspace.list_jobs call"""
+        self._polled_since_wait = len(self.pending)
+        pending = set(self.pending)
+        for job in self.workspace.list_jobs(created_after=self.created_after):
+            if job.id in pending:
+                self._record(job.id, job)
+                pending.discard(job.id)
+        # Jobs missing from the listing are looked up individually
+        if len(pending) != 0:
+            missing = [job_id for job_id in self.pending if job_id in pending]
+            self._poll_by_id(missing[: self.batch_size])
+
+    def _use_listing(self):
+        return (
+            self.list_threshold is not None
+            and len(self.pending) >= self.list_threshold
+            and hasattr(self.workspace, "list_jobs")
+        )
+
+    def poll(self):
+        """
+        Run one polling round over the pending jobs.
+
+        Returns:
+            completed_jobs: jobs that reached a terminal state during this round
+        """
+        logger.debug("()")
+        known = set(self.completed)
+        self._running_seen = False
+        if self._use_listing():
+            try:
+                self._poll_by_listing()
+            except Exception as e:
+                err_msg = f"Failed to list the jobs, falling back to get_job, error: {e}"
+                logger.error(err_msg)
+                self._poll_by_id()
+        else:
+            self._poll_by_id()
+        abandoned = set(self.abandoned)
+        self.pending = [
+            job_id
+            for job_id in self.pending
+            if job_id not in self.completed and job_id not in abandoned
+        ]
+        completed_jobs = [
+            job for job_id, job in self.completed.items() if job_id not in known
+        ]
+        logger.debug("- Return")
+        return completed_jobs
+
+    def has_completed(self) -> bool:
+        """Return a boolean value indicating whether every job has finished
+
+        Polls the pending jobs batch by batch and stops at the first batch
+        containing a job that is still running.
+        """
+        logger.debug("()")
+        while len(self.pending) != 0:
+            self.poll()
+            if self._running_seen:
+                logger.debug("- Return")
+                return False
+        logger.debug("- Return")
+        return True
+
+    def _sleep_interval(self, interval):
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def iter_poll(self, timeout_secs=None):
+        """
+        Poll until every job has finished, with exponential backoff and jitter between rounds.
+
+        Yields:
+            job: every job as soon as a polling round sees it reach a terminal state
+        """
+        logger.debug("()")
+        interval = self.initial_interval
+        start = time.monotonic()
+        while True:
+            for job in self.poll():
+                yield job
+            if len(self.pending) == 0:
+                break
+            # Only wait once every pending job has been looked at since the last wait
+            if self._polled_since_wait < len(self.pending) and not self._use_listing():
+                continue
+            self._polled_since_wait = 0
+            if timeout_secs is not None and time.monotonic() - start >= timeout_secs:
+                err_msg = f"The wait time has exceeded {timeout_secs} seconds."
+                logger.error(err_msg)
+                raise TimeoutError(err_msg)
+            time.sleep(self._sleep_interval(interval))
+            interval = min(interval * self.backoff_factor, self.max_interval)
+        logger.debug("- Return")
+
+    def wait_until_completed(self, timeout_secs=None):
+        """Poll until every job has finished"""
+        for _ in self.iter_poll(timeout_secs=timeout_secs):
+            pass
@@ -0,0 +1,95 @@
+import os
+import json
+import sqlite3
+import threading
+import logging.config
+from azure.quantum import Job
+from azure.quantum._client.models import JobDetails
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class JobStore:
+    """A local SQLite cache for jobs that reached a terminal state (Succeeded, Failed or Cancelled)
+
+    Terminal jobs never change, so once a job and its results are stored they can be
+    served without calling the workspace or downloading the output blob again.
+    """
+
+    FILE_NAME = "jobs.sqlite"
+
+    def __init__(self, directory):
+        """
+        Initialize the JobStore.
+
+        Args:
+            directory (str): Folder holding the store. It is created if it does not exist.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, JobStore.FILE_NAME)
+        self._lock = threading.Lock()
+        # The connection is shared between threads, access is serialized with _lock
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, details TEXT NOT NULL, results TEXT)"
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __contains__(self, job_id):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return row is not None
+
+    def get_job(self, job_id, workspace=None):
+        """
+        Return a stored job, or None if the job is not in the store.
+
+        The returned Job has its results loaded, so job.get_results() does not download anything.
+        """
+        logger.debug("()")
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT details, results FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            logger.debug("- Return")
+            return None
+        details, results = row
+        job = Job(workspace, JobDetails.deserialize(json.loads(details)))
+        if results is not None:
+            job.results = json.loads(results)
+        logger.debug("- Return")
+        return job
+
+    def put_job(self, job, results=None):
+        """
+        Store a job that reached a terminal state, together with its parsed results.
+
+        Jobs that have not finished are ignored since their details still change.
+        """
+        logger.debug("()")
+        if not job.has_completed():
+            logger.debug("- Return")
+            return False
+        details = json.dumps(job.details.serialize(keep_readonly=True))
+        if results is not None:
+            results = json.dumps(results)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO jobs (id, details, results) VALUES (?, ?, ?)",
+                (job.id, details, results),
+            )
+        logger.debug("- Return")
+        return True
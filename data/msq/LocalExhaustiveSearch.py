@@ -0,0 +1,197 @@
+import os
+import math
+import numpy as np
+import multiprocessing
+import logging.config
+from concurrent.futures import ProcessPoolExecutor
+from .LocalSolver import LocalSolver
+from .FlipEvaluator import FlipEvaluator
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+def _search_prefix(
+    array_poly, encoding, prefix, prefix_bits, chunk_bits, tolerance, max_solutions
+):
+    """Enumerate every assignment starting with the given prefix
+
+    The first prefix_bits positions hold the bits of prefix, the next chunk_bits
+    positions take all their values at once (one replica each) and the remaining
+    positions are walked in Gray-code order, flipping one position of every
+    replica per step.
+
+    Returns:
+        best_energy: the lowest energy found
+        best_x: (solutions, positions) array of the first max_solutions assignments
+            within tolerance of it, all of them when max_solutions is None
+        best_count: the number of assignments within tolerance of it
+    """
+    var_count = len(array_poly.var_list)
+    values = np.array(array_poly.ENCODINGS[encoding], dtype=np.int8)
+    bits = np.zeros((1 << chunk_bits, var_count), dtype=np.int64)
+    bits[:, :prefix_bits] = (prefix >> np.arange(prefix_bits)) & 1
+    bits[:, prefix_bits : prefix_bits + chunk_bits] = (
+        np.arange(1 << chunk_bits)[:, None] >> np.arange(chunk_bits)
+    ) & 1
+    evaluator = FlipEvaluator(
+        array_poly, x=values[bits], var_list=array_poly.var_list, encoding=encoding
+    )
+    first_gray = prefix_bits + chunk_bits
+
+    best_energy = math.inf
+    best_x = []
+    # The number of assignments within tolerance of best_energy, and of them kept in best_x
+    best_count = kept = 0
+    for step in range(1 << (var_count - first_gray)):
+        if step != 0:
+            # Gray code: step i flips the position of the lowest set bit of i
+            evaluator.flip(first_gray + (step & -step).bit_length() - 1)
+        energies = evaluator.energy
+        lowest = energies.min()
+        if lowest < best_energy - tolerance:
+            best_energy = lowest
+            best_x = []
+            best_count = kept = 0
+        best_energy = min(best_energy, lowest)
+        if lowest <= best_energy + tolerance:
+            found = evaluator.x[energies <= best_energy + tolerance]
+            best_count += len(found)
+            if max_solutions is not None and kept + len(found) > max_solutions:
+                found = found[: max_solutions - kept].copy()
+            if len(found) != 0:
+                best_x.append(found)
+                kept += len(found)
+    best_x = np.concatenate(best_x)
+    return best_energy, best_x, best_count
+
+
+class LocalExhaustiveSearch(LocalSolver):
+    """Exact solver enumerating every assignment, for problems of up to about 30 variables
+
+    Assignments are enumerated in Gray-code order, so consecutive assignments
+    differ by one variable and energies are updated incrementally with a
+    FlipEvaluator. The values of chunk_bits variables are enumerated at once as
+    replicas of the evaluator, and the assignments are split by prefix of their
+    first variables across num_workers processes.
+
+    The results hold the optimal energy and every optimal configuration (up to max_solutions).
+    """
+
+    DEFAULT_MAX_VARIABLES = 32
+    DEFAULT_CHUNK_BITS = 10
+    DEFAULT_TOLERANCE = 1e-9
+
+    def __init__(
+        self,
+        max_variables=None,
+        max_solutions=None,
+        tolerance=None,
+        chunk_bits=None,
+        num_workers=None,
+        name="msq.exhaustive",
+    ):
+        """
+        The constructor for LocalExhaustiveSearch class.
+
+        Args:
+           max_variables (int): Problems with more variables fail instead of being enumerated.
+           max_solutions (int): The most optimal configurations returned, all of them when None.
+           tolerance (float): Energies within tolerance of the optimum are optimal.
+           chunk_bits (int): The number of variables enumerated at once, as replicas.
+           num_workers (int): The number of processes, defaults to the number of CPUs;
+               1 runs in the submitting process.
+           name (str): The target name reported by the jobs.
+        """
+        super().__init__(
+            name,
+            {
+                "max_variables": max_variables,
+                "max_solutions": max_solutions,
+                "tolerance": tolerance,
+                "chunk_bits": chunk_bits,
+            },
+        )
+        self.num_workers = num_workers
+
+    def solve(self, array_poly, encoding):
+        logger.debug("()")
+        var_list = array_poly.var_list
+        var_count = len(var_list)
+        max_variables = self.get_param(
+            "max_variables", self.DEFAULT_MAX_VARIABLES, int
+        )
+        max_solutions = self.get_param("max_solutions", None, int)
+        tolerance = self.get_param("tolerance", self.DEFAULT_TOLERANCE, float)
+        chunk_bits = self.get_param("chunk_bits", self.DEFAULT_CHUNK_BITS, int)
+        self.check_param(
+            var_count <= max_variables,
+            "max_variables",
+            f"the problem has {var_count} variables, more than {max_variables}",
+        )
+        self.check_param(
+            max_solutions is None or max_solutions >= 1,
+            "max_solutions",
+            "max_solutions must be >= 1",
+        )
+        self.check_param(tolerance >= 0, "tolerance", "tolerance must be >= 0")
+        self.check_param(chunk_bits >= 0, "chunk_bits", "chunk_bits must be >= 0")
+
+        chunk_bits = min(chunk_bits, var_count)
+        num_workers = self.num_workers or os.cpu_count() or 1
+        # A few prefixes per worker, so that they finish about together
+        prefix_bits = 0
+        if num_workers > 1:
+            prefix_bits = min(
+                var_count - chunk_bits, math.ceil(math.log2(4 * num_workers))
+            )
+        tasks = [
+            (
+                array_poly,
+                encoding,
+                prefix,
+                prefix_bits,
+                chunk_bits,
+                tolerance,
+                max_solutions,
+            )
+            for prefix in range(1 << prefix_bits)
+        ]
+        if num_workers == 1 or len(tasks) == 1:
+            results = [_search_prefix(*task) for task in tasks]
+        else:
+            # Spawn rather than fork, the submitting process may be running threads
+            with ProcessPoolExecutor(
+                max_workers=min(num_workers, len(tasks)),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                results = list(executor.map(_search_prefix, *zip(*tasks)))
+
+        optimum = min(best_energy for best_energy, _, _ in results)
+        results = [result for result in results if result[0] <= optimum + tolerance]
+        candidates = np.concatenate([best_x for _, best_x, _ in results])
+        # Every prefix keeps at most max_solutions optima, the others are only counted
+        optimal_count = sum(best_count for _, _, best_count in results)
+        # Recompute the energies, the incremental ones may have drifted
+        energies = array_poly.evaluate(candidates, var_list, encoding)
+        optimum = energies.min()
+        optimal = np.flatnonzero(energies <= optimum + tolerance)
+        optimal = optimal[np.argsort(energies[optimal], kind="stable")]
+        if max_solutions is not None:
+            optimal = optimal[:max_solutions]
+        solutions = [
+            self._solution(var_list, candidates[i], energies[i]) for i in optimal
+        ]
+        parameters = {
+            "max_variables": max_variables,
+            "tolerance": tolerance,
+            "chunk_bits": chunk_bits,
+        }
+        parameters.update(self.params["params"])
+        parameters["optimal_energy"] = float(optimum)
+        parameters["optimal_solutions"] = optimal_count
+        logger.debug("- Return")
+        return solutions, parameters
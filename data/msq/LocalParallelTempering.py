@@ -0,0 +1,430 @@
+import os
+import threading
+import numpy as np
+import multiprocessing
+import multiprocessing.connection
+import logging.config
+from multiprocessing import shared_memory
+from .LocalSolver import LocalSolver
+from .FlipEvaluator import FlipEvaluator
+from .LocalSimulatedAnnealing import LocalSimulatedAnnealing
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class _SharedChains(object):
+    """The arrays shared by the processes running the chains of a parallel tempering run
+
+    betas, energies and best_energies hold one value per chain, best_states one
+    assignment per chain. The workers only write the entries of their own chains.
+    """
+
+    def __init__(self, chain_count, var_count, names=None):
+        self.shape = (chain_count, var_count)
+        create = names is None
+        self._float_memory = shared_memory.SharedMemory(
+            name=None if create else names[0],
+            create=create,
+            size=max(1, 3 * chain_count * 8),
+        )
+        self._state_memory = shared_memory.SharedMemory(
+            name=None if create else names[1],
+            create=create,
+            size=max(1, chain_count * var_count),
+        )
+        floats = np.ndarray(
+            (3, chain_count), dtype=np.float64, buffer=self._float_memory.buf
+        )
+        self.betas, self.energies, self.best_energies = floats
+        self.best_states = np.ndarray(
+            self.shape, dtype=np.int8, buffer=self._state_memory.buf
+        )
+
+    @property
+    def names(self):
+        return self._float_memory.name, self._state_memory.name
+
+    def close(self, unlink=False):
+        del self.betas, self.energies, self.best_energies, self.best_states
+        self._float_memory.close()
+        self._state_memory.close()
+        if unlink:
+            self._float_memory.unlink()
+            self._state_memory.unlink()
+
+
+def _run_chains(array_poly, encoding, chains, sweeps, seeds, shared, synchronize):
+    """Run Metropolis sweeps on some chains, at the temperatures set in shared.betas
+
+    Every chain draws from its own generator, seeded by seeds[i] for chains[i], so a
+    chain does not depend on the other chains run by the same process.
+    synchronize(sweep) is called after every sweep, once shared.energies holds the
+    energies of the chains, and returns when the replica exchange is done.
+    """
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+    var_list = array_poly.var_list
+    values = np.array(array_poly.ENCODINGS[encoding], dtype=np.int8)
+    evaluator = FlipEvaluator(
+        array_poly,
+        x=np.array(
+            [rng.choice(values, size=len(var_list)) for rng in rngs], dtype=np.int8
+        ).reshape(len(chains), len(var_list)),
+        var_list=var_list,
+        encoding=encoding,
+    )
+    best_x = evaluator.x.copy()
+    best_energy = evaluator.energy.copy()
+    for sweep in range(sweeps):
+        betas = shared.betas[chains]
+        # The acceptance draws of the sweep, one row per chain
+        draws = np.array([rng.random(len(var_list)) for rng in rngs]).reshape(
+            len(chains), len(var_list)
+        )
+        for position in range(len(var_list)):
+            deltas = evaluator.delta(position)
+            with np.errstate(over="ignore", invalid="ignore"):
+                accept = (deltas <= 0) | (
+                    draws[:, position] < np.exp(-betas * deltas)
+                )
+            evaluator.flip(position, accept)
+        improved = evaluator.energy < best_energy
+        best_x[improved] = evaluator.x[improved]
+        best_energy[improved] = evaluator.energy[improved]
+        shared.energies[chains] = evaluator.energy
+        synchronize(sweep)
+    shared.best_states[chains] = best_x
+    shared.best_energies[chains] = best_energy
+
+
+def _chain_worker(
+    array_poly, encoding, chains, sweeps, seeds, chain_count, names, barrier, timeout
+):
+    """Entry point of a worker process, see _run_chains"""
+    shared = _SharedChains(chain_count, len(array_poly.var_list), names)
+
+    def synchronize(sweep):
+        # The energies are written, wait for the exchange to be done
+        barrier.wait(timeout)
+        barrier.wait(timeout)
+
+    try:
+        _run_chains(array_poly, encoding, chains, sweeps, seeds, shared, synchronize)
+    except Exception:
+        barrier.abort()
+        raise
+    finally:
+        shared.close()
+
+
+class LocalParallelTempering(LocalSolver):
+    """Parallel tempering run in process, taking the parameters of the PTICM solver
+
+    num_replicas groups of num_temps chains are run, each chain at one temperature
+    of its group. After every sweep, chains at adjacent temperatures of a group
+    exchange their temperatures with the Metropolis criterion. The chains are split
+    across num_workers processes which share the temperatures and energies through
+    shared memory; the exchanges are decided by the submitting process between two
+    barriers, so only one value per chain crosses processes.
+
+    Of the PTICM parameters, num_replicas, num_sweeps_per_run, max_total_sweeps,
+    auto_set_temperatures, low_temp, high_temp, num_temps and seed are used. The
+    others are validated and reported in the results, but have no effect. Every
+    chain has its own seed, so a seeded run gives the same results whatever the
+    number of workers.
+    """
+
+    DEFAULT_NUM_REPLICAS = 2
+    DEFAULT_NUM_SWEEPS_PER_RUN = 1000
+    DEFAULT_NUM_TEMPS = 16
+    # Replaces a low_temp of 0, which would make the inverse temperature infinite
+    MIN_TEMP = 1e-9
+    DEFAULT_SWEEP_TIMEOUT = 600
+
+    def __init__(
+        self,
+        params=None,
+        num_workers=None,
+        sweep_timeout=DEFAULT_SWEEP_TIMEOUT,
+        name="msq.paralleltempering",
+    ):
+        """
+        The constructor for LocalParallelTempering class.
+
+        Args:
+           params (dict): The PTICM parameters, as given to SolverFactory.generate_pticm_solvers
+               (values may be strings).
+           num_workers (int): The number of processes running the chains. Defaults to the
+               number of CPUs, at most one per temperature; 1 runs in the submitting process.
+           sweep_timeout (float): Seconds the processes wait for each other at the end of a
+               sweep before the run fails, None to wait without limit. A worker process that
+               dies fails the run at once.
+           name (str): The target name reported by the jobs.
+        """
+        super().__init__(name, params)
+        self.num_workers = num_workers
+        self.sweep_timeout = sweep_timeout
+
+    def _check_params(self):
+        """Validate the parameters with the messages of the PTICM solver"""
+        get = self.get_param
+        num_replicas = get("num_replicas", self.DEFAULT_NUM_REPLICAS, int)
+        self.check_param(
+            2 <= num_replicas <= 10000,
+            "num_replicas",
+            "Number of replicas must be in the range [2, 10000]",
+        )
+        num_sweeps_per_run = get(
+            "num_sweeps_per_run", self.DEFAULT_NUM_SWEEPS_PER_RUN, int
+        )
+        self.check_param(
+            2 <= num_sweeps_per_run <= 10000000,
+            "num_sweeps_per_run",
+            "Number of sweeps per run must be in the range [2, 10000000]",
+        )
+        max_total_sweeps = get("max_total_sweeps", None, int)
+        self.check_param(
+            max_total_sweeps is None or max_total_sweeps >= 0,
+            "max_total_sweeps",
+            "max_total_sweeps must be >= 0",
+        )
+        seed = get("seed", None, int)
+        self.check_param(seed is None or seed >= 0, "seed", "seed must be >= 0")
+        for param_name, message in (
+            ("elite_threshold", "Elite threshold must be in the range [0-1]"),
+            (
+                "frac_icm_thermal_layers",
+                "Frac icm thermal layers must be in the range [0-1]",
+            ),
+            ("frac_sweeps_idle", "Frac sweeps idle must be in the range [0-1]]"),
+            (
+                "frac_sweeps_stagnation",
+                "Frac sweeps stagnation must be in the range [0-1]]",
+            ),
+        ):
+            value = get(param_name, None, float)
+            self.check_param(value is None or 0 <= value <= 1, param_name, message)
+        num_elite_temps = get("num_elite_temps", None, int)
+        self.check_param(
+            num_elite_temps is None or num_elite_temps >= 1,
+            "num_elite_temps",
+            "Number of elite temps cannot be less than 1",
+        )
+
+        low_temp = get("low_temp", None, float)
+        high_temp = get("high_temp", None, float)
+        num_temps = get("num_temps", None, int)
+        self.check_param(
+            low_temp is None or low_temp >= 0, "low_temp", "low_temp must be >= 0"
+        )
+        self.check_param(
+            high_temp is None or high_temp >= 0, "high_temp", "high_temp must be >= 0"
+        )
+        auto_set_temperatures = get("auto_set_temperatures", True, bool)
+        if auto_set_temperatures:
+            self.check_param(
+                high_temp is None and low_temp is None,
+                "auto_set_temperatures",
+                "auto_set_temperatures should be set to false to use high temp",
+            )
+            self.check_param(
+                num_temps is None,
+                "auto_set_temperatures",
+                "auto_set_temperatures should be set to false to use the number of temperatures",
+            )
+        else:
+            self.check_param(
+                high_temp is not None and low_temp is not None,
+                "auto_set_temperatures",
+                "low_temp and high_temp must be set when auto_set_temperatures is false",
+            )
+            self.check_param(
+                low_temp <= high_temp, "low_temp", "low_temp must be <= high_temp"
+            )
+        self.check_param(
+            num_temps is None or num_temps >= 1, "num_temps", "num_temps must be >= 1"
+        )
+        return (
+            num_replicas,
+            num_sweeps_per_run,
+            max_total_sweeps,
+            seed,
+            auto_set_temperatures,
+            low_temp,
+            high_temp,
+            num_temps,
+        )
+
+    @staticmethod
+    def _exchange(shared, chain_at, temp_betas, sweep, rng):
+        """Exchange the temperatures of chains at adjacent temperatures, even or odd pairs by turn"""
+        lower = np.arange(sweep % 2, len(temp_betas) - 1, 2)
+        if len(lower) == 0:
+            return
+        first, second = chain_at[:, lower], chain_at[:, lower + 1]
+        log_accept = (temp_betas[lower] - temp_betas[lower + 1]) * (
+            shared.energies[first] - shared.energies[second]
+        )
+        accept = np.log(rng.random(log_accept.shape)) < log_accept
+        chain_at[:, lower] = np.where(accept, second, first)
+        chain_at[:, lower + 1] = np.where(accept, first, second)
+        shared.betas[chain_at] = temp_betas
+
+    def solve(self, array_poly, encoding):
+        logger.debug("()")
+        (
+            num_replicas,
+            sweeps,
+            max_total_sweeps,
+            seed,
+            auto_set_temperatures,
+            low_temp,
+            high_temp,
+            num_temps,
+        ) = self._check_params()
+        if auto_set_temperatures:
+            beta_start, beta_stop = LocalSimulatedAnnealing.default_betas(array_poly)
+            low_temp, high_temp = 1 / beta_stop, 1 / beta_start
+        if num_temps is None:
+            num_temps = self.DEFAULT_NUM_TEMPS if low_temp != high_temp else 1
+        temps = np.geomspace(
+            max(high_temp, self.MIN_TEMP), max(low_temp, self.MIN_TEMP), num_temps
+        )
+        temp_betas = 1 / temps
+        chain_count = num_replicas * num_temps
+        if max_total_sweeps is not None:
+            sweeps = max(1, min(sweeps, max_total_sweeps // chain_count))
+        num_workers = self.num_workers or os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, num_temps, chain_count))
+
+        var_list = array_poly.var_list
+        # The exchanges draw from the first seed, chain c from seeds[c + 1]
+        seeds = np.random.SeedSequence(seed).spawn(chain_count + 1)
+        rng = np.random.default_rng(seeds[0])
+        chain_seeds = seeds[1:]
+        # Chain c is at temperature chain_at[r, k] = c of group r to begin with
+        chain_at = np.arange(chain_count).reshape(num_replicas, num_temps)
+        worker_chains = np.array_split(np.arange(chain_count), num_workers)
+        shared = _SharedChains(chain_count, len(var_list))
+        try:
+            shared.betas[chain_at] = temp_betas
+            if num_workers == 1:
+                _run_chains(
+                    array_poly,
+                    encoding,
+                    worker_chains[0],
+                    sweeps,
+                    chain_seeds,
+                    shared,
+                    lambda sweep: self._exchange(
+                        shared, chain_at, temp_betas, sweep, rng
+                    ),
+                )
+            else:
+                self._run_workers(
+                    array_poly,
+                    encoding,
+                    worker_chains,
+                    sweeps,
+                    chain_seeds,
+                    shared,
+                    chain_at,
+                    temp_betas,
+                    rng,
+                )
+            best_x = shared.best_states.copy()
+            best_energy = shared.best_energies.copy()
+        finally:
+            shared.close(unlink=True)
+
+        # One solution per distinct configuration, the best first
+        best_x, first = np.unique(best_x, axis=0, return_index=True)
+        best_energy = best_energy[first]
+        solutions = [
+            self._solution(var_list, best_x[i], best_energy[i])
+            for i in np.argsort(best_energy, kind="stable")
+        ]
+        parameters = dict(self.params["params"])
+        parameters["solver_name"] = "PTICM"
+        logger.debug("- Return")
+        return solutions, parameters
+
+    def _run_workers(
+        self,
+        array_poly,
+        encoding,
+        worker_chains,
+        sweeps,
+        chain_seeds,
+        shared,
+        chain_at,
+        temp_betas,
+        rng,
+    ):
+        """Run the chains on worker processes, exchanging temperatures between two barriers"""
+        # Spawn rather than fork, the submitting process may be running threads
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(len(worker_chains) + 1)
+        workers = [
+            context.Process(
+                target=_chain_worker,
+                args=(
+                    array_poly,
+                    encoding,
+                    chains,
+                    sweeps,
+                    [chain_seeds[chain] for chain in chains],
+                    len(shared.betas),
+                    shared.names,
+                    barrier,
+                    self.sweep_timeout,
+                ),
+                daemon=True,
+            )
+            for chains in worker_chains
+        ]
+        for worker in workers:
+            worker.start()
+        done = threading.Event()
+        watcher = threading.Thread(
+            target=LocalParallelTempering._watch_workers,
+            args=(workers, barrier, done),
+            daemon=True,
+        )
+        watcher.start()
+        try:
+            for sweep in range(sweeps):
+                barrier.wait(self.sweep_timeout)
+                self._exchange(shared, chain_at, temp_betas, sweep, rng)
+                barrier.wait(self.sweep_timeout)
+        except Exception:
+            barrier.abort()
+            exitcodes = [worker.exitcode for worker in workers]
+            err_msg = f"A parallel tempering worker process failed or timed out, exit codes: {exitcodes}"
+            logger.error(err_msg)
+            raise Exception(err_msg) from None
+        finally:
+            done.set()
+            watcher.join()
+            for worker in workers:
+                worker.join(self.sweep_timeout)
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+        if any(worker.exitcode != 0 for worker in workers):
+            err_msg = "A parallel tempering worker process failed"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+
+    @staticmethod
+    def _watch_workers(workers, barrier, done, interval=0.1):
+        """Break the barrier when a worker process dies (e.g. killed for memory) before the run is done"""
+        sentinels = {worker.sentinel: worker for worker in workers}
+        while sentinels and not done.is_set():
+            for sentinel in multiprocessing.connection.wait(list(sentinels), interval):
+                if sentinels.pop(sentinel).exitcode != 0:
+                    barrier.abort()
+                    return
@@ -0,0 +1,128 @@
+import math
+import time
+import numpy as np
+import logging.config
+from .LocalSolver import LocalSolver
+from .FlipEvaluator import FlipEvaluator
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class LocalSimulatedAnnealing(LocalSolver):
+    """Simulated annealing run in process, with the parameters of azure.quantum.optimization.SimulatedAnnealing
+
+    All restarts anneal at once: a sweep visits every variable in turn and
+    decides the flip of that variable for every replica with one vectorized
+    Metropolis step, energy changes being read from a batched FlipEvaluator.
+    """
+
+    DEFAULT_SWEEPS = 1000
+    DEFAULT_RESTARTS = 64
+
+    def __init__(
+        self,
+        beta_start=None,
+        beta_stop=None,
+        sweeps=None,
+        restarts=None,
+        timeout=None,
+        seed=None,
+        name="msq.simulatedannealing",
+    ):
+        """
+        The constructor for LocalSimulatedAnnealing class.
+
+        Args:
+           beta_start (float): The inverse temperature of the first sweep. Derived from the
+               problem when not set, so that the largest energy change is accepted half the time.
+           beta_stop (float): The inverse temperature of the last sweep. Derived from the problem
+               when not set, so that the smallest energy change is accepted 1% of the time.
+           sweeps (int): The number of sweeps, with the inverse temperature growing geometrically.
+           restarts (int): The number of replicas annealed at once, the best ones are returned.
+           timeout (float): Stop annealing after this many seconds.
+           seed (int): Seed of the random number generator.
+           name (str): The target name reported by the jobs.
+        """
+        super().__init__(
+            name,
+            {
+                "beta_start": beta_start,
+                "beta_stop": beta_stop,
+                "sweeps": sweeps,
+                "restarts": restarts,
+                "timeout": timeout,
+                "seed": seed,
+            },
+        )
+
+    @staticmethod
+    def default_betas(array_poly):
+        """Return the (beta_start, beta_stop) derived from the coefficients of a problem"""
+        coefficients, indices, offsets = array_poly.to_csr()
+        magnitudes = np.abs(coefficients)
+        if len(magnitudes) == 0 or magnitudes.max() == 0:
+            return 1.0, 1.0
+        # The largest change a flip can make is bounded by the terms of the variable
+        term_of_entry = np.repeat(np.arange(len(coefficients)), np.diff(offsets))
+        max_delta = np.bincount(indices, weights=magnitudes[term_of_entry]).max()
+        min_delta = magnitudes[magnitudes > 0].min()
+        return math.log(2) / max_delta, math.log(100) / min_delta
+
+    def solve(self, array_poly, encoding):
+        logger.debug("()")
+        sweeps = self.get_param("sweeps", self.DEFAULT_SWEEPS, int)
+        restarts = self.get_param("restarts", self.DEFAULT_RESTARTS, int)
+        timeout = self.get_param("timeout", None, float)
+        seed = self.get_param("seed", None, int)
+        default_beta_start, default_beta_stop = self.default_betas(array_poly)
+        beta_start = self.get_param("beta_start", default_beta_start, float)
+        beta_stop = self.get_param("beta_stop", default_beta_stop, float)
+        self.check_param(sweeps >= 1, "sweeps", "sweeps must be >= 1")
+        self.check_param(restarts >= 1, "restarts", "restarts must be >= 1")
+        self.check_param(beta_start > 0, "beta_start", "beta_start must be > 0")
+        self.check_param(beta_stop > 0, "beta_stop", "beta_stop must be > 0")
+        self.check_param(seed is None or seed >= 0, "seed", "seed must be >= 0")
+
+        rng = np.random.default_rng(seed)
+        var_list = array_poly.var_list
+        values = np.array(array_poly.ENCODINGS[encoding], dtype=np.int8)
+        evaluator = FlipEvaluator(
+            array_poly,
+            x=rng.choice(values, size=(restarts, len(var_list))),
+            var_list=var_list,
+            encoding=encoding,
+        )
+        best_x = evaluator.x.copy()
+        best_energy = evaluator.energy.copy()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for beta in np.geomspace(beta_start, beta_stop, sweeps):
+            for position in range(len(var_list)):
+                deltas = evaluator.delta(position)
+                accept = rng.random(restarts) < np.exp(-beta * np.maximum(deltas, 0))
+                evaluator.flip(position, accept)
+            improved = evaluator.energy < best_energy
+            best_x[improved] = evaluator.x[improved]
+            best_energy[improved] = evaluator.energy[improved]
+            if deadline is not None and time.monotonic() > deadline:
+                break
+
+        # One solution per distinct configuration, the best first
+        best_x, first = np.unique(best_x, axis=0, return_index=True)
+        best_energy = best_energy[first]
+        solutions = [
+            self._solution(var_list, best_x[i], best_energy[i])
+            for i in np.argsort(best_energy, kind="stable")
+        ]
+        parameters = {
+            "beta_start": beta_start,
+            "beta_stop": beta_stop,
+            "sweeps": sweeps,
+            "restarts": restarts,
+        }
+        parameters.update(self.params["params"])
+        logger.debug("- Return")
+        return solutions, parameters
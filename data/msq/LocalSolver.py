@@ -0,0 +1,206 @@
+import abc
+import time
+import uuid
+import itertools
+import logging.config
+from datetime import datetime, timedelta, timezone
+from azure.quantum import Job
+from azure.quantum._client.models import JobDetails, ErrorData
+from azure.quantum.optimization import Problem, ProblemType
+from .ArrayPolynomial import ArrayPolynomial
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class InvalidPropertyError(Exception):
+    """Raised by LocalSolver.solve for an invalid parameter, the job fails with the InvalidProperty code"""
+
+    code = "InvalidProperty"
+
+
+class LocalJob(Job):
+    """A job solved in process by a LocalSolver, it has finished when it is returned
+
+    The results are kept on the job, so nothing is ever downloaded.
+    """
+
+    def refresh(self):
+        pass
+
+    def wait_until_completed(self, *args, **kwargs):
+        pass
+
+    def get_results(self, timeout_secs=None):
+        if self.details.status != "Succeeded":
+            raise RuntimeError(
+                "Cannot retrieve results as job execution failed"
+                + f"(status: {self.details.status}."
+                + f"error: {self.details.error_data})"
+            )
+        return self.results
+
+
+class LocalSolver(abc.ABC):
+    """Base class of the solvers running in process, without a workspace
+
+    A local solver takes the same problems as the Azure solvers (a Problem, a
+    Polynomial or an ArrayPolynomial) and its submit returns a finished LocalJob
+    holding results in the Azure results format, so it can be used in an
+    Experiment next to the Azure solvers. Subclasses implement solve.
+    """
+
+    provider_id = "msq"
+    # Spin problems are solved with the spin encoding, the others as binary problems
+    SPIN_PROBLEM_TYPES = [ProblemType.ising, ProblemType.ising_grouped]
+
+    def __init__(self, name, params=None):
+        """
+        The constructor for LocalSolver class.
+
+        Args:
+           name (str): The target name reported by the jobs, e.g. msq.simulatedannealing.
+           params (dict): The solver parameters, reported as the job input_params.
+        """
+        self.name = name
+        self.params = {"params": {}}
+        for param_name, value in (params or {}).items():
+            self.set_one_param(param_name, value)
+
+    def set_one_param(self, name, value):
+        if value is not None:
+            self.params["params"][name] = value
+
+    def get_param(self, name, default=None, type=None):
+        """Return a parameter, converted with type (parameters may be given as strings)"""
+        value = self.params["params"].get(name)
+        if value is None:
+            return default
+        if type is bool and isinstance(value, str):
+            return value.lower() == "true"
+        return value if type is None else type(value)
+
+    def check_valid_problem(self, problem):
+        pass
+
+    @staticmethod
+    def check_param(condition, name, message):
+        """Raise an InvalidPropertyError for the parameter name when condition is False"""
+        if not condition:
+            err_msg = f"Invalid value passed for {name}: {message}"
+            logger.error(err_msg)
+            raise InvalidPropertyError(err_msg)
+
+    @staticmethod
+    def to_array_polynomial(problem):
+        """
+        Function to convert a problem to an ArrayPolynomial and its encoding.
+
+        The squared linear combinations of a grouped problem (terms_slc) are expanded into
+        terms. A variable repeated in a term is reduced by the encoding of the problem type,
+        x * x = x or s * s = 1. The initial configuration of a problem is not used.
+
+        Args:
+           problem: A Problem, a Polynomial or an ArrayPolynomial.
+
+        Returns array_polynomial, encoding
+        """
+        logger.debug("()")
+        encoding = "binary"
+        if isinstance(problem, ArrayPolynomial):
+            array_poly = problem
+        elif isinstance(problem, Problem):
+            if problem.problem_type in LocalSolver.SPIN_PROBLEM_TYPES:
+                encoding = "spin"
+            terms = [[term.c, term.ids] for term in problem.terms]
+            for slc_term in problem.terms_slc:
+                # c * (sum_i a_i v_i)^2 = sum_i sum_j c * a_i * a_j * v_i * v_j
+                terms.extend(
+                    [slc_term.c * first.c * second.c, first.ids + second.ids]
+                    for first, second in itertools.product(slc_term.terms, repeat=2)
+                )
+            array_poly = ArrayPolynomial.from_terms(terms, encoding=encoding)
+            if problem.init_config:
+                logger.warning(
+                    f"The initial configuration of {problem.name} is ignored by local solvers"
+                )
+        elif hasattr(problem, "to_arrays"):
+            array_poly = problem.to_arrays()
+        else:
+            err_msg = f"Cannot solve {type(problem)} locally, expected a Problem, Polynomial or ArrayPolynomial"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        logger.debug("- Return")
+        return array_poly, encoding
+
+    @abc.abstractmethod
+    def solve(self, array_poly, encoding):
+        """
+        Solve a problem.
+
+        Returns:
+            solutions: list of {"configuration", "cost"} dictionaries with the best first,
+                the configuration mapping every variable index (as a string) to its value
+            parameters: the parameters the problem was solved with
+        """
+
+    @staticmethod
+    def _solution(var_list, x, cost):
+        configuration = {
+            str(var): int(value) for var, value in zip(var_list, x.tolist())
+        }
+        return {"configuration": configuration, "cost": float(cost)}
+
+    def submit(self, problem, metadata=None):
+        """
+        Solve a problem in process.
+
+        Args:
+           problem: A Problem, a Polynomial or an ArrayPolynomial.
+           metadata (dict): Strings attached to the job.
+
+        Returns job: a finished LocalJob, Succeeded with its results or Failed with its error
+        """
+        logger.debug("()")
+        details = JobDetails(
+            id=str(uuid.uuid4()),
+            name=getattr(problem, "name", None) or "Optimization problem",
+            container_uri="",
+            input_data_format="microsoft.qio.v2",
+            output_data_format="microsoft.qio-results.v2",
+            provider_id=self.provider_id,
+            target=self.name,
+            input_params=self.params,
+            metadata=metadata,
+        )
+        details.creation_time = datetime.now(timezone.utc)
+        details.begin_execution_time = details.creation_time
+        job = LocalJob(None, details)
+        start = time.perf_counter()
+        try:
+            array_poly, encoding = self.to_array_polynomial(problem)
+            solutions, parameters = self.solve(array_poly, encoding)
+            job.results = {
+                "version": "1.0",
+                "configuration": solutions[0]["configuration"],
+                "cost": solutions[0]["cost"],
+                "parameters": parameters,
+                "solutions": solutions,
+            }
+            details.status = "Succeeded"
+        except Exception as e:
+            err_msg = f"Failed solving {problem} with {self.name}, error: {e}"
+            logger.error(err_msg)
+            details.status = "Failed"
+            # Experiment reads the error data as JSON after replacing ' with "
+            message = str(e).replace("'", "").replace('"', "")
+            code = getattr(e, "code", "LocalSolverError")
+            details.error_data = ErrorData(code=code, message=message)
+        details.end_execution_time = details.begin_execution_time + timedelta(
+            seconds=time.perf_counter() - start
+        )
+        logger.debug("- Return")
+        return job
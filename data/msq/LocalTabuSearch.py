@@ -0,0 +1,174 @@
+import time
+import numpy as np
+import logging.config
+from .LocalSolver import LocalSolver
+from .FlipEvaluator import FlipEvaluator
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class LocalTabuSearch(LocalSolver):
+    """Tabu search run in process, with the parameters of azure.quantum.target.oneqbit.TabuSearch
+
+    Every iteration flips the variable with the best energy change that is not
+    tabu; a tabu variable is still flipped when that gives a new best energy.
+    A flipped variable stays tabu for tabu_tenure plus a random number in
+    [0, tabu_tenure_rand_max) iterations. The energy changes of all the flips are
+    kept up to date by a FlipEvaluator, so an iteration costs one pass over the
+    variables plus the update of the terms of the flipped variable.
+
+    A run stops after improvement_cutoff iterations without improving the best
+    energy by more than improvement_tolerance. Runs restart from a random
+    assignment until timeout seconds have passed, a single run is done without timeout.
+    """
+
+    def __init__(
+        self,
+        tabu_tenure=None,
+        tabu_tenure_rand_max=None,
+        improvement_cutoff=None,
+        improvement_tolerance=None,
+        timeout=None,
+        seed=None,
+        name="msq.tabu",
+    ):
+        """
+        The constructor for LocalTabuSearch class.
+
+        Args:
+           tabu_tenure (int): The number of iterations a flipped variable stays tabu.
+               Defaults to a quarter of the variables, between 1 and 20.
+           tabu_tenure_rand_max (int): The tenure is increased by a random number below this.
+               Defaults to 1 (no random increase).
+           improvement_cutoff (int): The number of iterations without improvement ending a run.
+               Defaults to 10 times the number of variables, at least 100.
+           improvement_tolerance (float): The smallest improvement of the best energy. Defaults to 1e-9.
+           timeout (float): The number of seconds to restart runs for.
+           seed (int): Seed of the random number generator.
+           name (str): The target name reported by the jobs.
+        """
+        super().__init__(
+            name,
+            {
+                "tabu_tenure": tabu_tenure,
+                "tabu_tenure_rand_max": tabu_tenure_rand_max,
+                "improvement_cutoff": improvement_cutoff,
+                "improvement_tolerance": improvement_tolerance,
+                "timeout": timeout,
+                "seed": seed,
+            },
+        )
+
+    def _check_params(self, var_count):
+        """Validate the parameters with the messages of the TabuSearch solver"""
+        get = self.get_param
+        tabu_tenure = get("tabu_tenure", max(1, min(20, var_count // 4)), int)
+        self.check_param(tabu_tenure >= 0, "tabu_tenure", "tabu_tenure must be >= 0")
+        tabu_tenure_rand_max = get("tabu_tenure_rand_max", 1, int)
+        self.check_param(
+            1 <= tabu_tenure_rand_max <= 200000,
+            "tabu_tenure_rand_max",
+            "tabu_tenure_rand_max must be in the range [1, 200000]",
+        )
+        improvement_cutoff = get(
+            "improvement_cutoff", max(100, 10 * var_count), int
+        )
+        self.check_param(
+            improvement_cutoff >= 0,
+            "improvement_cutoff",
+            "improvement_cutoff must be >= 0",
+        )
+        improvement_tolerance = get("improvement_tolerance", 1e-9, float)
+        self.check_param(
+            improvement_tolerance >= 0,
+            "improvement_tolerance",
+            "improvement_tolerance must be >= 0",
+        )
+        timeout = get("timeout", None, float)
+        self.check_param(
+            timeout is None or timeout >= 0, "timeout", "timeout must be >= 0"
+        )
+        seed = get("seed", None, int)
+        self.check_param(seed is None or seed >= 0, "seed", "seed must be >= 0")
+        return (
+            tabu_tenure,
+            tabu_tenure_rand_max,
+            improvement_cutoff,
+            improvement_tolerance,
+            timeout,
+            seed,
+        )
+
+    def solve(self, array_poly, encoding):
+        logger.debug("()")
+        var_list = array_poly.var_list
+        (
+            tabu_tenure,
+            tabu_tenure_rand_max,
+            improvement_cutoff,
+            improvement_tolerance,
+            timeout,
+            seed,
+        ) = self._check_params(len(var_list))
+        rng = np.random.default_rng(seed)
+        values = np.array(array_poly.ENCODINGS[encoding], dtype=np.int8)
+        evaluator = FlipEvaluator(
+            array_poly,
+            x=rng.choice(values, size=len(var_list)),
+            var_list=var_list,
+            encoding=encoding,
+        )
+        best_x = evaluator.x.copy()
+        best_energy = evaluator.energy
+        deadline = None if timeout is None else time.monotonic() + timeout
+        iterations = 0
+        while True:
+            # The iteration until which every variable is tabu
+            tabu_until = np.zeros(len(var_list), dtype=np.int64)
+            run_best_energy = evaluator.energy
+            stale = 0
+            while len(var_list) != 0 and stale < improvement_cutoff:
+                iterations += 1
+                deltas = evaluator.deltas()
+                energies = evaluator.energy + deltas
+                # Aspiration: a tabu flip is allowed when it gives a new best energy
+                allowed = (tabu_until < iterations) | (
+                    energies < run_best_energy - improvement_tolerance
+                )
+                if not allowed.any():
+                    allowed[:] = True
+                candidates = np.where(allowed, deltas, np.inf)
+                position = int(np.argmin(candidates))
+                evaluator.flip(position)
+                tabu_until[position] = (
+                    iterations + tabu_tenure + rng.integers(tabu_tenure_rand_max)
+                )
+                if evaluator.energy < run_best_energy - improvement_tolerance:
+                    stale = 0
+                else:
+                    stale += 1
+                if evaluator.energy < run_best_energy:
+                    run_best_energy = evaluator.energy
+                    if run_best_energy < best_energy:
+                        best_energy = run_best_energy
+                        best_x = evaluator.x.copy()
+                if deadline is not None and time.monotonic() > deadline:
+                    break
+            if deadline is None or time.monotonic() > deadline or len(var_list) == 0:
+                break
+            evaluator.reset(rng.choice(values, size=len(var_list)))
+
+        solutions = [self._solution(var_list, best_x, best_energy)]
+        parameters = {
+            "tabu_tenure": tabu_tenure,
+            "tabu_tenure_rand_max": tabu_tenure_rand_max,
+            "improvement_cutoff": improvement_cutoff,
+            "improvement_tolerance": improvement_tolerance,
+        }
+        parameters.update(self.params["params"])
+        logger.debug("- Return")
+        return solutions, parameters
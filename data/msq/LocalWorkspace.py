@@ -0,0 +1,66 @@
+import threading
+import logging.config
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class LocalWorkspace(object):
+    """Serve the jobs of local solvers next to the jobs of a workspace
+
+    Local jobs are kept in memory, any other job is looked up in the wrapped
+    workspace, so an Experiment can poll and report on both the same way.
+    """
+
+    def __init__(self, workspace=None):
+        """
+        The constructor for LocalWorkspace class.
+
+        Args:
+           workspace (Workspace): The workspace holding the other jobs, None for local jobs only.
+        """
+        self.workspace = workspace
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Everything else (storage, credentials, ...) is the wrapped workspace's
+        if name == "workspace" or self.workspace is None:
+            raise AttributeError(f"LocalWorkspace object does not have attribute {name}")
+        return getattr(self.workspace, name)
+
+    def add_job(self, job):
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def __contains__(self, job_id):
+        return job_id in self._jobs
+
+    def get_job(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        if self.workspace is None:
+            err_msg = f"Job {job_id} was not found"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        return self.workspace.get_job(job_id)
+
+    def list_jobs(self, name_match=None, status=None, created_after=None):
+        """Return the local jobs and the jobs of the wrapped workspace, filtered as Workspace.list_jobs"""
+        jobs = []
+        with self._lock:
+            local_jobs = list(self._jobs.values())
+        for job in local_jobs:
+            if job.matches_filter(name_match, status, created_after):
+                jobs.append(job)
+        if self.workspace is not None:
+            jobs.extend(
+                self.workspace.list_jobs(
+                    name_match=name_match, status=status, created_after=created_after
+                )
+            )
+        return jobs
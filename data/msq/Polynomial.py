@@ -1,8 +1,11 @@
 import oneqloud_polynomials
-import pickle, warnings
+import numpy as np
+import os, bisect, json, pickle, warnings
 import logging.config
-from time import sleep
+from time import sleep, perf_counter
 from azure.quantum.optimization import Term
+from .ArrayPolynomial import ArrayPolynomial
+from .DenseQubo import DenseQubo
 
 # from logger.logger_config import LOGGING_CONFIG
 
@@ -12,7 +15,9 @@ logger = logging.getLogger(__name__)
 
 
 def update_storage(func):
+    # Before a change: drop the stored forms and stop sharing bp with copies
     def wrapper(*args):
+        args[0]._own_bp()
         args[0]._stored = None
         return func(*args)
 
@@ -20,10 +25,41 @@ def update_storage(func):
 
 
 class Polynomial(object):
-    """A simple class to allow users to work with binary polynomials of varying degrees"""
+    """A simple class to allow users to work with binary polynomials of varying degrees
+
+    The derived forms of the polynomial (to_qbp, to_numpy, to_azure_terms, to_arrays
+    and var_terms) are computed once and stored in _stored until the polynomial
+    changes: every mutating method, setting bp and calling a BinaryPolynomial method
+    through the Polynomial clear them. The stored forms stay private, callers get a
+    copy they may modify (a clone, an array copy, new Terms). to_arrays is the
+    exception: an ArrayPolynomial has no method changing it in place.
+
+    Copies, and the results of +, -, * and **, share bp with the polynomial they come
+    from until one of them changes: the changing one clones bp first (copy-on-write).
+    +=, -= and *= change the polynomial in place. Changing bp directly, rather than
+    through the Polynomial, also changes the polynomials sharing it.
+
+    A polynomial built from an ArrayPolynomial (from_arrays, from_dict, from_sparse,
+    from_file of an array file, PolynomialBuilder.build) keeps it as its primary form:
+    bp, which takes one call per term to build, is only built when an operation needs
+    it. to_arrays, evaluate, write_qio, to_sparse, term_count, degree, var_list,
+    var_count and constant_term do not. A polynomial built from a DenseQubo keeps the
+    packed matrix the same way: evaluate and write_qio read it directly, to_arrays
+    converts it. PolynomialBuilder.build holds a DenseQubo when the polynomial is dense
+    enough, see DenseQubo.compact.
+    """
 
     # Used to decide whether to use qbp or bp. This can be modified later, currently set based on a test with 4100 terms (and variables).
+    # Only used without a dispatch table, see calibrate.
     _threshold = 50
+    # operation -> [[term_count, "qbp" or "bp"], ...] by increasing term_count, measured by calibrate
+    _dispatch_table = None
+    DISPATCH_TABLE_VERSION = 1
+    # Term counts benchmarked by calibrate, power squares a linear polynomial so its results grow as the square
+    CALIBRATION_SIZES = {
+        "multiply": [2**k for k in range(2, 15)],
+        "power": [2**k for k in range(2, 9)],
+    }
 
     constant_term = property(
         fset=update_storage(
@@ -34,22 +70,40 @@ class Polynomial(object):
     term_count = property()
     var_count = property()
     var_list = property()
+    # Read from the ArrayPolynomial while bp is not built
+    _array_attributes = ("constant_term", "degree", "term_count", "var_count", "var_list")
+    # The BinaryPolynomial methods changing it, the others are read-only
+    _bp_mutators = (
+        "add_constant_term",
+        "add_term",
+        "multiply",
+        "power",
+        "remove_term",
+        "remove_var",
+        "set_coefficient",
+        "sum",
+    )
 
     def __init__(self, terms=[], reduce=False):
         """
         The constructor for Polynomial class.
 
         Args:
-           terms (list): Terms used to construct polynomial.
+           terms (list): Terms used to construct polynomial, a BinaryPolynomial, an ArrayPolynomial or a DenseQubo.
            reduce (bool): The flag to decide whether or not to reduce the polynomial.
         """
         if isinstance(terms, oneqloud_polynomials.BinaryPolynomial):
             self.bp = terms.clone()
+        elif isinstance(terms, (ArrayPolynomial, DenseQubo)):
+            # bp is built from the arrays when it is first needed
+            self.bp = None
+            self._source = terms
+            if isinstance(terms, ArrayPolynomial):
+                self._cached("arrays", lambda: terms)
         else:
             self.bp = oneqloud_polynomials.BinaryPolynomial()
             for term in terms:
                 self.bp.add_term(term[0], term[1])
-        self._stored = None
         self.__reduce = reduce  # Used to decide whether to reduce the given polynomial
         # Used to store the fixed variables to be added to the solution
         self._processed_portion = {}
@@ -59,17 +113,91 @@ class Polynomial(object):
 
     def __getattr__(self, name):
         try:
-            return getattr(self.bp, name)
+            if name in ("_bp", "_owners", "_source"):
+                raise AttributeError(name)
+            if self._bp is None and name in Polynomial._array_attributes:
+                return getattr(self._source, name)
+            attr = getattr(self.bp, name)
         except AttributeError:
             err_msg = "Polynomial object does not have attribute {}".format(name)
             logger.error(err_msg)
             raise AttributeError(err_msg) from None
+        if name in Polynomial._bp_mutators:
+            # Stop sharing bp and drop the stored forms before the change
+            def method(*args, **kwargs):
+                self._own_bp()
+                self._stored = None
+                return getattr(self.bp, name)(*args, **kwargs)
+
+            return method
+        return attr
+
+    @property
+    def bp(self):
+        if self._bp is None:
+            # Stored, so that the copies sharing the arrays build it once
+            self._bp = self._cached("bp", lambda: self.to_arrays().to_bp())
+            self._source = None
+        return self._bp
+
+    @bp.setter
+    def bp(self, value):
+        self._release_bp()
+        self._stored = None
+        self._bp = value
+        # The ArrayPolynomial bp is built from when it is None
+        self._source = None
+        # The number of polynomials sharing bp, shared by all of them
+        self._owners = [1]
+
+    def _share(self):
+        """Return a copy sharing bp (and the stored forms) until one of them changes"""
+        # Not through __init__, which would build an empty BinaryPolynomial
+        poly = Polynomial.__new__(Polynomial)
+        poly._bp = self._bp
+        poly._source = self._source
+        poly._owners = self._owners
+        poly._stored = self._stored
+        poly.__reduce = False
+        poly._processed_portion = {}
+        self._owners[0] += 1
+        return poly
+
+    def _own_bp(self):
+        """Build bp, and clone it when it is shared with copies, before a change"""
+        bp = self.bp
+        if self._owners[0] > 1:
+            self._release_bp()
+            self._bp = bp.clone()
+            self._owners = [1]
+
+    def _release_bp(self):
+        owners = self.__dict__.get("_owners")
+        if owners is not None:
+            owners[0] -= 1
+
+    def __del__(self):
+        self._release_bp()
+
+    def _cached(self, key, compute):
+        """Return the stored form key, computing it if the polynomial changed since it was stored"""
+        if not isinstance(self._stored, dict):
+            self._stored = {}
+        if key not in self._stored:
+            self._stored[key] = compute()
+        return self._stored[key]
 
     @property
     def var_terms(self):
         logger.debug("()")
-        bp_ = self.bp.clone()
-        bp_.set_coefficient(0, [])
+
+        def compute():
+            bp_ = self.bp.clone()
+            bp_.set_coefficient(0, [])
+            return bp_
+
+        bp_ = self._cached("var_terms", compute).clone()
+        logger.debug("- Return")
         return bp_
 
     def add_terms(self, terms):
@@ -85,44 +213,142 @@ class Polynomial(object):
 
     @update_storage
     def power(self, exponent):
-        # QuadraticBinaryPolynomial()
         logger.debug("()")
-        if (
+        use_qbp = (
             (self.bp.degree < 2)
-            and (exponent <= 2)
-            and (self.term_count > Polynomial._threshold)
-        ):
-            qbp = self.to_qbp()
+            and (exponent == 2)
+            and Polynomial._use_qbp("power", self.term_count)
+        )
+        self._power(exponent, use_qbp)
+        logger.debug("- Return")
+
+    def _power(self, exponent, use_qbp):
+        # QuadraticBinaryPolynomial()
+        if use_qbp:
+            qbp = self._build_qbp()
             qbp.square()
             self.bp = Polynomial.from_qbp(qbp).bp
         # BinaryPolynomial()
         else:
             self.bp.power(exponent)
-        logger.debug("- Return")
 
     @update_storage
     def multiply(self, poly):
         # Will accept polynomial or constant
-        # QuadraticBinaryPolynomial()
         logger.debug("()")
-        use_qbp = True
-        if isinstance(poly, Polynomial):
-            mul_obj = poly.bp
-            use_qbp = False
-        else:
-            mul_obj = poly
-        if (
-            (self.degree <= 2)
-            and (use_qbp)
-            and (self.term_count > Polynomial._threshold)
-        ):
-            qbp = self.to_qbp()
+        use_qbp = (
+            not isinstance(poly, Polynomial)
+            and (self.degree <= 2)
+            and Polynomial._use_qbp("multiply", self.term_count)
+        )
+        self._multiply(poly, use_qbp)
+        logger.debug("- Return")
+
+    def _multiply(self, poly, use_qbp):
+        mul_obj = poly.bp if isinstance(poly, Polynomial) else poly
+        # QuadraticBinaryPolynomial()
+        if use_qbp:
+            qbp = self._build_qbp()
             qbp.multiply(mul_obj)
             self.bp = Polynomial.from_qbp(qbp).bp
         # BinaryPolynomial()
         else:
             self.bp.multiply(mul_obj)
+
+    @staticmethod
+    def _use_qbp(operation, term_count):
+        """Return True when the dispatch table (or _threshold without one) says qbp is faster"""
+        table = (Polynomial._dispatch_table or {}).get(operation)
+        if not table:
+            return term_count > Polynomial._threshold
+        # The closest measured term count below term_count, the smallest one below all of them
+        index = bisect.bisect_right([size for size, _ in table], term_count) - 1
+        return table[max(index, 0)][1] == "qbp"
+
+    @staticmethod
+    def calibrate(sizes=None, repeats=3, filename=None, seed=0):
+        """
+        Function to benchmark the qbp and bp paths of multiply and power on this host and use the faster one from now on.
+
+        Every operation is timed on random polynomials of every size, keeping the best of
+        repeats runs, and the dispatch table records the faster path for each size.
+
+        Args:
+           sizes (dict): operation -> term counts to benchmark. Defaults to CALIBRATION_SIZES.
+           repeats (int): The number of runs of each path, the fastest counts.
+           filename (str): Save the dispatch table there, see load_dispatch_table.
+           seed (int): Seed of the random polynomials.
+
+        Returns dispatch_table: operation -> [[term_count, "qbp" or "bp"], ...]
+        """
+        logger.debug("()")
+        rng = np.random.default_rng(seed)
+        sizes = Polynomial.CALIBRATION_SIZES if sizes is None else sizes
+        table = {}
+        for operation, term_counts in sizes.items():
+            if operation not in Polynomial.CALIBRATION_SIZES:
+                err_msg = f"Cannot calibrate {operation}, expected one of {list(Polynomial.CALIBRATION_SIZES)}"
+                logger.error(err_msg)
+                raise Exception(err_msg)
+            table[operation] = []
+            for term_count in sorted(term_counts):
+                if operation == "power":
+                    # A linear polynomial, squared
+                    poly = Polynomial.from_arrays(
+                        rng.normal(size=term_count), np.arange(term_count)[:, None]
+                    )
+                    run = lambda copy, use_qbp: copy._power(2, use_qbp)
+                else:
+                    # A quadratic polynomial, times a constant
+                    poly = Polynomial.from_arrays(
+                        rng.normal(size=term_count),
+                        rng.integers(0, max(2, term_count), size=(term_count, 2)),
+                    )
+                    run = lambda copy, use_qbp: copy._multiply(3.0, use_qbp)
+                timings = {}
+                for path in ("qbp", "bp"):
+                    best = np.inf
+                    for _ in range(repeats):
+                        copy = Polynomial(poly.bp)
+                        start = perf_counter()
+                        run(copy, path == "qbp")
+                        best = min(best, perf_counter() - start)
+                    timings[path] = best
+                table[operation].append(
+                    [term_count, min(timings, key=timings.get)]
+                )
+                logger.debug(f"{operation} of {term_count} terms: {timings}")
+        Polynomial._dispatch_table = table
+        if filename is not None:
+            with open(filename, "w") as f:
+                json.dump(
+                    {"version": Polynomial.DISPATCH_TABLE_VERSION, "table": table}, f
+                )
+        logger.debug("- Return")
+        return table
+
+    @staticmethod
+    def load_dispatch_table(filename):
+        """
+        Function to use a dispatch table saved by calibrate.
+
+        The table in the file named by the MSQ_DISPATCH_TABLE environment variable is loaded on import.
+
+        Args:
+           filename (str): The file written by calibrate.
+
+        Returns dispatch_table
+        """
+        logger.debug("()")
+        with open(filename) as f:
+            content = json.load(f)
+        if content.get("version") != Polynomial.DISPATCH_TABLE_VERSION:
+            err_msg = f"{filename} is not a version {Polynomial.DISPATCH_TABLE_VERSION} dispatch table"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        Polynomial._dispatch_table = content["table"]
         logger.debug("- Return")
+        return Polynomial._dispatch_table
 
     @staticmethod
     def from_qbp(qbp, reduce=False):
@@ -165,6 +391,27 @@ class Polynomial(object):
         logger.debug("- Return")
         return poly
 
+    @staticmethod
+    def from_sparse(matrix, var_list=None, convention="upper", reduce=False):
+        """
+        Function to construct a Polynomial object from a square scipy.sparse matrix without densifying it,
+        see ArrayPolynomial.from_sparse. Requires scipy.
+
+        Args:
+           matrix: The scipy.sparse matrix used to construct polynomial.
+           var_list (list): Variable indices to be used for the polynomial, one per row.
+           convention (str): "upper" for the energy x^T M x, as from_numpy, or "symmetric"
+               for a symmetric matrix holding every coupling on both sides of the diagonal.
+           reduce (bool): The flag to decide whether or not to reduce the polynomial.
+
+        Returns polynomial
+        """
+        logger.debug("()")
+        array_poly = ArrayPolynomial.from_sparse(matrix, var_list, convention)
+        poly = Polynomial(array_poly, reduce=reduce)
+        logger.debug("- Return")
+        return poly
+
     @staticmethod
     def from_azure_terms(terms):
         """
@@ -185,6 +432,12 @@ class Polynomial(object):
     @staticmethod
     def from_azure_terms_file(path):
         """Load a problem as a list of azure.quantum.optimization.Term.
+
+        Reads the files of from_file. Files pickled before the array format existed (the
+        only way to store a polynomial of degree > 2 then) are still read, with a warning:
+        unpickling runs arbitrary code, so only load pickle files from a trusted source and
+        convert them with to_file(filename, format="array").
+
         Args:
             path (string): Full path to problem components.
         Returns:
@@ -195,6 +448,10 @@ class Polynomial(object):
         try:
             poly = Polynomial.from_file(path)
         except RuntimeError:
+            logger.warning(
+                f"{path} is neither an array nor a qbp file, unpickling it. "
+                "Convert it with to_file(filename, format='array')"
+            )
             with open(path, "rb") as f:
                 poly_list = pickle.load(f)
                 poly = Polynomial(poly_list)
@@ -214,20 +471,51 @@ class Polynomial(object):
         Returns polynomial
         """
         logger.debug("()")
-        poly = Polynomial(reduce=reduce)
-        for k, v in terms_dict.items():
-            if len(k) != 2:
-                err_msg = "Key should have two indices. Higher order polynomial are not supported"
-                logger.error(err_msg)
-                raise Exception(err_msg)
-            poly.add_term(v, [k[0], k[1]])
+        keys = list(terms_dict.keys())
+        if any(len(k) != 2 for k in keys):
+            err_msg = "Key should have two indices. Higher order polynomial are not supported"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        if len(keys) == 0:
+            poly = Polynomial(reduce=reduce)
+        else:
+            poly = Polynomial.from_arrays(
+                list(terms_dict.values()), np.array(keys), reduce=reduce
+            )
+        logger.debug("- Return")
+        return poly
+
+    @staticmethod
+    def from_arrays(coefficients, indices, offsets=None, constant_term=0.0, reduce=False):
+        """
+        Function to construct a Polynomial object from arrays of terms, see ArrayPolynomial.from_arrays.
+
+        Args:
+           coefficients (numpy): The (n,) coefficients of the terms.
+           indices (numpy): The variable indices, (n, d) or flat when offsets is given.
+           offsets (numpy): The (n + 1,) term offsets into indices, None for an (n, d) array.
+           constant_term (float): The constant term of the polynomial.
+           reduce (bool): The flag to decide whether or not to reduce the polynomial.
+
+        Returns polynomial
+        """
+        logger.debug("()")
+        array_poly = ArrayPolynomial.from_arrays(
+            coefficients, indices, offsets, constant_term
+        )
+        poly = Polynomial(array_poly, reduce=reduce)
         logger.debug("- Return")
         return poly
 
     @staticmethod
     def from_file(filename, reduce=False):
         """
-        Function to construct a Polynomial object from a serialized QuadraticBinaryPolynomial object.
+        Function to construct a Polynomial object from a serialized QuadraticBinaryPolynomial object,
+        or from a file written by to_file(filename, format="array").
+
+        An array file is mapped, see ArrayPolynomial.load, and the Polynomial keeps the mapped
+        ArrayPolynomial: opening is immediate, and bp is only built when an operation needs it.
+        A serialized QuadraticBinaryPolynomial is read eagerly.
 
         Args:
            filename (str): The file containing a serialized QuadraticBinaryPolynomial object.
@@ -236,6 +524,11 @@ class Polynomial(object):
         Returns polynomial
         """
         logger.debug("()")
+        if ArrayPolynomial.is_array_file(filename):
+            # Only mapped, the terms are paged in when the polynomial reads them
+            poly = Polynomial(ArrayPolynomial.load(filename), reduce=reduce)
+            logger.debug("- Return")
+            return poly
         pr = oneqloud_polynomials.binary_polynomial.PolynomialReader(filename)
         qbp = pr.load()
         poly = Polynomial.from_qbp(qbp, reduce=reduce)
@@ -243,7 +536,16 @@ class Polynomial(object):
         return poly
 
     def to_qbp(self):
+        """
+        Returns the polynomial as a new QuadraticBinaryPolynomial, cloned from the one stored until the polynomial changes.
+        """
         logger.debug("()")
+        qubo = self._cached("qbp", self._build_qbp).clone()
+        logger.debug("- Return")
+        return qubo
+
+    def _build_qbp(self):
+        """Returns a new QuadraticBinaryPolynomial, which the caller may modify"""
         if self.degree > 2:
             err_msg = "Cannot convert to qbp object. Degree > 2."
             logger.error(err_msg)
@@ -256,9 +558,44 @@ class Polynomial(object):
                 qubo.add_term(term.coefficient, term.var_list[0])
             else:
                 qubo.add_term(term.coefficient, term.var_list[0], term.var_list[1])
-        logger.debug("- Return")
         return qubo
 
+    def to_arrays(self):
+        """
+        Returns the polynomial as an ArrayPolynomial, stored until the polynomial changes.
+        """
+
+        def compute():
+            if self._bp is None:
+                return self._source.to_arrays()
+            return ArrayPolynomial.from_bp(self.bp)
+
+        return self._cached("arrays", compute)
+
+    def _array_form(self):
+        """Return the DenseQubo the polynomial is built from while bp is not built, else to_arrays"""
+        if self._bp is None and isinstance(self._source, DenseQubo):
+            return self._source
+        return self.to_arrays()
+
+    def evaluate(self, X, var_list=None, encoding="binary"):
+        """
+        Function to compute the energy of many assignments at once, see ArrayPolynomial.evaluate.
+
+        Args:
+           X (numpy): A (samples, variables) array of assignments, or a single 1-D assignment.
+           var_list (list): The variable held by every column of X. By default column i holds variable i.
+           encoding (str): "binary" for values in {0, 1}, "spin" for values in {-1, 1}.
+
+        Returns energies
+        """
+        logger.debug("()")
+        energies = self._array_form().evaluate(
+            X, var_list=var_list, encoding=encoding
+        )
+        logger.debug("- Return")
+        return energies
+
     def to_list(self):
         logger.debug("()")
         terms = []
@@ -267,16 +604,29 @@ class Polynomial(object):
         logger.debug("- Return")
         return terms
 
-    def to_file(self, filename):
+    def to_file(self, filename, format="qbp"):
         """
         Saves a qbp Polynomial into a file.
+
+        Args:
+           filename (str): The file to write.
+           format (str): "qbp" for a serialized QuadraticBinaryPolynomial (degree <= 2),
+               "array" for the ArrayPolynomial binary format (any degree, can be mapped by ArrayPolynomial.load).
         """
         logger.debug("()")
+        if format == "array":
+            self.to_arrays().save(filename)
+            logger.debug("- Return")
+            return
+        if format != "qbp":
+            err_msg = f"Unsupported file format: {format}, expected qbp or array"
+            logger.error(err_msg)
+            raise Exception(err_msg)
         if self.degree > 2:
             err_msg = "Polynomial should not be greater than degree 2."
             logger.error(err_msg)
             raise Exception("Polynomial should not be greater than degree 2.")
-        qbp = self.to_qbp()
+        qbp = self._cached("qbp", self._build_qbp)
         pw = oneqloud_polynomials.binary_polynomial.PolynomialWriter(filename)
         pw.save(qbp)
         logger.debug("- Return")
@@ -284,6 +634,7 @@ class Polynomial(object):
     def to_numpy(self):
         """
         Returns an upper triangular matrix representation of the qbp polynomial.
+        The matrix is stored until the polynomial changes, every call returns a copy of it.
 
         """
         logger.debug("()")
@@ -296,34 +647,86 @@ class Polynomial(object):
             logger.error(err_msg)
             raise Exception(err_msg)
 
-        qbp = self.to_qbp()
-        qbp.export_array()
+        def compute():
+            array = self._cached("qbp", self._build_qbp).export_array()
+            array.flags.writeable = False
+            return array
+
+        array = self._cached("numpy", compute).copy()
+        logger.debug("- Return")
+        return array
+
+    def to_sparse(self, var_list=None, convention="upper", format="csr"):
+        """
+        Returns a sparse matrix representation of the qbp polynomial, see ArrayPolynomial.to_sparse.
+        Requires scipy.
+
+        Args:
+           var_list (list): The variable of every row and column. By default row i is variable i.
+           convention (str): "upper" for an upper triangular matrix, as to_numpy, or "symmetric".
+           format (str): The scipy.sparse format, e.g. "csr", "csc" or "coo".
+        """
+        logger.debug("()")
+        matrix = self.to_arrays().to_sparse(var_list, convention, format)
         logger.debug("- Return")
-        return qbp.export_array()
+        return matrix
 
     def to_azure_terms(
         self,
         rounding=False,
         include_constant_term=True,
     ):
-        """Convert a Qanopy Polynomial to a list of Azure Terms."""
+        """Convert a Qanopy Polynomial to a list of Azure Terms.
+
+        The Terms are stored until the polynomial changes, every call returns new Terms.
+        """
         logger.debug("()")
-        terms = [
-            self.to_azure_term(monomial, rounding=rounding)
-            for monomial in sorted(self.bp, key=str)
-            if len(monomial.var_list) > 0
-        ]
 
-        if include_constant_term is True:
-            const_term = self.constant_term
-            if rounding:
-                const_term = int(round(const_term))
+        def compute():
+            terms = [
+                self.to_azure_term(monomial, rounding=rounding)
+                for monomial in sorted(self.bp, key=str)
+                if len(monomial.var_list) > 0
+            ]
+
+            if include_constant_term is True:
+                const_term = self.constant_term
+                if rounding:
+                    const_term = int(round(const_term))
 
-            if const_term != 0:
-                terms.append(Term(c=const_term, indices=[]))
+                if const_term != 0:
+                    terms.append(Term(c=const_term, indices=[]))
+            return terms
 
+        terms = self._cached(("azure_terms", rounding, include_constant_term), compute)
+        logger.debug("- Return")
+        return [Term(c=term.c, indices=list(term.ids)) for term in terms]
+
+    def write_qio(
+        self,
+        file,
+        name="Optimization problem",
+        problem_type="pubo",
+        rounding=False,
+        compress=False,
+        version="1.0",
+    ):
+        """
+        Write the polynomial as a QIO problem without building Azure Terms, see ArrayPolynomial.write_qio.
+
+        Args:
+           file: The binary file object to write to.
+           name (str): The problem name, written in the metadata.
+           problem_type: The ProblemType, or its name.
+           rounding (bool): Round the coefficients to integers.
+           compress (bool): Write a gzip stream.
+           version (str): The version of the cost function format.
+        """
+        logger.debug("()")
+        self._array_form().write_qio(
+            file, name, problem_type, rounding, compress, version
+        )
         logger.debug("- Return")
-        return terms
 
     def to_azure_term(self, monomial, rounding=False):
         """Convert a single term of a Qanopy Polynomial to an Azure Term."""
@@ -385,12 +788,23 @@ class Polynomial(object):
         return len(self.bp)
 
     def __add__(self, other):
-        poly = Polynomial(self.bp)
+        poly = self._share()
+        poly += other
+        return poly
+
+    def __iadd__(self, other):
         if isinstance(other, Polynomial):
-            poly.sum(other)
+            self.sum(other)
         else:
-            poly.add_constant_term(other)
-        return poly
+            self.add_constant_term(other)
+        return self
+
+    def __isub__(self, other):
+        if isinstance(other, Polynomial):
+            self.sum(other * -1)
+        else:
+            self.add_constant_term(-other)
+        return self
 
     def __radd__(self, other):
         return self.__add__(other)
@@ -402,15 +816,19 @@ class Polynomial(object):
         return other + (self * -1)
 
     def __mul__(self, other):
-        poly = Polynomial(self.bp)
+        poly = self._share()
         poly.multiply(other)
         return poly
 
+    def __imul__(self, other):
+        self.multiply(other)
+        return self
+
     def __rmul__(self, other):
         return self.__mul__(other)
 
     def __pow__(self, other):
-        poly = Polynomial(self.bp)
+        poly = self._share()
         poly.power(other)
         return poly
 
@@ -438,7 +856,7 @@ class Polynomial(object):
                 )
                 self.__reduce = False
             else:
-                qbp = self.to_qbp()
+                qbp = self._build_qbp()
                 oneqloud_polynomials.binary_polynomial.preprocess(qbp)
                 if qbp.fixed_vars != {}:
                     self._processed_portion = qbp.fixed_vars
@@ -449,8 +867,17 @@ class Polynomial(object):
         logger.debug("- Return")
 
     def __copy__(self):
-        return Polynomial(self.bp)
+        return self._share()
 
     def __deepcopy__(self, memo):
-        # Shallow and deep are the same
+        # Shallow and deep are the same, bp is cloned when either copy changes
         return self.__copy__()
+
+
+if os.environ.get("MSQ_DISPATCH_TABLE"):
+    try:
+        Polynomial.load_dispatch_table(os.environ["MSQ_DISPATCH_TABLE"])
+    except Exception as e:
+        logger.error(
+            f"Failed to load the dispatch table {os.environ['MSQ_DISPATCH_TABLE']}, using _threshold, error: {e}"
+        )
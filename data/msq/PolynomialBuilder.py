@@ -0,0 +1,264 @@
+import numpy as np
+import logging.config
+from .ArrayPolynomial import ArrayPolynomial
+from .Polynomial import Polynomial
+from .DenseQubo import DenseQubo
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class PolynomialBuilder(object):
+    """Accumulate the terms of many polynomials and build their sum once
+
+    Summing polynomials with + clones the running sum every time, so adding n
+    constraints costs O(n^2). The builder appends terms to buffers that grow by
+    doubling, without merging them: duplicated terms are summed by a single
+    sort/reduce in build, see ArrayPolynomial.from_arrays.
+
+    Example:
+        builder = PolynomialBuilder()
+        for constraint in constraints:
+            builder.add_product(constraint, constraint, scale=penalty)
+        builder += objective
+        poly = builder.build()
+    """
+
+    def __init__(self, capacity=1024, index_capacity=None):
+        """
+        The constructor for PolynomialBuilder class.
+
+        Args:
+           capacity (int): The number of terms the buffers hold before growing.
+           index_capacity (int): The number of variable indices they hold. Defaults to 2 * capacity.
+        """
+        capacity = max(1, capacity)
+        index_capacity = max(1, 2 * capacity if index_capacity is None else index_capacity)
+        self._coefficients = np.empty(capacity)
+        self._lengths = np.empty(capacity, dtype=np.int64)
+        self._indices = np.empty(index_capacity, dtype=np.int64)
+        self._term_count = 0
+        self._index_count = 0
+        self.constant_term = 0.0
+
+    @property
+    def term_count(self):
+        """The number of terms added so far, duplicates included"""
+        return self._term_count
+
+    def __len__(self):
+        return self._term_count
+
+    def __repr__(self):
+        return f"PolynomialBuilder(term_count={self._term_count})"
+
+    def _append(self, coefficients, lengths, indices):
+        term_count = self._term_count + len(coefficients)
+        index_count = self._index_count + len(indices)
+        if term_count > len(self._coefficients):
+            capacity = max(term_count, 2 * len(self._coefficients))
+            self._coefficients = PolynomialBuilder._grow(self._coefficients, capacity)
+            self._lengths = PolynomialBuilder._grow(self._lengths, capacity)
+        if index_count > len(self._indices):
+            capacity = max(index_count, 2 * len(self._indices))
+            self._indices = PolynomialBuilder._grow(self._indices, capacity)
+        self._coefficients[self._term_count : term_count] = coefficients
+        self._lengths[self._term_count : term_count] = lengths
+        self._indices[self._index_count : index_count] = indices
+        self._term_count, self._index_count = term_count, index_count
+
+    @staticmethod
+    def _grow(array, capacity):
+        grown = np.empty(capacity, dtype=array.dtype)
+        grown[: len(array)] = array
+        return grown
+
+    def add_arrays(self, coefficients, indices, offsets=None, scale=1.0):
+        """
+        Add terms given as arrays, see ArrayPolynomial.from_arrays.
+
+        Args:
+           coefficients (numpy): The (n,) coefficients of the terms.
+           indices (numpy): The variable indices, (n, d) or flat when offsets is given.
+           offsets (numpy): The (n + 1,) term offsets into indices, None for an (n, d) array.
+           scale (float): Multiplies the coefficients.
+        """
+        coefficients = np.asarray(coefficients, dtype=np.float64).ravel() * scale
+        indices = np.asarray(indices)
+        if offsets is None:
+            if indices.ndim != 2 or indices.shape[0] != len(coefficients):
+                err_msg = "indices should be an (n, d) array matching the n coefficients"
+                logger.error(err_msg)
+                raise Exception(err_msg)
+            lengths = np.full(len(coefficients), indices.shape[1], dtype=np.int64)
+        else:
+            offsets = np.asarray(offsets, dtype=np.int64)
+            if (
+                len(offsets) != len(coefficients) + 1
+                or offsets[0] != 0
+                or offsets[-1] != indices.size
+            ):
+                err_msg = "offsets should have n + 1 entries from 0 to the number of indices"
+                logger.error(err_msg)
+                raise Exception(err_msg)
+            lengths = np.diff(offsets)
+        self._append(coefficients, lengths, indices.ravel())
+
+    def add_term(self, coefficient, var_list):
+        """Add coefficient times the product of the variables of var_list, [] for a constant"""
+        if len(var_list) == 0:
+            self.constant_term += coefficient
+        else:
+            self._append([coefficient], [len(var_list)], var_list)
+
+    def add_terms(self, terms):
+        """Add a list of [coefficient, var_list] terms"""
+        lengths = np.array([len(term[1]) for term in terms], dtype=np.int64)
+        indices = np.fromiter(
+            (var for term in terms for var in term[1]),
+            dtype=np.int64,
+            count=int(lengths.sum()),
+        )
+        self._append([term[0] for term in terms], lengths, indices)
+
+    def add_constant(self, value):
+        self.constant_term += value
+
+    def add(self, poly, scale=1.0):
+        """
+        Add a polynomial times scale.
+
+        Args:
+           poly: A Polynomial, an ArrayPolynomial, a DenseQubo or a PolynomialBuilder.
+           scale (float): Multiplies the polynomial.
+        """
+        if isinstance(poly, PolynomialBuilder):
+            self._append(
+                poly._coefficients[: poly._term_count] * scale,
+                poly._lengths[: poly._term_count],
+                poly._indices[: poly._index_count],
+            )
+            self.constant_term += poly.constant_term * scale
+            return
+        array_poly = poly if isinstance(poly, ArrayPolynomial) else poly.to_arrays()
+        coefficients, indices, offsets = array_poly.to_csr()
+        self._append(coefficients * scale, np.diff(offsets), indices)
+        self.constant_term += array_poly.constant_term * scale
+
+    def add_product(self, first, second, scale=1.0):
+        """
+        Add the product of two polynomials times scale, e.g. the square of a constraint as a penalty.
+
+        The product of every pair of terms is appended, nb_terms(first) * nb_terms(second)
+        terms, without building either product polynomial.
+
+        Args:
+           first: A Polynomial, an ArrayPolynomial or a DenseQubo.
+           second: A Polynomial, an ArrayPolynomial or a DenseQubo.
+           scale (float): Multiplies the product.
+        """
+        first_coefficients, first_lengths, first_offsets, first_indices = (
+            PolynomialBuilder._terms(first)
+        )
+        second_coefficients, second_lengths, second_offsets, second_indices = (
+            PolynomialBuilder._terms(second)
+        )
+        # Pair p is the product of term i[p] of first and term j[p] of second
+        i = np.repeat(np.arange(len(first_coefficients)), len(second_coefficients))
+        j = np.tile(np.arange(len(second_coefficients)), len(first_coefficients))
+        coefficients = first_coefficients[i] * second_coefficients[j] * scale
+        first_part, second_part = first_lengths[i], second_lengths[j]
+        lengths = first_part + second_part
+        # The variables of pair p are those of term i[p] followed by those of term j[p]
+        pairs = np.repeat(np.arange(len(lengths)), lengths)
+        positions = np.arange(len(pairs)) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        in_first = positions < first_part[pairs]
+        indices = np.empty(len(pairs), dtype=np.int64)
+        indices[in_first] = first_indices[
+            first_offsets[i[pairs[in_first]]] + positions[in_first]
+        ]
+        in_second = ~in_first
+        indices[in_second] = second_indices[
+            second_offsets[j[pairs[in_second]]]
+            + positions[in_second]
+            - first_part[pairs[in_second]]
+        ]
+        constant = lengths == 0
+        self.constant_term += float(coefficients[constant].sum())
+        self._append(coefficients[~constant], lengths[~constant], indices)
+
+    @staticmethod
+    def _terms(poly):
+        """Return the coefficients, lengths, offsets and indices of the terms of poly, its constant as a term of length 0"""
+        array_poly = poly if isinstance(poly, ArrayPolynomial) else poly.to_arrays()
+        coefficients, indices, offsets = array_poly.to_csr()
+        if array_poly.constant_term != 0:
+            coefficients = np.append(coefficients, array_poly.constant_term)
+            offsets = np.append(offsets, offsets[-1])
+        return coefficients, np.diff(offsets), offsets, indices
+
+    def __iadd__(self, other):
+        if np.isscalar(other):
+            self.add_constant(other)
+        else:
+            self.add(other)
+        return self
+
+    def __isub__(self, other):
+        if np.isscalar(other):
+            self.add_constant(-other)
+        else:
+            self.add(other, scale=-1.0)
+        return self
+
+    def clear(self):
+        """Remove all the terms, keeping the buffers"""
+        self._term_count = 0
+        self._index_count = 0
+        self.constant_term = 0.0
+
+    def build_arrays(self):
+        """
+        Merge the terms added so far into an ArrayPolynomial.
+
+        Returns array_polynomial
+        """
+        logger.debug("()")
+        offsets = np.zeros(self._term_count + 1, dtype=np.int64)
+        np.cumsum(self._lengths[: self._term_count], out=offsets[1:])
+        array_poly = ArrayPolynomial.from_arrays(
+            self._coefficients[: self._term_count],
+            self._indices[: self._index_count],
+            offsets,
+            self.constant_term,
+        )
+        logger.debug("- Return")
+        return array_poly
+
+    def build(self, reduce=False, compact=True):
+        """
+        Merge the terms added so far into a Polynomial. The builder can keep adding terms afterwards.
+
+        The Polynomial keeps the merged ArrayPolynomial, or a DenseQubo when the polynomial is
+        dense enough for it to be smaller (see DenseQubo.compact). Its BinaryPolynomial is only
+        built (one call per term) when an operation needs it, e.g. add_term or multiply. Use
+        build_arrays to get the ArrayPolynomial itself.
+
+        Args:
+           reduce (bool): The flag to decide whether or not to reduce the polynomial.
+           compact (bool): Hold a DenseQubo past the density threshold of DenseQubo.compact.
+
+        Returns polynomial
+        """
+        logger.debug("()")
+        source = self.build_arrays()
+        if compact:
+            source = DenseQubo.compact(source)
+        poly = Polynomial(source, reduce=reduce)
+        logger.debug("- Return")
+        return poly
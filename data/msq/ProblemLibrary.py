@@ -9,6 +9,7 @@ from azure.storage.blob import ContainerClient
 from azure.quantum.job.job import Job
 from azure.quantum.optimization import OnlineProblem
 from logger.logger_config import LOGGING_CONFIG
+from .DenseQubo import DenseQubo
 
 # Set up logger
 logging.config.dictConfig(LOGGING_CONFIG)
@@ -18,6 +19,9 @@ logger = logging.getLogger(__name__)
 class ProblemLibrary:
     """A collection of methods used to manage previously uploaded problems"""
 
+    # The cost function format version of the random QUBOs
+    SOLVER_FORMAT_VERSION = "1.1"
+
     @classmethod
     def get_problem_by_blob_name(cls, blob_name) -> OnlineProblem:
         """Return an OnlineProblem, for a previously uploaded problem, given its blob name"""
@@ -40,59 +44,35 @@ class ProblemLibrary:
             return -1
 
     @classmethod
-    def _random_qubo_json(cls, n):
-        """Generate a random QUBO"""
-        logger.debug("()")
-        INPUT_DATA_METADATA_NAME = "metadata_name"
-        SOLVER_FORMAT_VERSION = "1.1"
-
-        # create qubo request
-        terms_list = []
-
-        if n > 0:
-            # create random n x n matrix of negative float coefficient values
-            result_array = np.random.uniform(-1000, 0, (n, n))
-
-            # add random non-zero float constant value
-            c = np.random.uniform(-1000, 0) * cls._pos_or_neg()
-            term = {"c": c, "ids": []}
-            terms_list.append(term)
-
-            # add upper triangular of matrix
-            for i in range(n):
-                for j in range(i, n):
-                    # add random non-zero float coefficient value
-                    if i == j:
-                        c = result_array[i][j] * cls._pos_or_neg()
-                        term = {"c": c, "ids": [i]}
-                        terms_list.append(term)
-                    else:
-                        c = result_array[i][j] * cls._pos_or_neg()
-                        term = {"c": c, "ids": [i, j]}
-                        terms_list.append(term)
-
-        qubo_json = {
-            "metadata": {"name": INPUT_DATA_METADATA_NAME},
-            "cost_function": {
-                "type": "ising",
-                "version": SOLVER_FORMAT_VERSION,
-                "terms": terms_list,
-            },
-        }
+    def _random_dense_qubo(cls, n, dtype=np.float64):
+        """Generate a random fully dense QUBO of n variables, as a DenseQubo
 
+        Every coefficient of the upper triangle, diagonal included, and the constant term
+        are drawn uniformly from [-1000, 0] and given a random sign.
+        """
+        logger.debug("()")
+        packed = np.random.uniform(-1000, 0, n * (n + 1) // 2)
+        packed *= np.where(np.random.rand(len(packed)) < 0.5, 1, -1)
+        c = np.random.uniform(-1000, 0) * cls._pos_or_neg() if n > 0 else 0.0
+        qubo = DenseQubo(packed.astype(dtype), range(n), constant_term=c)
         logger.debug("- Return")
-        return qubo_json
+        return qubo
 
     @classmethod
     def generate_random_qubo(cls, size, blob_name=""):
-        """Generate and upload a random QUBO"""
-        # create QUBO
+        """Generate and upload a random QUBO, as an ising cost function of format SOLVER_FORMAT_VERSION"""
         logger.debug("()")
-        qubo = cls._random_qubo_json(n=size)
+        qubo = cls._random_dense_qubo(n=size)
         if blob_name == "":
             blob_name = str(uuid.uuid4()) + "_random_qubo_" + str(size)
         # upload QUBO to Azure Blob Storage
-        blob_uri = cls.upload_problem(qubo=qubo, blob_name=blob_name)
+        blob_uri = cls.upload_polynomial(
+            qubo,
+            blob_name=blob_name,
+            name="metadata_name",
+            problem_type="ising",
+            version=cls.SOLVER_FORMAT_VERSION,
+        )
 
         logger.debug("- Return")
         return blob_name, blob_uri
@@ -121,6 +101,35 @@ class ProblemLibrary:
         logger.debug("- Return")
         return blob_name, blob_uri
 
+    @classmethod
+    def upload_polynomial(
+        cls, poly, blob_name, name=None, problem_type="pubo", version="1.0"
+    ):
+        """Upload a Polynomial, ArrayPolynomial or DenseQubo, streamed to gzip without building Terms or the JSON string"""
+        logger.debug("()")
+        out = io.BytesIO()
+        poly.write_qio(
+            out,
+            name=name or blob_name,
+            problem_type=problem_type,
+            compress=True,
+            version=version,
+        )
+        blob = out.getvalue()
+
+        container_uri = azure_config.WORKSPACE.get_container_uri(
+            container_name="qio-problems"
+        )
+        blob_uri = Job.upload_input_data(
+            input_data=blob,
+            blob_name=blob_name,
+            container_uri=container_uri,
+            encoding="gzip",
+            content_type="application/json",
+        )
+        logger.debug("- Return")
+        return blob_uri
+
     @classmethod
     def upload_problem(cls, qubo, blob_name):
         """Upload a QUBO"""
@@ -0,0 +1,79 @@
+import json
+import logging.config
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class ReportWriter:
+    """Write job report rows to a file-like object, one row at a time
+
+    Two formats are supported:
+        csv: the format of Experiment.get_experiment_details_as_string, missing values are null
+        jsonl: one JSON object per line, missing values are null
+    """
+
+    FIELDS = [
+        "creation_time",
+        "id",
+        "target",
+        "status",
+        "total_time",
+        "queue_time",
+        "execution_time",
+        "cost",
+        "error_message",
+    ]
+    FORMATS = ["csv", "jsonl"]
+
+    def __init__(self, file, format="csv"):
+        """
+        Initialize the ReportWriter.
+
+        Args:
+            file: A text file-like object (anything with a write method).
+            format (str): "csv" or "jsonl".
+        """
+        if format not in ReportWriter.FORMATS:
+            err_msg = f"Unsupported report format: {format}, expected one of {ReportWriter.FORMATS}"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        self.file = file
+        self.format = format
+
+    @staticmethod
+    def to_csv(row) -> str:
+        """Format a report row as a CSV line, the line starts with a newline"""
+        values = []
+        for field in ReportWriter.FIELDS:
+            value = row.get(field)
+            if value is None:
+                value = "null"
+            elif field == "error_message":
+                value = f'"{value}"'
+            values.append(str(value))
+        return "\n" + ", ".join(values)
+
+    @staticmethod
+    def to_json(row) -> str:
+        """Format a report row as a JSON line, the line ends with a newline"""
+        return json.dumps({field: row.get(field) for field in ReportWriter.FIELDS}) + "\n"
+
+    def write_header(self):
+        """Write the CSV header, JSON Lines files have no header"""
+        if self.format == "csv":
+            self.file.write("\n" + ", ".join(ReportWriter.FIELDS))
+
+    def write(self, text):
+        """Write preformatted text"""
+        self.file.write(text)
+
+    def write_row(self, row):
+        """Write a report row (a dictionary with the FIELDS keys)"""
+        if self.format == "csv":
+            self.file.write(ReportWriter.to_csv(row))
+        else:
+            self.file.write(ReportWriter.to_json(row))
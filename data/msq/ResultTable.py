@@ -0,0 +1,183 @@
+import math
+import numpy as np
+import logging.config
+from datetime import datetime, timezone
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class ResultTable:
+    """A flat, typed, columnar view of the job details of experiments
+
+    Every column is a numpy array with one entry per job. Times are float seconds
+    (NaN when unknown), indices are integers and categorical columns are stored as
+    int32 codes into a list of categories (-1 when missing).
+    """
+
+    # name -> numpy dtype, "category" for categorical columns
+    SCHEMA = {
+        "id": "str",
+        "experiment_id": "category",
+        "target": "category",
+        "status": "category",
+        "solver": "category",
+        "creation_time": "datetime64[us]",
+        "execution_time": "float64",
+        "queue_time": "float64",
+        "total_time": "float64",
+        # Same as execution_time, the column VisualizationGenerator works with
+        "solve_time": "float64",
+        "cost": "float64",
+        "solver_list_index": "int64",
+        "problem_list_index": "int64",
+        "iteration": "int64",
+        "num_iterations": "int64",
+    }
+
+    def __init__(self, columns, categories):
+        """
+        Initialize the ResultTable.
+
+        Args:
+            columns (dict): column name -> numpy array.
+            categories (dict): categorical column name -> list of categories.
+        """
+        self.columns = columns
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def __getitem__(self, name):
+        """Return a column, categorical columns are decoded to an object array"""
+        if name in self.categories:
+            categories = np.array(self.categories[name] + [None], dtype=object)
+            return categories[self.columns[name]]
+        return self.columns[name]
+
+    @staticmethod
+    def _float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
+
+    @staticmethod
+    def _datetime(value):
+        if value is None or value == "None":
+            return np.datetime64("NaT", "us")
+        value = datetime.fromisoformat(value)
+        if value.tzinfo is not None:
+            # numpy datetimes are naive, store them in UTC
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return np.datetime64(value, "us")
+
+    @classmethod
+    def _encode(cls, values):
+        categories = sorted({value for value in values if value is not None})
+        codes = {category: code for code, category in enumerate(categories)}
+        return (
+            np.array([codes.get(value, -1) for value in values], dtype=np.int32),
+            categories,
+        )
+
+    @classmethod
+    def from_job_details(cls, experiment_details_list):
+        """
+        Build a ResultTable from job details objects, as returned by Experiment.get_experiment_details
+        """
+        logger.debug("()")
+        rows = {name: [] for name in cls.SCHEMA}
+        for job_details in experiment_details_list:
+            experiment = job_details["experiment"]
+            rows["id"].append(job_details["id"])
+            rows["experiment_id"].append(experiment["experiment_id"])
+            rows["target"].append(job_details["target"])
+            rows["status"].append(job_details["status"])
+            rows["solver"].append(job_details["solver"]["class_name"])
+            rows["creation_time"].append(cls._datetime(job_details["creation_time"]))
+            for name in ("execution_time", "queue_time", "total_time"):
+                rows[name].append(cls._float(job_details.get(name)))
+            rows["solve_time"].append(rows["execution_time"][-1])
+            rows["cost"].append(cls._float(job_details.get("cost")))
+            for name in (
+                "solver_list_index",
+                "problem_list_index",
+                "iteration",
+                "num_iterations",
+            ):
+                rows[name].append(experiment[name])
+
+        columns = {}
+        categories = {}
+        for name, dtype in cls.SCHEMA.items():
+            if dtype == "category":
+                columns[name], categories[name] = cls._encode(rows[name])
+            elif dtype == "str":
+                columns[name] = np.array(rows[name], dtype=str)
+            else:
+                columns[name] = np.array(rows[name], dtype=dtype)
+        logger.debug("- Return")
+        return cls(columns, categories)
+
+    def to_records(self):
+        """Return the table as a list of flat dictionaries (e.g. for VisualizationGenerator)"""
+        decoded = {name: self[name] for name in self.columns}
+        records = []
+        for i in range(len(self)):
+            record = {}
+            for name, column in decoded.items():
+                value = column[i]
+                record[name] = value.item() if hasattr(value, "item") else value
+            records.append(record)
+        return records
+
+    def to_arrow(self):
+        """
+        Return the table as a pyarrow.Table, with categorical columns dictionary encoded.
+
+        Requires the pyarrow package.
+        """
+        logger.debug("()")
+        try:
+            import pyarrow
+        except ImportError:
+            err_msg = "pyarrow is required to export a ResultTable to Arrow, Parquet or Feather"
+            logger.error(err_msg)
+            raise Exception(err_msg) from None
+
+        arrays = {}
+        for name, column in self.columns.items():
+            if name in self.categories:
+                indices = pyarrow.array(column, mask=column < 0)
+                arrays[name] = pyarrow.DictionaryArray.from_arrays(
+                    indices, pyarrow.array(self.categories[name], type=pyarrow.string())
+                )
+            elif column.dtype.kind == "M":
+                arrays[name] = pyarrow.array(
+                    column, type=pyarrow.timestamp("us", tz="UTC")
+                )
+            elif column.dtype.kind == "f":
+                arrays[name] = pyarrow.array(column, from_pandas=True)
+            else:
+                arrays[name] = pyarrow.array(column)
+        logger.debug("- Return")
+        return pyarrow.table(arrays)
+
+    def to_parquet(self, path):
+        """Write the table to a Parquet file. Requires the pyarrow package."""
+        table = self.to_arrow()
+        import pyarrow.parquet
+
+        pyarrow.parquet.write_table(table, path)
+
+    def to_feather(self, path):
+        """Write the table to a Feather file. Requires the pyarrow package."""
+        table = self.to_arrow()
+        import pyarrow.feather
+
+        pyarrow.feather.write_feather(table, path)
@@ -0,0 +1,155 @@
+import threading
+import logging.config
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from azure.quantum import Job
+from azure.quantum.target.solvers import Solver
+from azure.quantum.optimization import Problem
+from .LocalSolver import LocalSolver
+
+# from logger.logger_config import LOGGING_CONFIG
+
+# Set up logger
+# logging.config.dictConfig(LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+class SubmissionEngine:
+    """Submit jobs to solvers on a bounded worker pool, limiting concurrency per target
+
+    Submissions above the per target limit wait in a queue of their target rather
+    than on the pool, so a worker thread never blocks on a busy target while the
+    submissions of other targets are waiting.
+    """
+
+    def __init__(self, max_workers=8, max_workers_per_target=None):
+        """
+        Initialize the SubmissionEngine.
+
+        Args:
+            max_workers (int): Maximum number of submissions running at the same time.
+            max_workers_per_target (int): Maximum number of submissions running at the
+                same time for a single target. None means only max_workers applies.
+        """
+        if max_workers < 1:
+            err_msg = "max_workers should be greater than 0"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        if max_workers_per_target is not None and max_workers_per_target < 1:
+            err_msg = "max_workers_per_target should be greater than 0"
+            logger.error(err_msg)
+            raise Exception(err_msg)
+        self.max_workers = max_workers
+        self.max_workers_per_target = max_workers_per_target
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Target name -> (number of running submissions, queue of waiting submissions)
+        self._target_queues = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    @staticmethod
+    def target_name(solver):
+        """Return the name used to group submissions of a solver (e.g. 1qbit.tabu)"""
+        return getattr(solver, "name", None) or type(solver).__name__
+
+    @staticmethod
+    def submit_with_metadata(solver, problem, metadata=None):
+        """
+        Submit a problem to a solver, attaching metadata (a dict of strings) to the job.
+
+        Solver.submit cannot set job metadata, so a problem that is already uploaded
+        (e.g. an OnlineProblem) is submitted the same way Solver.submit does it, with the
+        metadata added. Local solvers take the metadata directly. Other problems and
+        solvers (e.g. a Problem whose upload failed) go through solver.submit without
+        metadata, with a warning, and cannot be found by Experiment.from_workspace.
+        """
+        if isinstance(solver, LocalSolver):
+            return solver.submit(problem, metadata=metadata)
+        if metadata is None:
+            return solver.submit(problem)
+        if (
+            not isinstance(solver, Solver)
+            # Solvers overriding submit (e.g. Toshiba) may submit differently
+            or type(solver).submit is not Solver.submit
+            or getattr(problem, "uploaded_blob_uri", None) is None
+            or isinstance(problem, Problem)
+        ):
+            logger.warning(
+                f"Submitting {problem} to {SubmissionEngine.target_name(solver)} without metadata, "
+                "the job cannot be found by Experiment.from_workspace"
+            )
+            return solver.submit(problem)
+        return Job.from_storage_uri(
+            workspace=solver.workspace,
+            name=problem.name,
+            target=solver.name,
+            input_data_uri=problem.uploaded_blob_uri,
+            provider_id=solver.provider_id,
+            input_data_format=solver.input_data_format,
+            output_data_format=solver.output_data_format,
+            input_params=solver.params,
+            metadata=metadata,
+        )
+
+    def _run(self, name, task):
+        """Run a task of the target, then the tasks queued for it meanwhile"""
+        while task is not None:
+            future, solver, problem, metadata = task
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(
+                        self.submit_with_metadata(solver, problem, metadata)
+                    )
+                except BaseException as e:
+                    future.set_exception(e)
+            with self._lock:
+                running, queue = self._target_queues[name]
+                if queue:
+                    task = queue.popleft()
+                else:
+                    task = None
+                    self._target_queues[name] = (running - 1, queue)
+
+    def submit(self, solver, problem, metadata=None):
+        """
+        Schedule the submission of a problem to a solver on the worker pool.
+
+        Args:
+            solver: The solver the problem is submitted to.
+            problem: The problem to submit.
+            metadata (dict): Strings attached to the job, see submit_with_metadata.
+
+        Returns:
+            future: a concurrent.futures.Future resolving to the submitted job
+        """
+        logger.debug("()")
+        if self.max_workers_per_target is None:
+            future = self._executor.submit(
+                self.submit_with_metadata, solver, problem, metadata
+            )
+            logger.debug("- Return")
+            return future
+        future = Future()
+        task = (future, solver, problem, metadata)
+        name = self.target_name(solver)
+        with self._lock:
+            running, queue = self._target_queues.get(name, (0, deque()))
+            if running < self.max_workers_per_target:
+                self._target_queues[name] = (running + 1, queue)
+            else:
+                self._target_queues[name] = (running, queue)
+                queue.append(task)
+                task = None
+        if task is not None:
+            self._executor.submit(self._run, name, task)
+        logger.debug("- Return")
+        return future
+
+    def shutdown(self, wait=True):
+        """Stop accepting submissions and release the worker threads"""
+        self._executor.shutdown(wait=wait)
@@ -1,8 +1,10 @@
+import io
+import json
 from unittest import TestCase
 from msq.Experiment import Experiment
 from unittest.mock import patch, MagicMock
 
-from azure.quantum.optimization import Problem, ProblemType, Term
+from azure.quantum.optimization import Problem, ProblemType, Term, OnlineProblem
 from azure.quantum.target.oneqbit import TabuSearch, PticmSolver, PathRelinkingSolver
 import azure_config
 
@@ -246,3 +248,333 @@ class ExperimentTest(TestCase):
                 mock_job, mock_solver, mock_problem, mock_experiment
             )
         )
+
+    def test_submit_uploads_problem_once(self):
+        problem = Problem(name="Problem-upload", problem_type=ProblemType.pubo)
+        problem.add_terms(terms=[Term(c=-9, indices=[0]), Term(c=5, indices=[2, 0])])
+
+        def upload(workspace, blob_name):
+            problem.uploaded_blob_uri = "https://blob/" + blob_name
+
+        solver_list = [MagicMock(), MagicMock()]
+        experiment = Experiment(solver_list, [problem, problem], num_iterations=3)
+        with patch.object(problem, "upload", side_effect=upload) as mock_upload:
+            experiment.submit()
+
+        mock_upload.assert_called_once()
+        for solver in solver_list:
+            self.assertEqual(solver.submit.call_count, 6)
+            for call in solver.submit.call_args_list:
+                submitted = call.args[0]
+                self.assertIsInstance(submitted, OnlineProblem)
+                self.assertEqual(submitted.uploaded_blob_uri, problem.uploaded_blob_uri)
+        self.assertEqual(
+            experiment.experiment[1]["problems"][0]["input_data_uri"],
+            problem.uploaded_blob_uri,
+        )
+
+    @patch.object(Problem, "upload")
+    def test_submit_invalid_problem_keeps_order(self, mock_upload):
+        import tempfile
+
+        invalid = Problem(name="Problem-invalid", problem_type=ProblemType.pubo)
+
+        def check_valid_problem(problem):
+            if problem is invalid:
+                raise Exception("invalid problem")
+
+        job_ids = iter(range(10))
+
+        def submit(solver, problem, metadata):
+            job = MagicMock()
+            job.id = f"job-{next(job_ids)}"
+            job.details.input_params = {"params": {}}
+            job.details.metadata = metadata
+            return job
+
+        solver = MagicMock()
+        solver.check_valid_problem.side_effect = check_valid_problem
+        with tempfile.TemporaryDirectory() as directory, patch(
+            "msq.Experiment.SubmissionEngine.submit_with_metadata", side_effect=submit
+        ) as mock_submit:
+            experiment = Experiment(
+                [solver],
+                [invalid] + self.problem_list,
+                num_iterations=2,
+                checkpoint_dir=directory,
+            )
+            experiment.submit()
+            loaded = Experiment.load(experiment.experiment_id, directory)
+
+        problems = experiment.experiment[0]["problems"]
+        self.assertEqual(
+            [problem["iterations"] for problem in problems], [[], ["job-0", "job-1"]]
+        )
+        self.assertEqual(loaded.experiment, experiment.experiment)
+        self.assertEqual(mock_submit.call_count, 2)
+        for call in mock_submit.call_args_list:
+            self.assertEqual(call.args[2]["problem_list_index"], "1")
+
+    def test_get_experiment_details_job_store(self):
+        import tempfile
+        from tests.unittest.test_job_store import make_job
+
+        job = make_job("job-1", "Succeeded")
+        job.workspace = MagicMock()
+        job.download_data = MagicMock(
+            return_value=b'{"solutions": [{"cost": -9.0}], "parameters": {"seed": "3"}}'
+        )
+        mock_workspace = MagicMock()
+        mock_workspace.get_job.return_value = job
+
+        with tempfile.TemporaryDirectory() as directory:
+            experiment = Experiment(
+                self.solver_list, self.problem_list, job_store_dir=directory
+            )
+            experiment.workspace = mock_workspace
+            experiment.job_id_list = ["job-1"]
+            experiment.experiment = [
+                {
+                    "solver": "solver",
+                    "input_params": {},
+                    "problems": [
+                        {"input_data_uri": None, "num_iterations": 1, "iterations": ["job-1"]}
+                    ],
+                }
+            ]
+            first = experiment.get_experiment_details()
+            experiment.get_experiment_details_as_string()
+            second = experiment.get_experiment_details()
+            experiment.job_store.close()
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["cost"], -9.0)
+        # The finished job and its results are only fetched once
+        mock_workspace.get_job.assert_called_once()
+        job.download_data.assert_called_once()
+
+    def test_get_experiment_details_parallel_download(self):
+        import time
+        from tests.unittest.test_job_store import make_job
+
+        jobs = {}
+        for i, delay in enumerate([0.03, 0.0, 0.01]):
+            job = make_job(f"job-{i}", "Succeeded")
+
+            def download_data(uri, i=i, delay=delay):
+                time.sleep(delay)
+                if i == 1:
+                    raise RuntimeError("download failed")
+                return b'{"solutions": [{"cost": %d}]}' % i
+
+            job.download_data = MagicMock(side_effect=download_data)
+            jobs[job.id] = job
+        mock_workspace = MagicMock()
+        mock_workspace.get_job.side_effect = lambda job_id: jobs[job_id]
+
+        experiment = Experiment(self.solver_list, self.problem_list, download_workers=3)
+        experiment.workspace = mock_workspace
+        experiment.job_id_list = list(jobs)
+        experiment.experiment = [
+            {
+                "solver": "solver",
+                "input_params": {},
+                "problems": [
+                    {"input_data_uri": None, "num_iterations": 3, "iterations": list(jobs)}
+                ],
+            }
+        ]
+        details = experiment.get_experiment_details()
+
+        self.assertEqual([d["id"] for d in details], ["job-0", "job-1", "job-2"])
+        self.assertEqual([d["experiment"]["iteration"] for d in details], [0, 1, 2])
+        self.assertEqual([d["cost"] for d in details], [0, None, 2])
+
+    def test_iter_completed(self):
+        from tests.unittest.test_job_store import make_job
+
+        # job-1 finishes on the first poll, job-0 on the second
+        remaining_polls = {"job-0": 2, "job-1": 1}
+
+        def get_job(job_id):
+            remaining_polls[job_id] -= 1
+            status = "Cancelled" if remaining_polls[job_id] <= 0 else "Executing"
+            job = make_job(job_id, status)
+            job.details.cancellation_time = job.details.end_execution_time
+            return job
+
+        mock_workspace = MagicMock()
+        mock_workspace.get_job.side_effect = get_job
+        experiment = Experiment(
+            self.solver_list,
+            self.problem_list,
+            poller_options={"initial_interval": 0, "list_threshold": None},
+        )
+        experiment.workspace = mock_workspace
+        experiment.job_id_list = ["job-0", "job-1"]
+        experiment.experiment = [
+            {
+                "solver": "solver",
+                "input_params": {},
+                "problems": [
+                    {
+                        "input_data_uri": None,
+                        "num_iterations": 2,
+                        "iterations": ["job-0", "job-1"],
+                    }
+                ],
+            }
+        ]
+
+        details = list(experiment.iter_completed())
+        self.assertEqual([d["id"] for d in details], ["job-1", "job-0"])
+        self.assertEqual([d["experiment"]["iteration"] for d in details], [1, 0])
+        self.assertEqual(details[0]["status"], "Cancelled")
+
+        # Jobs that already finished are reported by the callback variant without polling
+        received = []
+        experiment.wait_until_completed(callback=received.append)
+        self.assertEqual([d["id"] for d in received], ["job-1", "job-0"])
+        self.assertEqual(mock_workspace.get_job.call_count, 3)
+
+    @patch.object(Problem, "upload")
+    def test_load_checkpoint(self, mock_upload):
+        import tempfile
+
+        solver = MagicMock()
+        job_ids = iter(range(10))
+
+        def submit(problem):
+            job = MagicMock()
+            job.id = f"job-{next(job_ids)}"
+            job.details.input_params = {"params": {}}
+            return job
+
+        solver.submit.side_effect = submit
+        with tempfile.TemporaryDirectory() as directory:
+            experiment = Experiment(
+                [solver, solver],
+                self.problem_list * 2,
+                num_iterations=2,
+                checkpoint_dir=directory,
+            )
+            experiment.submit()
+            loaded = Experiment.load(experiment.experiment_id, directory)
+
+            with self.assertRaises(Exception):
+                Experiment.load("missing", directory)
+
+        self.assertEqual(loaded.job_id_list, experiment.job_id_list)
+        self.assertEqual(loaded.experiment, experiment.experiment)
+        self.assertEqual(loaded.date, experiment.date)
+        self.assertEqual(loaded.num_iterations, 2)
+        self.assertEqual(solver.submit.call_count, 8)
+
+    def test_from_workspace(self):
+        from tests.unittest.test_job_store import make_job
+
+        jobs = []
+        for solver_index, problem_index, iteration, status in [
+            (1, 0, 0, "Succeeded"),
+            (0, 0, 1, "Executing"),
+            (0, 0, 0, "Succeeded"),
+        ]:
+            job = make_job(f"job-{solver_index}-{iteration}", status)
+            job.details.metadata = {
+                "experiment_id": "experiment-1",
+                "date": "2022-01-01 00:00:00+00:00",
+                "solver": f"solver-{solver_index}",
+                "solver_list_index": str(solver_index),
+                "problem_list_index": str(problem_index),
+                "num_iterations": "2",
+                "iteration": str(iteration),
+            }
+            jobs.append(job)
+        other_job = make_job("other", "Succeeded")
+        other_job.details.metadata = {"experiment_id": "experiment-2"}
+        mock_workspace = MagicMock()
+        mock_workspace.list_jobs.return_value = jobs + [other_job]
+
+        experiment = Experiment.from_workspace("experiment-1", mock_workspace)
+
+        self.assertEqual(experiment.job_id_list, ["job-0-0", "job-0-1", "job-1-0"])
+        self.assertEqual(
+            [solver_object["solver"] for solver_object in experiment.experiment],
+            ["solver-0", "solver-1"],
+        )
+        self.assertEqual(experiment.num_iterations, 2)
+        self.assertEqual(str(experiment.date), "2022-01-01 00:00:00+00:00")
+        # Only the job that had not finished in the listing is polled
+        mock_workspace.get_job.return_value = make_job("job-0-1", "Executing")
+        self.assertFalse(experiment.has_completed())
+        mock_workspace.get_job.assert_called_once_with("job-0-1")
+
+    @patch.object(Experiment, "get_experiment_details")
+    def test_to_table(self, mock_func):
+        from tests.unittest.test_result_table import experiment_details_list
+
+        mock_func.return_value = experiment_details_list
+        table = self.experiment.to_table()
+
+        self.assertEqual(list(table["id"]), ["a", "b", "c"])
+        self.assertEqual(table.columns["total_time"][2], 4.0)
+
+    def test_write_experiment_details(self):
+        from tests.unittest.test_job_store import make_job
+
+        succeeded_job = make_job("a", "Succeeded")
+        succeeded_job.results = {"solutions": [{"cost": -3.0}]}
+        jobs = {"a": succeeded_job, "b": make_job("b", "Executing")}
+        mock_workspace = MagicMock()
+        mock_workspace.get_job.side_effect = lambda job_id: jobs[job_id]
+        self.experiment.workspace = mock_workspace
+        self.experiment.job_id_list = ["a", "b"]
+
+        csv_file = io.StringIO()
+        self.experiment.write_experiment_details(csv_file)
+        self.assertEqual(
+            csv_file.getvalue(),
+            "\ncreation_time, id, target, status, total_time, queue_time, execution_time, cost, error_message"
+            "\n2022-01-01 00:00:00+00:00, a, 1qbit.tabu, Succeeded, 7.0, 5.0, 2.0, -3.0, null"
+            "\n2022-01-01 00:00:00+00:00, b, 1qbit.tabu, Executing, null, 5.0, null, null, null",
+        )
+        self.assertEqual(
+            self.experiment.get_experiment_details_as_string(), csv_file.getvalue()
+        )
+
+        jsonl_file = io.StringIO()
+        self.experiment.write_experiment_details(jsonl_file, format="jsonl")
+        rows = [json.loads(line) for line in jsonl_file.getvalue().splitlines()]
+        self.assertEqual([row["id"] for row in rows], ["a", "b"])
+        self.assertEqual(rows[0]["cost"], -3.0)
+        self.assertIsNone(rows[1]["total_time"])
+        self.assertEqual(rows[1]["queue_time"], 5.0)
+
+    def test_local_solver(self):
+        from msq.LocalSimulatedAnnealing import LocalSimulatedAnnealing
+        from msq.LocalWorkspace import LocalWorkspace
+
+        mock_workspace = MagicMock()
+        experiment = Experiment(
+            [LocalSimulatedAnnealing(sweeps=10, seed=1)],
+            self.problem_list,
+            num_iterations=2,
+        )
+        experiment.workspace = mock_workspace
+        experiment.submit()
+        experiment.wait_until_completed()
+        details = experiment.get_experiment_details()
+
+        # Nothing is uploaded to or fetched from the workspace
+        self.assertIsInstance(experiment.workspace, LocalWorkspace)
+        mock_workspace.get_job.assert_not_called()
+        self.assertEqual(len(details), 2)
+        self.assertEqual([job["status"] for job in details], ["Succeeded"] * 2)
+        self.assertEqual(details[0]["target"], "msq.simulatedannealing")
+        self.assertEqual(details[0]["parameters"]["sweeps"], 10)
+        self.assertEqual(
+            details[1]["solver"]["class_name"],
+            "msq.LocalSimulatedAnnealing.LocalSimulatedAnnealing",
+        )
+        job = experiment.workspace.get_job(experiment.job_id_list[1])
+        self.assertEqual(job.details.metadata["iteration"], "1")
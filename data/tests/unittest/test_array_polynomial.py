@@ -0,0 +1,241 @@
+from unittest import TestCase
+import io
+import os
+import gzip
+import json
+import pickle
+import tempfile
+import numpy as np
+import oneqloud_polynomials
+from msq.ArrayPolynomial import ArrayPolynomial
+from msq.Polynomial import Polynomial
+from azure.quantum.optimization import Problem, ProblemType
+
+terms_bp = [[1, [2, 3, 4]], [2, []], [3, [1]], [-1, [3, 1]]]
+
+
+class ArrayPolynomialTest(TestCase):
+    def test_from_arrays_same_degree(self):
+        # (1, 0) and (0, 1) are the same term, (2, 2) is x_2
+        array_poly = ArrayPolynomial.from_arrays(
+            [1.0, 2.0, 5.0, 4.0], np.array([[1, 0], [0, 1], [2, 2], [0, 3]])
+        )
+
+        self.assertEqual(sorted(array_poly.terms), [1, 2])
+        indices, coefficients = array_poly.terms[2]
+        self.assertEqual(indices.tolist(), [[0, 1], [0, 3]])
+        self.assertEqual(coefficients.tolist(), [3.0, 4.0])
+        self.assertEqual(array_poly.terms[1][0].tolist(), [[2]])
+        self.assertEqual(array_poly.degree, 2)
+        self.assertEqual(array_poly.term_count, 3)
+        self.assertEqual(array_poly.var_list, [0, 1, 2, 3])
+
+    def test_from_arrays_csr(self):
+        array_poly = ArrayPolynomial.from_arrays(
+            [2.0, 1.0, 3.0, -3.0],
+            [4, 3, 2, 1, 1],
+            offsets=[0, 0, 3, 4, 5],
+            constant_term=1.0,
+        )
+
+        self.assertEqual(array_poly.constant_term, 3.0)
+        # 3 x_1 - 3 x_1 cancels out
+        self.assertEqual(list(array_poly), [(3.0, []), (1.0, [2, 3, 4])])
+
+    def test_from_arrays_invalid(self):
+        with self.assertRaises(Exception):
+            ArrayPolynomial.from_arrays([1.0], [[0, -1]])
+        with self.assertRaises(Exception):
+            ArrayPolynomial.from_arrays([1.0, 2.0], [[0, 1]])
+        with self.assertRaises(Exception):
+            ArrayPolynomial.from_arrays([1.0], [0, 1], offsets=[0, 1])
+
+    def test_bp_round_trip(self):
+        bp = Polynomial(terms_bp).bp
+        array_poly = ArrayPolynomial.from_bp(bp)
+
+        self.assertTrue(array_poly.to_bp().equals(bp))
+        self.assertEqual(array_poly.term_count, bp.term_count)
+        self.assertEqual(array_poly.var_list, list(bp.var_list))
+        self.assertEqual(ArrayPolynomial.from_bp(array_poly.to_bp()), array_poly)
+
+    def test_to_csr(self):
+        array_poly = ArrayPolynomial.from_terms(terms_bp)
+        coefficients, indices, offsets = array_poly.to_csr()
+
+        self.assertEqual(coefficients.tolist(), [3.0, -1.0, 1.0])
+        self.assertEqual(indices.tolist(), [1, 1, 3, 2, 3, 4])
+        self.assertEqual(offsets.tolist(), [0, 1, 3, 6])
+        self.assertEqual(
+            ArrayPolynomial.from_arrays(
+                coefficients, indices, offsets, array_poly.constant_term
+            ),
+            array_poly,
+        )
+
+    def test_polynomial_from_arrays(self):
+        rng = np.random.default_rng(0)
+        matrix = np.triu(rng.integers(-5, 5, size=(20, 20))).astype(float)
+        rows, cols = np.nonzero(matrix)
+        poly = Polynomial.from_arrays(
+            matrix[rows, cols], np.stack([rows, cols], axis=1)
+        )
+
+        self.assertTrue(poly.equals(Polynomial.from_numpy(matrix)))
+        self.assertEqual(poly.to_arrays(), ArrayPolynomial.from_bp(poly.bp))
+
+    def test_polynomial_from_dict(self):
+        poly = Polynomial.from_dict({(0, 1): 2.0, (1, 0): 1.0, (2, 2): -1.0})
+        expected = oneqloud_polynomials.BinaryPolynomial()
+        expected.add_term(3.0, [0, 1])
+        expected.add_term(-1.0, [2])
+
+        self.assertTrue(poly.bp.equals(expected))
+        self.assertEqual(Polynomial.from_dict({}).term_count, 0)
+
+    def test_evaluate(self):
+        # 2 + 3 x_1 - x_1 x_3 + x_2 x_3 x_4
+        array_poly = ArrayPolynomial.from_terms(terms_bp)
+        X = np.array([[0, 0, 0, 0, 0], [0, 1, 1, 1, 1], [1, 1, 0, 1, 0]])
+
+        self.assertEqual(array_poly.evaluate(X).tolist(), [2.0, 5.0, 4.0])
+        self.assertEqual(array_poly.evaluate(X[1]), 5.0)
+        # -1 for every spin: 2 - 3 - 1 - 1
+        self.assertEqual(
+            array_poly.evaluate(-np.ones((1, 5)), encoding="spin").tolist(), [-3.0]
+        )
+
+    def test_evaluate_var_list(self):
+        array_poly = ArrayPolynomial.from_terms(terms_bp)
+        X = np.array([[1, 1, 1, 1], [1, 1, 1, 0]])
+
+        self.assertEqual(
+            array_poly.evaluate(X, var_list=[4, 3, 2, 1]).tolist(), [5.0, 3.0]
+        )
+        with self.assertRaises(Exception):
+            array_poly.evaluate(X, var_list=[4, 3, 2, 0])
+        with self.assertRaises(Exception):
+            array_poly.evaluate(X)
+
+    def test_evaluate_invalid_values(self):
+        array_poly = ArrayPolynomial.from_terms(terms_bp)
+        with self.assertRaises(Exception):
+            array_poly.evaluate(np.zeros((1, 5)), encoding="spin")
+        with self.assertRaises(Exception):
+            array_poly.evaluate(-np.ones((1, 5)))
+        with self.assertRaises(Exception):
+            array_poly.evaluate(np.zeros((1, 5)), encoding="ising")
+
+    def test_evaluate_chunks(self):
+        rng = np.random.default_rng(1)
+        array_poly = ArrayPolynomial.from_arrays(
+            rng.normal(size=200), rng.integers(0, 30, size=(200, 3))
+        )
+        X = rng.integers(0, 2, size=(50, 30))
+        expected = array_poly.evaluate(X)
+        # Brute force over the terms
+        for sample, energy in zip(X, expected):
+            self.assertAlmostEqual(
+                energy,
+                sum(c * np.prod(sample[var_list]) for c, var_list in array_poly),
+            )
+
+        chunk = ArrayPolynomial._evaluate_chunk
+        ArrayPolynomial._evaluate_chunk = 7
+        try:
+            np.testing.assert_allclose(array_poly.evaluate(X), expected)
+        finally:
+            ArrayPolynomial._evaluate_chunk = chunk
+
+    def test_write_qio(self):
+        poly = Polynomial([[1.5, [3, 1]], [2, []], [-3, [0]], [0.25, [4, 2, 0]]])
+        chunk = ArrayPolynomial._qio_chunk
+        ArrayPolynomial._qio_chunk = 1
+        try:
+            for rounding in (False, True):
+                out = io.BytesIO()
+                poly.to_arrays().write_qio(out, "qio", "ising", rounding=rounding)
+                expected = Problem(
+                    "qio",
+                    poly.to_azure_terms(rounding=rounding),
+                    problem_type=ProblemType.ising,
+                ).to_json()
+                written = json.loads(out.getvalue())
+                expected = json.loads(expected)
+                self.assertEqual(
+                    [term["ids"] for term in written["cost_function"]["terms"]],
+                    [[0], [1, 3], [0, 2, 4], []],
+                )
+                key = lambda term: (len(term["ids"]) or 99, term["ids"])
+                expected["cost_function"]["terms"].sort(key=key)
+                self.assertEqual(written, expected)
+        finally:
+            ArrayPolynomial._qio_chunk = chunk
+
+        out = io.BytesIO()
+        poly.write_qio(out, "qio", compress=True)
+        written = json.loads(gzip.decompress(out.getvalue()))
+        self.assertEqual(written["cost_function"]["type"], "pubo")
+        self.assertEqual(len(written["cost_function"]["terms"]), 4)
+
+        out = io.BytesIO()
+        ArrayPolynomial().write_qio(out)
+        self.assertEqual(json.loads(out.getvalue())["cost_function"]["terms"], [])
+        with self.assertRaises(Exception):
+            Polynomial([[np.inf, [0]]]).write_qio(io.BytesIO())
+
+    def test_save_load(self):
+        rng = np.random.default_rng(2)
+        coefficients = rng.normal(size=300)
+        offsets = np.concatenate(([0], np.cumsum(rng.integers(1, 5, size=300))))
+        indices = rng.integers(0, 40, size=offsets[-1])
+        array_poly = ArrayPolynomial.from_arrays(
+            coefficients, indices, offsets, constant_term=1.5
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "poly.bin")
+            array_poly.save(filename)
+            self.assertTrue(ArrayPolynomial.is_array_file(filename))
+            for mmap in (True, False):
+                loaded = ArrayPolynomial.load(filename, mmap=mmap)
+                self.assertEqual(loaded, array_poly)
+                self.assertEqual(loaded.constant_term, 1.5)
+                X = rng.integers(0, 2, size=(5, 40))
+                np.testing.assert_allclose(
+                    loaded.evaluate(X), array_poly.evaluate(X)
+                )
+
+            # A mapped polynomial is pickled by filename and is read-only
+            loaded = ArrayPolynomial.load(filename)
+            self.assertLess(len(pickle.dumps(loaded)), 200)
+            self.assertEqual(pickle.loads(pickle.dumps(loaded)), array_poly)
+            self.assertEqual(pickle.loads(pickle.dumps(array_poly)), array_poly)
+            with self.assertRaises(ValueError):
+                loaded.terms[2][1][0] = 0
+            del loaded
+
+            ArrayPolynomial().save(filename)
+            empty = ArrayPolynomial.load(filename)
+            self.assertEqual(empty.term_count, 0)
+            self.assertEqual(empty.terms, {})
+
+    def test_load_invalid(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "poly.bin")
+            with open(filename, "wb") as f:
+                f.write(b"not a polynomial file")
+            self.assertFalse(ArrayPolynomial.is_array_file(filename))
+            with self.assertRaises(Exception):
+                ArrayPolynomial.load(filename)
+
+            with open(filename, "wb") as f:
+                f.write(
+                    ArrayPolynomial._FILE_HEADER.pack(
+                        ArrayPolynomial.FILE_MAGIC,
+                        ArrayPolynomial.FILE_VERSION + 1,
+                        0,
+                        0.0,
+                    )
+                )
+            with self.assertRaises(Exception):
+                ArrayPolynomial.load(filename)
@@ -0,0 +1,127 @@
+from unittest import TestCase
+import io
+import json
+import numpy as np
+from msq.ArrayPolynomial import ArrayPolynomial
+from msq.DenseQubo import DenseQubo
+from msq.LocalExhaustiveSearch import LocalExhaustiveSearch
+from msq.Polynomial import Polynomial
+from tests.unittest.test_local_solver import all_assignments
+
+
+class DenseQuboTest(TestCase):
+    def test_from_numpy(self):
+        array = np.array([[-3, 0, 2], [1, 1, 0], [0, 5, 1]])
+        for var_list in (None, [6, 0, 5]):
+            dense_qubo = DenseQubo.from_numpy(array, var_list=var_list)
+            poly = Polynomial.from_numpy(array, var_list=var_list)
+            self.assertEqual(dense_qubo.to_arrays(), poly.to_arrays())
+            self.assertEqual(dense_qubo.var_list, sorted(poly.var_list))
+        self.assertEqual(dense_qubo.degree, 2)
+        self.assertEqual(dense_qubo.term_count, 6)
+        np.testing.assert_array_equal(
+            DenseQubo.from_numpy(array).to_numpy(), [[-3, 1, 2], [0, 1, 5], [0, 0, 1]]
+        )
+        with self.assertRaises(Exception):
+            DenseQubo.from_numpy(np.zeros((2, 3)))
+
+    def test_arrays_round_trip(self):
+        rng = np.random.default_rng(0)
+        array_poly = ArrayPolynomial.from_arrays(
+            rng.normal(size=60), rng.integers(0, 12, size=(60, 2)) * 3, constant_term=2
+        )
+        for dtype in (np.float32, np.float64):
+            dense_qubo = DenseQubo.from_arrays(array_poly, dtype=dtype)
+            self.assertEqual(dense_qubo.packed.dtype, dtype)
+            self.assertEqual(dense_qubo.var_list, array_poly.var_list)
+            self.assertEqual(dense_qubo.term_count, array_poly.term_count)
+            round_trip = dense_qubo.to_arrays()
+            self.assertEqual(round_trip.constant_term, 2)
+            for degree in (1, 2):
+                np.testing.assert_array_equal(
+                    round_trip.terms[degree][0], array_poly.terms[degree][0]
+                )
+                np.testing.assert_allclose(
+                    round_trip.terms[degree][1],
+                    array_poly.terms[degree][1],
+                    rtol=1e-6,
+                )
+        with self.assertRaises(Exception):
+            DenseQubo.from_arrays(ArrayPolynomial.from_terms([[1, [0, 1, 2]]]))
+
+    def test_evaluate(self):
+        rng = np.random.default_rng(1)
+        poly = Polynomial.from_numpy(np.triu(rng.normal(size=(9, 9))))
+        poly.add_constant_term(1.5)
+        dense_qubo = DenseQubo.from_arrays(poly.to_arrays())
+        X = rng.integers(0, 2, size=(20, 9))
+        np.testing.assert_allclose(dense_qubo.evaluate(X), poly.evaluate(X))
+        spins = 2 * X - 1
+        np.testing.assert_allclose(
+            dense_qubo.evaluate(spins, encoding="spin"),
+            poly.evaluate(spins, encoding="spin"),
+        )
+        var_list = list(range(9))[::-1]
+        self.assertAlmostEqual(
+            dense_qubo.evaluate(X[0][::-1], var_list=var_list), poly.evaluate(X[0])
+        )
+        with self.assertRaises(Exception):
+            dense_qubo.evaluate(X[:, :5])
+
+    def test_arithmetic(self):
+        first = DenseQubo.from_numpy(np.array([[1, 2], [0, 3]]))
+        second = DenseQubo.from_numpy(np.array([[0, 1], [0, -3]]))
+        self.assertEqual(
+            first + second, DenseQubo.from_numpy(np.array([[1, 3], [0, 0]]))
+        )
+        self.assertEqual((2 * first - 1).constant_term, -1)
+        np.testing.assert_array_equal((2 * first - 1).packed, [2, 4, 6])
+        np.testing.assert_array_equal((-first).packed, [-1, -2, -3])
+        with self.assertRaises(Exception):
+            first * second
+        with self.assertRaises(Exception):
+            first + DenseQubo.from_numpy(np.ones((2, 2)), var_list=[0, 2])
+
+    def test_write_qio(self):
+        rng = np.random.default_rng(2)
+        array_poly = ArrayPolynomial.from_arrays(
+            rng.normal(size=40), rng.integers(0, 10, size=(40, 2)), constant_term=-1
+        )
+        dense_qubo = DenseQubo.from_arrays(array_poly)
+        row_chunk = DenseQubo._row_chunk
+        DenseQubo._row_chunk = 3
+        try:
+            for rounding in (False, True):
+                expected, written = io.BytesIO(), io.BytesIO()
+                array_poly.write_qio(expected, "dense", rounding=rounding)
+                dense_qubo.write_qio(written, "dense", rounding=rounding)
+                self.assertEqual(written.getvalue(), expected.getvalue())
+        finally:
+            DenseQubo._row_chunk = row_chunk
+        written = io.BytesIO()
+        dense_qubo.write_qio(written, "dense", problem_type="ising", version="1.1")
+        cost_function = json.loads(written.getvalue())["cost_function"]
+        self.assertEqual(cost_function["version"], "1.1")
+        self.assertEqual(cost_function["type"], "ising")
+
+    def test_compact(self):
+        rng = np.random.default_rng(3)
+        dense = Polynomial.from_numpy(np.triu(rng.normal(size=(20, 20))))
+        compact = DenseQubo.compact(dense, dtype=np.float32)
+        self.assertIsInstance(compact, DenseQubo)
+        self.assertLess(compact.nbytes, 1000)
+        sparse = Polynomial([[1, [i, i + 1]] for i in range(20)])
+        self.assertIsInstance(DenseQubo.compact(sparse), ArrayPolynomial)
+        self.assertIsInstance(DenseQubo.compact(sparse, threshold=0), DenseQubo)
+        self.assertIsInstance(
+            DenseQubo.compact(DenseQubo.compact(sparse, threshold=0)), ArrayPolynomial
+        )
+        higher = Polynomial([[1, [0, 1, 2]]])
+        self.assertIsInstance(DenseQubo.compact(higher, threshold=0), ArrayPolynomial)
+
+        # Local solvers take a DenseQubo as they take an ArrayPolynomial
+        small = DenseQubo.compact(
+            Polynomial.from_numpy(np.triu(rng.normal(size=(8, 8))))
+        )
+        results = LocalExhaustiveSearch(num_workers=1).submit(small).get_results()
+        self.assertAlmostEqual(results["cost"], small.evaluate(all_assignments(8)).min())
@@ -0,0 +1,99 @@
+from unittest import TestCase
+import numpy as np
+from msq.ArrayPolynomial import ArrayPolynomial
+from msq.FlipEvaluator import FlipEvaluator
+from msq.Polynomial import Polynomial
+
+# 2 + 3 x_1 - x_1 x_3 + x_2 x_3 x_4 - 2 x_2 x_4
+terms = [[2, []], [3, [1]], [-1, [3, 1]], [1, [2, 3, 4]], [-2, [2, 4]]]
+
+
+class FlipEvaluatorTest(TestCase):
+    def check_flips(self, array_poly, encoding, flips, size):
+        rng = np.random.default_rng(0)
+        values = np.array(ArrayPolynomial.ENCODINGS[encoding])
+        x = rng.choice(values, size=size)
+        evaluator = FlipEvaluator(array_poly, x=x, encoding=encoding)
+        var_list = evaluator.var_list
+        for position in rng.integers(0, size, size=flips):
+            expected_deltas = []
+            for k in range(size):
+                flipped = x.copy()
+                flipped[k] = values[0] if x[k] == values[1] else values[1]
+                expected_deltas.append(
+                    array_poly.evaluate(flipped, var_list, encoding)
+                    - array_poly.evaluate(x, var_list, encoding)
+                )
+            np.testing.assert_allclose(evaluator.deltas(), expected_deltas, atol=1e-9)
+            self.assertAlmostEqual(evaluator.delta(position), expected_deltas[position])
+
+            x[position] = values[0] if x[position] == values[1] else values[1]
+            energy = evaluator.flip(position)
+            self.assertAlmostEqual(energy, array_poly.evaluate(x, var_list, encoding))
+            np.testing.assert_array_equal(evaluator.x, x)
+
+    def test_binary(self):
+        evaluator = FlipEvaluator(Polynomial(terms))
+        self.assertEqual(evaluator.var_list, [1, 2, 3, 4])
+        self.assertEqual(evaluator.energy, 2.0)
+        self.assertEqual(evaluator.delta(0), 3.0)
+        self.assertEqual(evaluator.flip(0), 5.0)
+        self.assertEqual(evaluator.delta(2), -1.0)
+
+    def test_random_flips(self):
+        rng = np.random.default_rng(1)
+        # Terms of degree 1 to 3
+        offsets = np.concatenate(([0], np.cumsum(rng.integers(1, 4, size=60))))
+        array_poly = ArrayPolynomial.from_arrays(
+            rng.normal(size=60),
+            rng.integers(0, 12, size=offsets[-1]),
+            offsets=offsets,
+        )
+        for encoding in ("binary", "spin"):
+            self.check_flips(array_poly, encoding, 40, len(array_poly.var_list))
+
+    def test_spin(self):
+        evaluator = FlipEvaluator(Polynomial(terms), encoding="spin")
+        # Every spin at 1: 2 + 3 - 1 + 1 - 2
+        self.assertEqual(evaluator.energy, 3.0)
+        self.assertEqual(evaluator.delta(0), -2 * (3 - 1))
+
+    def test_var_list_and_reset(self):
+        evaluator = FlipEvaluator(Polynomial(terms), var_list=[4, 3, 2, 1, 0])
+        evaluator.reset([1, 1, 1, 1, 0])
+        self.assertEqual(evaluator.energy, 3.0)
+        self.assertEqual(evaluator.delta(4), 0.0)
+        with self.assertRaises(Exception):
+            evaluator.reset([1, 1, 1, 1])
+        with self.assertRaises(Exception):
+            evaluator.reset([1, 1, 1, 1, -1])
+        with self.assertRaises(Exception):
+            FlipEvaluator(Polynomial(terms), var_list=[1, 2, 3])
+
+    def test_batch(self):
+        rng = np.random.default_rng(2)
+        offsets = np.concatenate(([0], np.cumsum(rng.integers(1, 4, size=40))))
+        array_poly = ArrayPolynomial.from_arrays(
+            rng.normal(size=40), rng.integers(0, 10, size=offsets[-1]), offsets=offsets
+        )
+        var_list = array_poly.var_list
+        for encoding in ("binary", "spin"):
+            values = np.array(ArrayPolynomial.ENCODINGS[encoding])
+            X = rng.choice(values, size=(6, len(var_list)))
+            evaluator = FlipEvaluator(array_poly, x=X, encoding=encoding)
+            np.testing.assert_allclose(
+                evaluator.energy, array_poly.evaluate(X, var_list, encoding)
+            )
+            for position in rng.integers(0, len(var_list), size=20):
+                mask = rng.random(6) < 0.5
+                deltas = evaluator.delta(position)
+                energies = evaluator.energy.copy()
+                evaluator.flip(position, mask)
+                X[mask, position] = values.sum() - X[mask, position]
+                np.testing.assert_allclose(
+                    evaluator.energy, energies + np.where(mask, deltas, 0)
+                )
+                np.testing.assert_allclose(
+                    evaluator.energy, array_poly.evaluate(X, var_list, encoding)
+                )
+                np.testing.assert_array_equal(evaluator.x, X)
@@ -0,0 +1,91 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from msq.JobPoller import JobPoller
+
+
+def make_job(job_id, status):
+    job = MagicMock()
+    job.id = job_id
+    job.has_completed.return_value = status in ("Succeeded", "Failed", "Cancelled")
+    return job
+
+
+class FakeWorkspace:
+    """Jobs complete after being looked up a given number of times"""
+
+    def __init__(self, rounds):
+        self.rounds = rounds
+        self.get_job_calls = []
+        self.list_jobs_calls = 0
+
+    def _job(self, job_id):
+        self.rounds[job_id] -= 1
+        status = "Succeeded" if self.rounds[job_id] <= 0 else "Executing"
+        return make_job(job_id, status)
+
+    def get_job(self, job_id):
+        self.get_job_calls.append(job_id)
+        return self._job(job_id)
+
+    def list_jobs(self, created_after=None):
+        self.list_jobs_calls += 1
+        return [self._job(job_id) for job_id in self.rounds]
+
+
+class JobPollerTest(TestCase):
+    def test_only_pending_jobs_polled(self):
+        workspace = FakeWorkspace({"a": 1, "b": 3})
+        poller = JobPoller(workspace, ["a", "b"], initial_interval=0, list_threshold=None)
+        poller.wait_until_completed()
+
+        self.assertEqual(set(poller.completed), {"a", "b"})
+        self.assertEqual(workspace.get_job_calls.count("a"), 1)
+        self.assertEqual(workspace.get_job_calls.count("b"), 3)
+
+        # Finished jobs are not fetched again
+        self.assertTrue(poller.has_completed())
+        self.assertEqual(len(workspace.get_job_calls), 4)
+
+    def test_has_completed(self):
+        workspace = FakeWorkspace({"a": 1, "b": 2})
+        poller = JobPoller(workspace, ["a", "b"], batch_size=1, list_threshold=None)
+        self.assertFalse(poller.has_completed())
+        self.assertEqual(poller.pending, ["b"])
+        self.assertTrue(poller.has_completed())
+
+    def test_listing(self):
+        workspace = FakeWorkspace({"a": 2, "b": 2, "c": 2})
+        poller = JobPoller(workspace, ["a", "b"], initial_interval=0, list_threshold=2)
+        completed = list(poller.iter_poll())
+
+        self.assertEqual(sorted(job.id for job in completed), ["a", "b"])
+        self.assertEqual(workspace.list_jobs_calls, 2)
+        self.assertEqual(workspace.get_job_calls, [])
+
+    def test_lookup_errors(self):
+        workspace = MagicMock()
+        workspace.get_job.side_effect = Exception("not found")
+        poller = JobPoller(
+            workspace, ["a"], initial_interval=0, list_threshold=None, max_errors=2
+        )
+        poller.wait_until_completed()
+
+        self.assertEqual(poller.abandoned, ["a"])
+        self.assertEqual(workspace.get_job.call_count, 2)
+
+    @patch("msq.JobPoller.time.sleep")
+    def test_backoff(self, mock_sleep):
+        workspace = FakeWorkspace({"a": 4})
+        poller = JobPoller(
+            workspace,
+            ["a"],
+            initial_interval=1,
+            backoff_factor=2,
+            max_interval=3,
+            jitter=0,
+            list_threshold=None,
+        )
+        poller.wait_until_completed()
+
+        waits = [call.args[0] for call in mock_sleep.call_args_list]
+        self.assertEqual(waits, [1, 2, 3])
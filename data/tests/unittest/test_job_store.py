@@ -0,0 +1,62 @@
+import tempfile
+from datetime import datetime, timezone
+from unittest import TestCase
+from azure.quantum import Job
+from azure.quantum._client.models import JobDetails
+from msq.JobStore import JobStore
+
+
+def make_job(job_id, status):
+    details = JobDetails(
+        id=job_id,
+        container_uri="container_uri",
+        input_data_format="microsoft.qio.v2",
+        provider_id="1qbit",
+        target="1qbit.tabu",
+        input_params={"params": {"seed": "3"}},
+    )
+    details.status = status
+    details.creation_time = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    details.begin_execution_time = datetime(2022, 1, 1, 0, 0, 5, tzinfo=timezone.utc)
+    details.end_execution_time = datetime(2022, 1, 1, 0, 0, 7, tzinfo=timezone.utc)
+    return Job(None, details)
+
+
+class JobStoreTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = JobStore(self.directory.name)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_get_missing_job(self):
+        self.assertIsNone(self.store.get_job("missing"))
+        self.assertFalse("missing" in self.store)
+
+    def test_put_and_get_job(self):
+        results = {"solutions": [{"cost": -9.0, "configuration": {"0": 1}}]}
+        self.assertTrue(self.store.put_job(make_job("a", "Succeeded"), results))
+
+        job = self.store.get_job("a")
+        self.assertTrue("a" in self.store)
+        self.assertEqual(job.id, "a")
+        self.assertEqual(job.details.status, "Succeeded")
+        self.assertEqual(job.details.input_params, {"params": {"seed": "3"}})
+        self.assertEqual(
+            (job.details.end_execution_time - job.details.creation_time).total_seconds(),
+            7,
+        )
+        # Results are served from the store
+        self.assertEqual(job.get_results(), results)
+
+    def test_put_running_job(self):
+        self.assertFalse(self.store.put_job(make_job("a", "Executing")))
+        self.assertIsNone(self.store.get_job("a"))
+
+    def test_store_persists(self):
+        self.store.put_job(make_job("a", "Cancelled"))
+        self.store.close()
+        self.store = JobStore(self.directory.name)
+        self.assertEqual(self.store.get_job("a").details.status, "Cancelled")
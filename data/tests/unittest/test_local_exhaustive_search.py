@@ -0,0 +1,85 @@
+from unittest import TestCase
+import numpy as np
+from azure.quantum.optimization import Problem, ProblemType, Term
+from msq.LocalExhaustiveSearch import LocalExhaustiveSearch, _search_prefix
+from msq.Polynomial import Polynomial
+from tests.unittest.test_local_solver import all_assignments, random_qubo
+
+
+class LocalExhaustiveSearchTest(TestCase):
+    def test_qubo(self):
+        poly, optimum = random_qubo(14, 0)
+        X = all_assignments(14)
+        energies = poly.evaluate(X)
+
+        for num_workers, chunk_bits in ((1, 0), (1, 4), (1, 20), (2, 4)):
+            results = (
+                LocalExhaustiveSearch(chunk_bits=chunk_bits, num_workers=num_workers)
+                .submit(poly)
+                .get_results()
+            )
+            self.assertAlmostEqual(results["cost"], optimum)
+            x = np.array([results["configuration"][str(i)] for i in range(14)])
+            self.assertTrue((x == X[np.argmin(energies)]).all())
+            self.assertEqual(results["parameters"]["optimal_solutions"], 1)
+
+    def test_all_optima(self):
+        # x_0 x_1 x_2 is rewarded, x_3 does not change the energy
+        poly = Polynomial([[-5, [0, 1, 2]], [1, [0]], [1, [2]], [0.5, [3, 4]]])
+        results = LocalExhaustiveSearch(chunk_bits=2).submit(poly).get_results()
+
+        self.assertEqual(results["cost"], -3.0)
+        self.assertEqual(results["parameters"]["optimal_energy"], -3.0)
+        configurations = sorted(
+            tuple(solution["configuration"][str(i)] for i in range(5))
+            for solution in results["solutions"]
+        )
+        self.assertEqual(
+            configurations, [(1, 1, 1, 0, 0), (1, 1, 1, 0, 1), (1, 1, 1, 1, 0)]
+        )
+        self.assertEqual(results["parameters"]["optimal_solutions"], 3)
+
+        results = (
+            LocalExhaustiveSearch(chunk_bits=2, max_solutions=1)
+            .submit(poly)
+            .get_results()
+        )
+        self.assertEqual(len(results["solutions"]), 1)
+        self.assertEqual(results["parameters"]["optimal_solutions"], 3)
+
+    def test_max_solutions_kept(self):
+        # A pair of variables set together costs 1, 3^4 assignments are optimal
+        poly = Polynomial([[1, [0, 1]], [1, [2, 3]], [1, [4, 5]], [1, [6, 7]]])
+        best_energy, best_x, best_count = _search_prefix(
+            poly.to_arrays(), "binary", 0, 0, 2, 1e-9, 2
+        )
+        self.assertEqual(best_energy, 0)
+        self.assertEqual(best_x.shape, (2, 8))
+        self.assertEqual(best_count, 81)
+
+        results = (
+            LocalExhaustiveSearch(chunk_bits=2, max_solutions=2, num_workers=1)
+            .submit(poly)
+            .get_results()
+        )
+        self.assertEqual(len(results["solutions"]), 2)
+        self.assertEqual(results["parameters"]["optimal_solutions"], 81)
+
+    def test_ising(self):
+        terms = [Term(c=1, indices=[0, 1]), Term(c=1, indices=[1, 2]), Term(c=-1, indices=[2])]
+        problem = Problem("ising", terms=terms, problem_type=ProblemType.ising)
+        results = LocalExhaustiveSearch().submit(problem).get_results()
+
+        self.assertEqual(results["cost"], -3.0)
+        self.assertEqual(
+            [solution["configuration"] for solution in results["solutions"]],
+            [{"0": 1, "1": -1, "2": 1}],
+        )
+
+    def test_too_many_variables(self):
+        poly = Polynomial([[1, [i]] for i in range(8)])
+        job = LocalExhaustiveSearch(max_variables=7).submit(poly)
+
+        self.assertEqual(job.details.status, "Failed")
+        self.assertEqual(job.details.error_data.code, "InvalidProperty")
+        self.assertIn("more than 7", job.details.error_data.message)
@@ -0,0 +1,104 @@
+from unittest import TestCase
+import os
+import threading
+import multiprocessing
+from azure.quantum.optimization import Problem, ProblemType, Term
+from msq.LocalParallelTempering import LocalParallelTempering
+from msq.Polynomial import Polynomial
+from tests.unittest.test_local_solver import random_qubo
+
+
+class LocalParallelTemperingTest(TestCase):
+    def test_automatic_temperatures(self):
+        poly, optimum = random_qubo(12, 0)
+        params = {
+            "auto_set_temperatures": "true",
+            "num_replicas": "2",
+            "num_sweeps_per_run": "100",
+            "seed": "3",
+            "goal": "OPTIMIZE",
+        }
+        job = LocalParallelTempering(params, num_workers=1).submit(poly)
+
+        self.assertEqual(job.details.status, "Succeeded")
+        results = job.get_results()
+        self.assertAlmostEqual(results["cost"], optimum)
+        # The parameters are reported as given
+        for name, value in params.items():
+            self.assertEqual(results["parameters"][name], value)
+        self.assertEqual(results["parameters"]["solver_name"], "PTICM")
+
+    def test_temperatures_by_num_temps(self):
+        problem = Problem(
+            name="ising",
+            terms=[
+                Term(c=1, indices=[0, 1]),
+                Term(c=1, indices=[1, 2]),
+                Term(c=-1, indices=[0, 2]),
+                Term(c=0.5, indices=[0, 1, 2]),
+            ],
+            problem_type=ProblemType.ising,
+        )
+        solver = LocalParallelTempering(
+            {
+                "auto_set_temperatures": "false",
+                "high_temp": "2",
+                "low_temp": "0",
+                "num_temps": "5",
+                "num_sweeps_per_run": "20",
+                "seed": "1",
+            },
+            num_workers=1,
+        )
+        self.assertEqual(solver.submit(problem).get_results()["cost"], -3.5)
+
+    def test_worker_processes(self):
+        poly, optimum = random_qubo(10, 1)
+        params = {"num_sweeps_per_run": "50", "num_replicas": "3", "seed": "2"}
+        results = LocalParallelTempering(params, num_workers=2).submit(poly).get_results()
+        self.assertAlmostEqual(results["cost"], optimum)
+
+        # The submitting process alone finds the same solutions, every chain has its own seed
+        single = LocalParallelTempering(params, num_workers=1).submit(poly).get_results()
+        self.assertEqual(single["solutions"], results["solutions"])
+
+    def test_dead_worker_breaks_barrier(self):
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(2)
+        worker = context.Process(target=os._exit, args=(1,), daemon=True)
+        worker.start()
+        LocalParallelTempering._watch_workers([worker], barrier, threading.Event())
+        with self.assertRaises(threading.BrokenBarrierError):
+            barrier.wait(5)
+        worker.join()
+
+    def test_invalid_params(self):
+        for params, message in (
+            (
+                {"num_replicas": "1"},
+                "Invalid value passed for num_replicas: Number of replicas must be in the range [2, 10000]",
+            ),
+            (
+                {"num_sweeps_per_run": "10000001"},
+                "Invalid value passed for num_sweeps_per_run: Number of sweeps per run must be in the range [2, 10000000]",
+            ),
+            (
+                {"auto_set_temperatures": "false", "high_temp": "-1", "low_temp": "1"},
+                "Invalid value passed for high_temp: high_temp must be >= 0",
+            ),
+            (
+                {"auto_set_temperatures": "true", "high_temp": "2"},
+                "auto_set_temperatures should be set to false to use high temp",
+            ),
+            (
+                {"elite_threshold": "1.5"},
+                "Invalid value passed for elite_threshold: Elite threshold must be in the range [0-1]",
+            ),
+            ({"seed": "-1"}, "Invalid value passed for seed: seed must be >= 0"),
+        ):
+            job = LocalParallelTempering(params, num_workers=1).submit(
+                Polynomial([[1, [0]]])
+            )
+            self.assertEqual(job.details.status, "Failed")
+            self.assertEqual(job.details.error_data.code, "InvalidProperty")
+            self.assertIn(message, job.details.error_data.message)
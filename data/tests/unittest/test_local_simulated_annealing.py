@@ -0,0 +1,73 @@
+from unittest import TestCase
+import numpy as np
+from azure.quantum.optimization import Problem, ProblemType, Term
+from msq.ArrayPolynomial import ArrayPolynomial
+from msq.LocalSimulatedAnnealing import LocalSimulatedAnnealing
+from msq.Polynomial import Polynomial
+from tests.unittest.test_local_solver import configuration_energy, random_qubo
+
+
+class LocalSimulatedAnnealingTest(TestCase):
+    def test_qubo(self):
+        poly, optimum = random_qubo(12, 0)
+
+        job = LocalSimulatedAnnealing(sweeps=200, restarts=16, seed=1).submit(poly)
+
+        self.assertEqual(job.details.status, "Succeeded")
+        results = job.get_results()
+        self.assertAlmostEqual(results["cost"], optimum)
+        self.assertEqual(len(results["configuration"]), 12)
+        self.assertAlmostEqual(
+            configuration_energy(poly, results["configuration"]), results["cost"]
+        )
+        costs = [solution["cost"] for solution in results["solutions"]]
+        self.assertEqual(costs, sorted(costs))
+        self.assertEqual(results["parameters"]["sweeps"], 200)
+        self.assertEqual(results["parameters"]["seed"], 1)
+
+    def test_ising_higher_order(self):
+        # 3-spin terms, every term can be at its minimum
+        problem = Problem(
+            name="ising",
+            terms=[
+                Term(c=1, indices=[0, 1, 2]),
+                Term(c=1, indices=[1, 2, 3]),
+                Term(c=1, indices=[0, 2, 3]),
+                Term(c=-1, indices=[0, 1, 3]),
+            ],
+            problem_type=ProblemType.ising,
+        )
+        results = (
+            LocalSimulatedAnnealing(sweeps="50", restarts="4", seed="2")
+            .submit(problem)
+            .get_results()
+        )
+
+        self.assertEqual(results["cost"], -4.0)
+        self.assertTrue(set(results["configuration"].values()) <= {-1, 1})
+
+    def test_seed_and_timeout(self):
+        array_poly = ArrayPolynomial.from_arrays(
+            np.random.default_rng(3).normal(size=30),
+            np.random.default_rng(4).integers(0, 10, size=(30, 2)),
+        )
+        first = LocalSimulatedAnnealing(sweeps=20, seed=5).submit(array_poly)
+        second = LocalSimulatedAnnealing(sweeps=20, seed=5).submit(array_poly)
+        self.assertEqual(first.get_results()["solutions"], second.get_results()["solutions"])
+
+        job = LocalSimulatedAnnealing(sweeps=10 ** 6, timeout=0).submit(array_poly)
+        self.assertEqual(job.details.status, "Succeeded")
+
+    def test_invalid_params(self):
+        job = LocalSimulatedAnnealing(sweeps=0).submit(ArrayPolynomial())
+        self.assertEqual(job.details.status, "Failed")
+        self.assertEqual(job.details.error_data.code, "InvalidProperty")
+        self.assertEqual(
+            job.details.error_data.message,
+            "Invalid value passed for sweeps: sweeps must be >= 1",
+        )
+
+    def test_constant_only(self):
+        results = LocalSimulatedAnnealing().submit(Polynomial([[2, []]])).get_results()
+        self.assertEqual(results["cost"], 2.0)
+        self.assertEqual(results["configuration"], {})
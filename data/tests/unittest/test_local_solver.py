@@ -0,0 +1,149 @@
+import json
+from unittest import TestCase
+from unittest.mock import MagicMock
+import numpy as np
+from azure.quantum.optimization import Problem, ProblemType, SlcTerm, Term
+from msq.ArrayPolynomial import ArrayPolynomial
+from msq.LocalSolver import LocalSolver, LocalJob
+from msq.LocalWorkspace import LocalWorkspace
+from msq.Polynomial import Polynomial
+
+
+def all_assignments(size):
+    """Every binary assignment of size variables, one per row"""
+    return (np.arange(1 << size)[:, None] >> np.arange(size)) & 1
+
+
+def random_qubo(size, seed):
+    """A random QUBO of size variables, and its optimum by enumeration"""
+    matrix = np.triu(np.random.default_rng(seed).normal(size=(size, size)))
+    poly = Polynomial.from_numpy(matrix)
+    return poly, poly.evaluate(all_assignments(size)).min()
+
+
+def configuration_energy(poly, configuration, encoding="binary"):
+    """The energy of a result configuration, {variable: value}"""
+    var_list = [int(var) for var in configuration]
+    return poly.evaluate(np.array(list(configuration.values())), var_list, encoding)
+
+
+class FirstConfigurationSolver(LocalSolver):
+    """Return the assignment with every variable at its first value"""
+
+    def solve(self, array_poly, encoding):
+        if self.get_param("fail", False, bool):
+            raise Exception("'fail' is set")
+        x = np.full(len(array_poly.var_list), array_poly.ENCODINGS[encoding][0])
+        cost = array_poly.evaluate(x, array_poly.var_list, encoding)
+        return [self._solution(array_poly.var_list, x, cost)], self.params["params"]
+
+
+class LocalSolverTest(TestCase):
+    def test_to_array_polynomial(self):
+        terms = [Term(c=2, indices=[0, 1]), Term(c=-1, indices=[1]), Term(c=3, indices=[])]
+        for problem_type, encoding in (
+            (ProblemType.pubo, "binary"),
+            (ProblemType.ising, "spin"),
+        ):
+            problem = Problem(name="problem", terms=terms, problem_type=problem_type)
+            array_poly, problem_encoding = LocalSolver.to_array_polynomial(problem)
+            self.assertEqual(problem_encoding, encoding)
+            self.assertEqual(list(array_poly), [(3.0, []), (-1.0, [1]), (2.0, [0, 1])])
+
+        poly = Polynomial([[2, [0, 1]]])
+        array_poly, encoding = LocalSolver.to_array_polynomial(poly)
+        self.assertEqual(encoding, "binary")
+        self.assertEqual(array_poly, poly.to_arrays())
+        self.assertIs(LocalSolver.to_array_polynomial(array_poly)[0], array_poly)
+        with self.assertRaises(Exception):
+            LocalSolver.to_array_polynomial("blob_uri")
+
+    def test_to_array_polynomial_grouped(self):
+        # 2 * (x0 - x1 + 1)^2 + x0 * x0
+        slc_term = SlcTerm(
+            c=2,
+            terms=[Term(c=1, indices=[0]), Term(c=-1, indices=[1]), Term(c=1, indices=[])],
+        )
+        X = np.array([[0, 0], [0, 1], [1, 0], [1, 1]])
+        for problem_type, encoding in (
+            (ProblemType.pubo_grouped, "binary"),
+            (ProblemType.ising_grouped, "spin"),
+        ):
+            problem = Problem(
+                name="grouped",
+                terms=[Term(c=1, indices=[0, 0]), slc_term],
+                problem_type=problem_type,
+            )
+            array_poly, problem_encoding = LocalSolver.to_array_polynomial(problem)
+            self.assertEqual(problem_encoding, encoding)
+            X_encoded = X if encoding == "binary" else 2 * X - 1
+            expected = [
+                2 * (x[0] - x[1] + 1) ** 2 + x[0] * x[0] for x in X_encoded.tolist()
+            ]
+            np.testing.assert_allclose(
+                array_poly.evaluate(X_encoded, [0, 1], encoding), expected
+            )
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            LocalSolver("msq.abstract")
+
+    def test_submit(self):
+        solver = FirstConfigurationSolver("msq.first", {"seed": "3"})
+        problem = Problem(
+            name="ising",
+            terms=[Term(c=2, indices=[0, 1]), Term(c=-1, indices=[1])],
+            problem_type=ProblemType.ising,
+        )
+        job = solver.submit(problem, metadata={"experiment_id": "experiment-1"})
+
+        self.assertIsInstance(job, LocalJob)
+        self.assertTrue(job.has_completed())
+        self.assertEqual(job.details.status, "Succeeded")
+        self.assertEqual(job.details.name, "ising")
+        self.assertEqual(job.details.target, "msq.first")
+        self.assertEqual(job.details.input_params, {"params": {"seed": "3"}})
+        self.assertEqual(job.details.metadata, {"experiment_id": "experiment-1"})
+        self.assertGreaterEqual(job.details.end_execution_time, job.details.creation_time)
+        results = job.get_results()
+        self.assertEqual(results["configuration"], {"0": -1, "1": -1})
+        self.assertEqual(results["solutions"][0]["cost"], 3.0)
+        self.assertEqual(results["parameters"], {"seed": "3"})
+
+    def test_submit_failed(self):
+        job = FirstConfigurationSolver("msq.first", {"fail": "true"}).submit(
+            ArrayPolynomial()
+        )
+
+        self.assertEqual(job.details.status, "Failed")
+        error_data = json.loads(str(job.details.error_data).replace("'", '"'))
+        self.assertEqual(error_data["message"], "fail is set")
+        with self.assertRaises(RuntimeError):
+            job.get_results()
+
+
+class LocalWorkspaceTest(TestCase):
+    def test_jobs(self):
+        job = FirstConfigurationSolver("msq.first").submit(ArrayPolynomial())
+        remote_job = MagicMock()
+        workspace = MagicMock()
+        workspace.get_job.return_value = remote_job
+        workspace.list_jobs.return_value = [remote_job]
+        local_workspace = LocalWorkspace(workspace)
+        local_workspace.add_job(job)
+
+        self.assertTrue(job.id in local_workspace)
+        self.assertIs(local_workspace.get_job(job.id), job)
+        self.assertIs(local_workspace.get_job("remote"), remote_job)
+        self.assertEqual(local_workspace.list_jobs(), [job, remote_job])
+        self.assertEqual(local_workspace.list_jobs(name_match="other"), [remote_job])
+        # Other attributes are the wrapped workspace's
+        self.assertIs(local_workspace.storage, workspace.storage)
+
+    def test_local_only(self):
+        local_workspace = LocalWorkspace()
+        with self.assertRaises(Exception):
+            local_workspace.get_job("missing")
+        self.assertEqual(local_workspace.list_jobs(), [])
+        with self.assertRaises(AttributeError):
+            local_workspace.storage
@@ -0,0 +1,56 @@
+from unittest import TestCase
+from msq.LocalTabuSearch import LocalTabuSearch
+from msq.Polynomial import Polynomial
+from tests.unittest.test_local_solver import configuration_energy, random_qubo
+
+
+class LocalTabuSearchTest(TestCase):
+    def test_qubo(self):
+        poly, optimum = random_qubo(14, 0)
+
+        params = {
+            "improvement_cutoff": "200",
+            "improvement_tolerance": "1e-09",
+            "seed": "3",
+            "tabu_tenure": "3",
+            "tabu_tenure_rand_max": "4",
+            "timeout": "0.2",
+        }
+        job = LocalTabuSearch(**params).submit(poly)
+
+        self.assertEqual(job.details.status, "Succeeded")
+        results = job.get_results()
+        self.assertAlmostEqual(results["cost"], optimum)
+        self.assertEqual(len(results["configuration"]), 14)
+        self.assertAlmostEqual(
+            configuration_energy(poly, results["configuration"]), results["cost"]
+        )
+        for name, value in params.items():
+            self.assertEqual(results["parameters"][name], value)
+
+    def test_higher_order_single_run(self):
+        # x_0 x_1 x_2 is rewarded, x_0 and x_2 alone are penalized
+        poly = Polynomial([[-5, [0, 1, 2]], [1, [0]], [1, [2]], [-1, [3]]])
+        first = LocalTabuSearch(seed=1).submit(poly).get_results()
+        second = LocalTabuSearch(seed=1).submit(poly).get_results()
+
+        self.assertEqual(first["cost"], -4.0)
+        self.assertEqual(first["configuration"], {"0": 1, "1": 1, "2": 1, "3": 1})
+        self.assertEqual(first, second)
+
+    def test_invalid_params(self):
+        for params, message in (
+            ({"tabu_tenure": -1}, "tabu_tenure must be >= 0"),
+            (
+                {"tabu_tenure_rand_max": 0},
+                "tabu_tenure_rand_max must be in the range [1, 200000]",
+            ),
+            ({"improvement_cutoff": -1}, "improvement_cutoff must be >= 0"),
+            ({"improvement_tolerance": -1}, "improvement_tolerance must be >= 0"),
+            ({"timeout": -1}, "timeout must be >= 0"),
+            ({"seed": -1}, "seed must be >= 0"),
+        ):
+            job = LocalTabuSearch(**params).submit(Polynomial([[1, [0]]]))
+            self.assertEqual(job.details.status, "Failed")
+            self.assertEqual(job.details.error_data.code, "InvalidProperty")
+            self.assertIn(message, job.details.error_data.message)
@@ -0,0 +1,106 @@
+import io
+from unittest import TestCase
+import numpy as np
+from msq.ArrayPolynomial import ArrayPolynomial
+from msq.DenseQubo import DenseQubo
+from msq.Polynomial import Polynomial
+from msq.PolynomialBuilder import PolynomialBuilder
+from tests.unittest.test_local_solver import all_assignments
+
+
+class PolynomialBuilderTest(TestCase):
+    def test_sum(self):
+        rng = np.random.default_rng(0)
+        builder = PolynomialBuilder(capacity=4)
+        expected = Polynomial()
+        for _ in range(30):
+            terms = [
+                [float(rng.integers(-5, 5)), rng.integers(0, 8, size=rng.integers(0, 4)).tolist()]
+                for _ in range(5)
+            ]
+            builder += Polynomial(terms)
+            expected = expected + Polynomial(terms)
+        builder.add_term(2.0, [1, 1])
+        builder.add_term(-1.0, [])
+        builder -= Polynomial([[1, [3]]])
+        builder -= 0.5
+        expected = expected + Polynomial([[2, [1]], [-1, [3]]]) - 1.5
+
+        self.assertGreater(builder.term_count, 4)
+        poly = builder.build()
+        # bp is only built when an operation needs it
+        self.assertEqual(poly.term_count, expected.term_count)
+        self.assertIsNone(poly._bp)
+        self.assertTrue(poly.equals(expected))
+        self.assertEqual(builder.build_arrays(), expected.to_arrays())
+
+    def test_sources(self):
+        builder = PolynomialBuilder()
+        builder.add_terms([[1, [0, 1]], [2, [2]], [3, []]])
+        builder.add_arrays([1.0, 1.0], np.array([[1, 0], [2, 2]]), scale=2)
+        builder.add_arrays([4.0, 5.0], [3, 0, 1], offsets=[0, 1, 3])
+        builder.add(ArrayPolynomial.from_terms([[1, [4]]]))
+        builder.add(DenseQubo.from_numpy(np.array([[1, 1], [0, 0]])), scale=-1)
+        other = PolynomialBuilder()
+        other.add_term(1, [5])
+        builder.add(other, scale=3)
+
+        expected = Polynomial(
+            [[3 - 1, [0, 1]], [4, [2]], [3, []], [4, [3]], [5, [0, 1]], [1, [4]], [-1, [0]], [3, [5]]]
+        )
+        self.assertTrue(builder.build().equals(expected))
+        with self.assertRaises(Exception):
+            builder.add_arrays([1.0], [0, 1], offsets=[0, 1])
+        with self.assertRaises(Exception):
+            builder.add_arrays([1.0, 2.0], np.array([[1, 0]]))
+
+        builder.clear()
+        self.assertEqual(builder.term_count, 0)
+        self.assertEqual(builder.build().term_count, 0)
+
+    def test_add_product(self):
+        # One-hot penalty (x_0 + x_1 + x_2 - 1)^2 and a product of higher order terms
+        constraint = Polynomial([[1, [0]], [1, [1]], [1, [2]], [-1, []]])
+        other = Polynomial([[2, [1, 3]], [-1, [4, 5, 6]], [0.5, []]])
+        builder = PolynomialBuilder(capacity=1)
+        builder.add_product(constraint, constraint, scale=3)
+        builder.add_product(constraint, other)
+        expected = constraint * constraint * 3 + constraint * other
+        self.assertTrue(builder.build().equals(expected))
+
+        X = all_assignments(7)
+        np.testing.assert_allclose(
+            builder.build().evaluate(X),
+            3 * constraint.evaluate(X[:, :3], var_list=[0, 1, 2]) ** 2
+            + constraint.evaluate(X[:, :3], var_list=[0, 1, 2])
+            * other.evaluate(X[:, 1:], var_list=[1, 2, 3, 4, 5, 6]),
+        )
+
+    def test_build_compact(self):
+        # Every pair of 6 variables: dense enough to be held as a DenseQubo
+        rng = np.random.default_rng(0)
+        builder = PolynomialBuilder()
+        builder.add(DenseQubo.from_numpy(rng.integers(-5, 5, size=(6, 6))))
+        builder.add_constant(2.0)
+        poly = builder.build()
+        self.assertIsInstance(poly._source, DenseQubo)
+        self.assertIsNone(poly._bp)
+        self.assertEqual(poly.var_count, 6)
+        self.assertEqual(poly.constant_term, 2.0)
+
+        expected = builder.build(compact=False)
+        self.assertIsInstance(expected._source, ArrayPolynomial)
+        X = all_assignments(6)
+        np.testing.assert_allclose(poly.evaluate(X), expected.evaluate(X))
+        written, expected_written = io.BytesIO(), io.BytesIO()
+        poly.write_qio(written)
+        expected.write_qio(expected_written)
+        self.assertEqual(written.getvalue(), expected_written.getvalue())
+        self.assertIsNone(poly._bp)
+        self.assertEqual(poly.to_arrays(), expected.to_arrays())
+        self.assertTrue(poly.equals(expected))
+
+        # A sparse polynomial stays an ArrayPolynomial
+        builder.clear()
+        builder.add_terms([[1, [0, 1]], [1, [2, 3]], [1, [4, 5]], [1, [6, 7]]])
+        self.assertIsInstance(builder.build()._source, ArrayPolynomial)
@@ -1,10 +1,19 @@
 # ugly code, not mine for whoever git blames this in the future
 # TODO need to refactor
 from azure.quantum.optimization import Term
-from unittest import TestCase
+from unittest import TestCase, skipIf
+from unittest.mock import patch
 from msq.Polynomial import Polynomial
+import oneqloud_polynomials
 import numpy as np
 import os
+import copy
+import tempfile
+
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
 
 terms_bp = [[1, [2, 3, 4]], [2, []], [3, [1]]]
 terms_qubo = [[2, [1, 3]], [10, []], [2, [1]]]
@@ -94,6 +103,29 @@ class testPolynomials(TestCase):
         with self.assertRaises(Exception):
             invalid_poly = Polynomial.from_dict(terms_dict)
 
+    def test_lazy_bp(self):
+        poly = Polynomial.from_arrays(
+            [1, 2, -1, 3], [[0, 1], [1, 1], [0, 0], [2, 3]], constant_term=4
+        )
+        copied = copy.copy(poly)
+        # Reading the polynomial from its arrays does not build bp
+        self.assertEqual(poly.term_count, 5)
+        self.assertEqual(poly.degree, 2)
+        self.assertEqual(poly.var_list, [0, 1, 2, 3])
+        self.assertEqual(poly.var_count, 4)
+        self.assertEqual(poly.constant_term, 4)
+        self.assertEqual(poly.evaluate([1, 1, 0, 0]), 6)
+        self.assertEqual(poly.to_arrays().term_count, 5)
+        self.assertIsNone(poly._bp)
+
+        # bp is built once for the copies sharing the arrays
+        self.assertTrue(poly.equals(Polynomial([[1, [0, 1]], [2, [1]], [-1, [0]], [3, [2, 3]], [4, []]])))
+        self.assertIs(copied.bp, poly.bp)
+        copied.add_term(1, [0, 1])
+        self.assertEqual(copied.get_coefficient([0, 1]), 2)
+        self.assertEqual(poly.get_coefficient([0, 1]), 1)
+        self.assertEqual(copied.term_count, 5)
+
     def test_to_qbp(self):
         client_poly_qbp = Polynomial(terms_qubo)
         qbp = client_poly_qbp.to_qbp()
@@ -107,6 +139,12 @@ class testPolynomials(TestCase):
         term_list = client_poly1.to_list()
         self.assertEqual(term_list, [[1.0, [2, 3, 4]], [3.0, [1]], [2.0, []]])
 
+    def test_evaluate(self):
+        # 2 + 3 x_1 + x_2 x_3 x_4
+        X = np.array([[0, 1, 1, 1, 1], [0, 0, 1, 1, 0]])
+        self.assertEqual(client_poly1.evaluate(X).tolist(), [6.0, 2.0])
+        self.assertEqual(client_poly1.evaluate([1, -1, 1, 1], var_list=[1, 2, 3, 4], encoding="spin"), 4.0)
+
     def test_to_numpy(self):
         poly_qbp = Polynomial(terms_reduce)  # valid qubo
         qbp_numpy = poly_qbp.to_numpy()
@@ -120,12 +158,61 @@ class testPolynomials(TestCase):
         with self.assertRaises(Exception):
             bp_numpy = poly_bp.to_numpy()
 
+    @skipIf(scipy is None, "scipy is not installed")
+    def test_sparse(self):
+        nump = np.array([[-3, 0, 2], [1, 1, 0], [0, 0, 1]])
+        for matrix in (scipy.sparse.csr_matrix(nump), scipy.sparse.coo_matrix(nump)):
+            poly = Polynomial.from_sparse(matrix)
+            self.assertTrue(poly.equals(Polynomial.from_numpy(nump)))
+            poly = Polynomial.from_sparse(matrix, var_list=[0, 5, 6])
+            self.assertTrue(poly.equals(Polynomial.from_numpy(nump, var_list=[0, 5, 6])))
+
+        # Every coupling once per side of the diagonal
+        adjacency = scipy.sparse.csr_matrix(np.array([[1, 4, 0], [4, 0, -2], [0, -2, 0]]))
+        poly = Polynomial.from_sparse(adjacency, convention="symmetric")
+        self.assertTrue(poly.equals(Polynomial([[1, [0]], [4, [0, 1]], [-2, [1, 2]]])))
+        self.assertEqual((poly.to_sparse(convention="symmetric") != adjacency).nnz, 0)
+        upper = poly.to_sparse(format="coo")
+        self.assertEqual(upper.format, "coo")
+        np.testing.assert_array_equal(upper.toarray(), poly.to_numpy())
+
+        # Rows follow var_list, missing variables are an error
+        matrix = poly.to_sparse(var_list=[2, 1, 0])
+        np.testing.assert_array_equal(
+            matrix.toarray(), [[0, -2, 0], [0, 0, 4], [0, 0, 1]]
+        )
+        self.assertTrue(Polynomial.from_sparse(matrix, var_list=[2, 1, 0]).equals(poly))
+        with self.assertRaises(Exception):
+            poly.to_sparse(var_list=[0, 1])
+        with self.assertRaises(Exception):
+            Polynomial(terms_bp).to_sparse()
+        with self.assertRaises(Exception):
+            Polynomial.from_sparse(matrix, convention="lower")
+        with self.assertRaises(Exception):
+            Polynomial.from_sparse(scipy.sparse.csr_matrix((2, 3)))
+
     def test_to_file(self):
         # # Test to_file(filename)
         poly_to_file = Polynomial(terms_qubo)
         poly_to_file.to_file(data_path + "test_poly.out")
         self.assertTrue(os.path.isfile(data_path + "test_poly.out"))
 
+        # Any degree in the array format
+        poly_bp = Polynomial(terms_bp)
+        poly_bp.to_file(data_path + "test_poly_array.out", format="array")
+        try:
+            poly_from_array_file = Polynomial.from_file(data_path + "test_poly_array.out")
+            # The file is only mapped until bp is needed
+            self.assertEqual(poly_from_array_file.term_count, 3)
+            self.assertIsNone(poly_from_array_file._bp)
+            self.assertIsNotNone(poly_from_array_file.to_arrays().filename)
+            self.assertTrue(poly_from_array_file.equals(poly_bp))
+            self.assertEqual(poly_from_array_file.to_arrays(), poly_bp.to_arrays())
+        finally:
+            os.remove(data_path + "test_poly_array.out")
+        with self.assertRaises(Exception):
+            poly_bp.to_file(data_path + "test_poly_array.out", format="json")
+
         invalid_to_file = Polynomial(terms_bp)
         with self.assertRaises(Exception):
             invalid_to_file.to_file(data_path + "test_poly_invalid.out")
@@ -306,6 +393,151 @@ class testPolynomials(TestCase):
         poly.sum(poly_to_add)
         self.assertEqual(poly._stored, None)
 
+    def test_copy_on_write(self):
+        poly = Polynomial(terms_bp)
+        copied = copy.copy(poly)
+        deep_copied = copy.deepcopy(poly)
+        shifted = copy.copy(poly)
+        self.assertIs(copied.bp, poly.bp)
+        self.assertIs(deep_copied.bp, poly.bp)
+        self.assertIs(shifted.bp, poly.bp)
+
+        # Copying does not build a BinaryPolynomial, read-only methods do not clone bp
+        with patch.object(oneqloud_polynomials, "BinaryPolynomial") as bp_class:
+            read_only = copy.copy(poly)
+        bp_class.assert_not_called()
+        read_only.clone()
+        self.assertIs(read_only._bp, poly._bp)
+        del read_only
+
+        # The changed polynomial clones bp, the others keep sharing it
+        copied.add_term(4, [7])
+        self.assertIsNot(copied.bp, poly.bp)
+        self.assertIs(deep_copied.bp, poly.bp)
+        self.assertFalse(poly.has_term([7]))
+        self.assertEqual(copied.get_coefficient([7]), 4)
+        deep_copied.add_constant_term(1)
+        self.assertEqual(poly.constant_term, 2)
+        self.assertEqual(deep_copied.constant_term, 3)
+        shifted.constant_term = 0
+        self.assertEqual(poly.constant_term, 2)
+        self.assertEqual(poly.term_count, 3)
+
+        # Operators do not change their operands
+        product = poly * 2
+        squared = Polynomial(terms_linear1) ** 2
+        self.assertEqual(poly.get_coefficient([1]), 3)
+        self.assertEqual(product.get_coefficient([1]), 6)
+        self.assertTrue(squared.equals(Polynomial(terms_linear1) * Polynomial(terms_linear1)))
+
+        # In place operators change the polynomial without cloning bp
+        bp = poly.bp
+        alias = poly
+        poly += Polynomial(terms_linear1)
+        poly -= 1
+        poly -= Polynomial([[1, [1]]])
+        self.assertIs(poly, alias)
+        self.assertIs(poly.bp, bp)
+        self.assertEqual(poly.get_coefficient([1]), 4)
+        self.assertEqual(poly.constant_term, 6)
+        poly *= 2
+        self.assertIs(poly, alias)
+        self.assertEqual(poly.constant_term, 12)
+
+        # A shared polynomial clones bp on its first in place change
+        shared = copy.copy(poly)
+        shared += 1
+        self.assertIsNot(shared.bp, poly.bp)
+        self.assertEqual(poly.constant_term, 12)
+
+    def test_calibrate(self):
+        table = Polynomial._dispatch_table
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join(directory, "dispatch.json")
+                calibrated = Polynomial.calibrate(
+                    sizes={"multiply": [8, 4], "power": [4]},
+                    repeats=1,
+                    filename=filename,
+                )
+                self.assertEqual([size for size, _ in calibrated["multiply"]], [4, 8])
+                self.assertIn(calibrated["power"][0][1], ("qbp", "bp"))
+                Polynomial._dispatch_table = None
+                self.assertEqual(Polynomial.load_dispatch_table(filename), calibrated)
+                self.assertEqual(Polynomial._dispatch_table, calibrated)
+
+            # The closest measured size below the term count decides
+            Polynomial._dispatch_table = {
+                "multiply": [[4, "bp"], [16, "qbp"], [64, "bp"]]
+            }
+            self.assertFalse(Polynomial._use_qbp("multiply", 2))
+            self.assertTrue(Polynomial._use_qbp("multiply", 16))
+            self.assertTrue(Polynomial._use_qbp("multiply", 63))
+            self.assertFalse(Polynomial._use_qbp("multiply", 1000))
+            # Without a table for the operation, _threshold decides
+            self.assertTrue(Polynomial._use_qbp("power", Polynomial._threshold + 1))
+
+            # Both paths give the same polynomial
+            for path in ([[1, "qbp"]], [[1, "bp"]]):
+                Polynomial._dispatch_table = {"multiply": path, "power": path}
+                self.assertTrue((large_poly * 2).equals(large_poly + large_poly))
+                squared = large_poly ** 2
+                self.assertEqual(squared.degree, 2)
+                self.assertEqual(squared.get_coefficient([3, 5]), 2 * 3 * 5)
+            with self.assertRaises(Exception):
+                Polynomial.calibrate(sizes={"sum": [4]})
+        finally:
+            Polynomial._dispatch_table = table
+
+    def test_stored_forms(self):
+        poly = Polynomial([[1, [0, 1]], [2, [1]], [-1, [0]]])
+        qbp = poly.to_qbp()
+        array = poly.to_numpy()
+        self.assertIs(poly.to_arrays(), poly.to_arrays())
+        self.assertTrue(array.flags.writeable)
+        terms = poly.to_azure_terms()
+        self.assertEqual(poly.to_azure_terms(), terms)
+        self.assertIsNot(poly.to_azure_terms(), terms)
+
+        # The stored forms are computed once, callers get copies they may modify
+        qbp.add_term(5.0, 4)
+        array[0, 0] = 7
+        poly.var_terms.add_term(1, [3])
+        terms[0].c = 9
+        self.assertEqual(poly.to_qbp().term_count, 3)
+        self.assertEqual(poly.to_numpy()[0, 0], -1)
+        self.assertFalse(poly.var_terms.has_term([3]))
+        self.assertNotEqual(poly.to_azure_terms()[0].c, 9)
+        self.assertEqual(len(poly.to_azure_terms(include_constant_term=False)), 3)
+
+        # Every kind of change drops the stored forms
+        for change in (
+            lambda: poly.add_term(3, [2]),
+            lambda: poly.set_coefficient(4, [2]),
+            lambda: poly.remove_term([2]),
+            lambda: poly.add_constant_term(0),
+            lambda: setattr(poly, "constant_term", 0),
+            lambda: poly.multiply(1),
+        ):
+            poly.to_qbp()
+            change()
+            self.assertEqual(poly._stored, None)
+
+        # Read-only BinaryPolynomial methods keep them
+        qbp = poly.to_qbp()
+        stored = poly._stored
+        poly.clone()
+        self.assertIs(poly._stored, stored)
+        self.assertEqual(poly.to_qbp().term_count, qbp.term_count)
+
+        poly.add_term(3, [2])
+        self.assertEqual(poly.to_numpy()[2, 2], 3)
+        self.assertEqual(poly.evaluate([0, 0, 1]), 3)
+        self.assertEqual(len(poly.to_azure_terms()), 4)
+        poly.to_qbp()
+        poly.bp = Polynomial([[1, [0]]]).bp
+        self.assertEqual(poly.to_qbp().term_count, 1)
+
     def test_python_internal(self):
         poly = Polynomial(terms=terms_bp)
         poly_constant = Polynomial(terms=terms_degree_zero)
@@ -0,0 +1,42 @@
+import gzip
+import json
+from unittest import TestCase
+from unittest.mock import patch
+import numpy as np
+import azure_config
+from azure.quantum.job.job import Job
+from msq.ProblemLibrary import ProblemLibrary
+
+
+class ProblemLibraryTest(TestCase):
+    def test_generate_random_qubo(self):
+        np.random.seed(0)
+        with patch.object(azure_config, "WORKSPACE"), patch.object(
+            Job, "upload_input_data", return_value="blob_uri"
+        ) as upload_input_data:
+            blob_name, blob_uri = ProblemLibrary.generate_random_qubo(4, blob_name="qubo")
+        np.random.seed(0)
+        qubo = ProblemLibrary._random_dense_qubo(4)
+
+        self.assertEqual((blob_name, blob_uri), ("qubo", "blob_uri"))
+        upload = upload_input_data.call_args.kwargs
+        self.assertEqual(upload["blob_name"], "qubo")
+        self.assertEqual(upload["encoding"], "gzip")
+        payload = json.loads(gzip.decompress(upload["input_data"]))
+        self.assertEqual(payload["metadata"]["name"], "metadata_name")
+        cost_function = payload["cost_function"]
+        self.assertEqual(cost_function["type"], "ising")
+        self.assertEqual(cost_function["version"], "1.1")
+
+        # Every coefficient of the upper triangle and the constant term
+        array = qubo.to_numpy()
+        expected = {
+            (i,) if i == j else (i, j): array[i, j]
+            for i in range(4)
+            for j in range(i, 4)
+        }
+        expected[()] = qubo.constant_term
+        coefficients = {tuple(term["ids"]): term["c"] for term in cost_function["terms"]}
+        self.assertEqual(coefficients.keys(), expected.keys())
+        for ids, c in expected.items():
+            self.assertAlmostEqual(coefficients[ids], c)
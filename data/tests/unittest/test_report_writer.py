@@ -0,0 +1,48 @@
+import io
+import json
+from unittest import TestCase
+from msq.ReportWriter import ReportWriter
+
+
+class ReportWriterTest(TestCase):
+    def setUp(self):
+        self.row = {
+            "creation_time": "2022-01-01 00:00:00+00:00",
+            "id": "a",
+            "target": "1qbit.tabu",
+            "status": "Failed",
+            "total_time": 7.0,
+            "queue_time": None,
+            "execution_time": None,
+            "cost": None,
+            "error_message": "Invalid problem",
+        }
+
+    def test_unsupported_format(self):
+        with self.assertRaises(Exception) as test:
+            ReportWriter(io.StringIO(), format="xml")
+        self.assertIn("Unsupported report format", str(test.exception))
+
+    def test_csv(self):
+        file = io.StringIO()
+        writer = ReportWriter(file)
+        writer.write_header()
+        writer.write_row(self.row)
+
+        self.assertEqual(
+            file.getvalue(),
+            "\ncreation_time, id, target, status, total_time, queue_time, execution_time, cost, error_message"
+            '\n2022-01-01 00:00:00+00:00, a, 1qbit.tabu, Failed, 7.0, null, null, null, "Invalid problem"',
+        )
+
+    def test_jsonl(self):
+        file = io.StringIO()
+        writer = ReportWriter(file, format="jsonl")
+        writer.write_header()
+        writer.write_row(self.row)
+        writer.write_row(dict(self.row, id="b"))
+
+        lines = file.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0]), self.row)
+        self.assertEqual(json.loads(lines[1])["id"], "b")
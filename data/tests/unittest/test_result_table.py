@@ -0,0 +1,92 @@
+import math
+import os
+import tempfile
+import numpy as np
+from unittest import TestCase, skipIf
+from msq.ResultTable import ResultTable
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def make_job_details(job_id, status, solver_list_index, iteration, **times):
+    job_details = {
+        "id": job_id,
+        "target": "1qbit.tabu" if solver_list_index == 0 else "1qbit.pticm",
+        "status": status,
+        "creation_time": "2022-01-01 01:00:00+01:00",
+        "input_data_uri": "input_data_uri",
+        "output_data_uri": "output_data_uri",
+        "problem": {"qubo_size": "qubo_size", "qubo_density": "qubo_density"},
+        "solver": {"class_name": "solver", "input_params": {}},
+        "experiment": {
+            "experiment_id": "experiment-1",
+            "date": "2022-01-01 00:00:00+00:00",
+            "num_iterations": 2,
+            "iteration": iteration,
+            "solver_list_length": 2,
+            "solver_list_index": solver_list_index,
+            "problem_list_length": 1,
+            "problem_list_index": 0,
+        },
+    }
+    job_details.update(times)
+    return job_details
+
+
+experiment_details_list = [
+    make_job_details(
+        "a",
+        "Succeeded",
+        0,
+        0,
+        execution_time="2.5",
+        queue_time="1.0",
+        total_time="3.5",
+        cost=-9.0,
+    ),
+    make_job_details("b", "Waiting", 0, 1),
+    make_job_details("c", "Cancelled", 1, 0, total_time="4.0"),
+]
+
+
+class ResultTableTest(TestCase):
+    def setUp(self):
+        self.table = ResultTable.from_job_details(experiment_details_list)
+
+    def test_types(self):
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual(self.table.columns["execution_time"].dtype, np.float64)
+        self.assertEqual(self.table.columns["iteration"].dtype, np.int64)
+        self.assertEqual(self.table.columns["status"].dtype, np.int32)
+        self.assertEqual(self.table.categories["target"], ["1qbit.pticm", "1qbit.tabu"])
+
+    def test_values(self):
+        np.testing.assert_array_equal(self.table["solve_time"][:1], [2.5])
+        self.assertTrue(math.isnan(self.table["cost"][1]))
+        self.assertEqual(list(self.table["status"]), ["Succeeded", "Waiting", "Cancelled"])
+        self.assertEqual(
+            self.table["creation_time"][0], np.datetime64("2022-01-01T00:00:00", "us")
+        )
+
+    def test_to_records(self):
+        record = self.table.to_records()[2]
+        self.assertEqual(record["target"], "1qbit.pticm")
+        self.assertEqual(record["solver_list_index"], 1)
+        self.assertEqual(record["total_time"], 4.0)
+
+    @skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_to_parquet(self):
+        import pyarrow.parquet
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "table.parquet")
+            self.table.to_parquet(path)
+            table = pyarrow.parquet.read_table(path)
+
+        self.assertEqual(table.num_rows, 3)
+        self.assertTrue(pyarrow.types.is_dictionary(table.schema.field("status").type))
+        self.assertEqual(table.column("execution_time").null_count, 2)
+        self.assertEqual(table.column("status").to_pylist()[1], "Waiting")
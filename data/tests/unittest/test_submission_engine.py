@@ -0,0 +1,87 @@
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from azure.quantum.optimization import OnlineProblem
+from azure.quantum.target.oneqbit import TabuSearch
+from msq.SubmissionEngine import SubmissionEngine
+
+
+class SubmissionEngineTest(TestCase):
+    def make_solver(self, name, counter):
+        solver = MagicMock()
+        solver.name = name
+
+        def submit(problem):
+            with counter["lock"]:
+                counter["running"] += 1
+                counter["peak"] = max(counter["peak"], counter["running"])
+            time.sleep(0.01)
+            with counter["lock"]:
+                counter["running"] -= 1
+            return problem
+
+        solver.submit.side_effect = submit
+        return solver
+
+    def test_invalid_max_workers(self):
+        with self.assertRaises(Exception):
+            SubmissionEngine(max_workers=0)
+        with self.assertRaises(Exception):
+            SubmissionEngine(max_workers_per_target=0)
+
+    def test_submit_returns_job(self):
+        solver = MagicMock()
+        solver.submit.return_value = "job"
+        with SubmissionEngine(max_workers=2) as engine:
+            future = engine.submit(solver, "problem")
+            self.assertEqual(future.result(), "job")
+        solver.submit.assert_called_with("problem")
+
+    def test_max_workers_per_target(self):
+        counter = {"lock": threading.Lock(), "running": 0, "peak": 0}
+        solver = self.make_solver("1qbit.tabu", counter)
+        with SubmissionEngine(max_workers=8, max_workers_per_target=2) as engine:
+            futures = [engine.submit(solver, i) for i in range(10)]
+            self.assertEqual([future.result() for future in futures], list(range(10)))
+        self.assertLessEqual(counter["peak"], 2)
+
+    def test_busy_target_does_not_block_others(self):
+        release = threading.Event()
+        busy = MagicMock()
+        busy.name = "1qbit.tabu"
+        busy.submit.side_effect = lambda problem: release.wait() and problem
+        other = MagicMock()
+        other.name = "microsoft.simulatedannealing.cpu"
+        other.submit.side_effect = lambda problem: problem
+        with SubmissionEngine(max_workers=2, max_workers_per_target=1) as engine:
+            busy_futures = [engine.submit(busy, i) for i in range(5)]
+            try:
+                self.assertEqual(engine.submit(other, "other").result(timeout=5), "other")
+            finally:
+                release.set()
+            self.assertEqual([future.result() for future in busy_futures], list(range(5)))
+
+    @patch("msq.SubmissionEngine.Job.from_storage_uri")
+    def test_submit_with_metadata(self, mock_from_storage_uri):
+        solver = TabuSearch(MagicMock())
+        problem = OnlineProblem(name="problem", blob_uri="https://blob/problem")
+        metadata = {"experiment_id": "id", "iteration": "0"}
+
+        SubmissionEngine.submit_with_metadata(solver, problem, metadata)
+
+        kwargs = mock_from_storage_uri.call_args.kwargs
+        self.assertEqual(kwargs["metadata"], metadata)
+        self.assertEqual(kwargs["input_data_uri"], "https://blob/problem")
+        self.assertEqual(kwargs["target"], "1qbit.tabu")
+
+    def test_submit_with_metadata_fallback(self):
+        solver = MagicMock()
+        problem = OnlineProblem(name="problem", blob_uri="https://blob/problem")
+
+        with self.assertLogs("msq.SubmissionEngine", level="WARNING"):
+            SubmissionEngine.submit_with_metadata(
+                solver, problem, {"experiment_id": "id"}
+            )
+
+        solver.submit.assert_called_with(problem)